@@ -0,0 +1,33 @@
+"""Add composite price_history (ingredient_id, changed_at) index
+
+Revision ID: 3b1f6c2d9a47
+Revises: 7f5ca7b1c6f4
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b1f6c2d9a47'
+down_revision: Union[str, Sequence[str], None] = '7f5ca7b1c6f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_price_history_ingredient_changed_at',
+        'price_history',
+        ['ingredient_id', 'changed_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_price_history_ingredient_changed_at', table_name='price_history')
@@ -0,0 +1,54 @@
+"""Convert str()-serialized system settings to real JSON
+
+Revision ID: 8c4d2e5f1a63
+Revises: 3b1f6c2d9a47
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+import ast
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4d2e5f1a63'
+down_revision: Union[str, Sequence[str], None] = '3b1f6c2d9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+system_settings = sa.table(
+    'system_settings',
+    sa.column('id', sa.Integer),
+    sa.column('value', sa.JSON),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    for row in conn.execute(sa.select(system_settings.c.id, system_settings.c.value)):
+        if not isinstance(row.value, str):
+            continue
+        try:
+            value = ast.literal_eval(row.value)
+        except (ValueError, SyntaxError):
+            continue
+        conn.execute(
+            system_settings.update()
+            .where(system_settings.c.id == row.id)
+            .values(value=value)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    for row in conn.execute(sa.select(system_settings.c.id, system_settings.c.value)):
+        if isinstance(row.value, (dict, list)):
+            conn.execute(
+                system_settings.update()
+                .where(system_settings.c.id == row.id)
+                .values(value=str(row.value))
+            )
@@ -0,0 +1,135 @@
+"""Partition activity_logs and price_history by month
+
+Revision ID: 5d7e9a1c3b28
+Revises: 8c4d2e5f1a63
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from datetime import date, datetime, timezone
+from typing import Callable, List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7e9a1c3b28'
+down_revision: Union[str, Sequence[str], None] = '8c4d2e5f1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions are created up to this many months past the current one;
+# app.services.partitions keeps extending the range afterwards
+MONTHS_AHEAD = 3
+
+
+def _activity_logs_columns(key_nullable: bool) -> List[sa.Column]:
+    return [
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('activity_logs_id_seq')"), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('action', sa.String(length=100), nullable=False),
+        sa.Column('entity_type', sa.String(length=50), nullable=True),
+        sa.Column('entity_id', sa.Integer(), nullable=True),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=key_nullable),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    ]
+
+
+def _price_history_columns(key_nullable: bool) -> List[sa.Column]:
+    return [
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('price_history_id_seq')"), nullable=False),
+        sa.Column('ingredient_id', sa.Integer(), nullable=True),
+        sa.Column('old_price', sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column('new_price', sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column('changed_by', sa.Integer(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=key_nullable),
+        sa.Column('reason', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['changed_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['ingredient_id'], ['ingredients.id'], ),
+    ]
+
+
+TABLES = {
+    'activity_logs': ('created_at', _activity_logs_columns, [['id']]),
+    'price_history': ('changed_at', _price_history_columns, [['id'], ['ingredient_id', 'changed_at']]),
+}
+
+
+def _index_name(table: str, columns: List[str]) -> str:
+    if columns == ['id']:
+        return f'ix_{table}_id'
+    return f'ix_{table}_{"_".join(columns)}'
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _set_aside(table: str, suffix: str, indexes: List[List[str]]) -> str:
+    """Rename a table out of the way, freeing its sequence, key and index names"""
+    old = f'{table}_{suffix}'
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY NONE')
+    for columns in indexes:
+        op.drop_index(_index_name(table, columns), table_name=table)
+    op.rename_table(table, old)
+    op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+    return old
+
+
+def _finish(table: str, old: str, key: str, columns: Callable, indexes: List[List[str]]):
+    names = [column.name for column in columns(True) if isinstance(column, sa.Column)]
+    selected = [f'COALESCE({name}, now())' if name == key else name for name in names]
+    op.execute(
+        f'INSERT INTO {table} ({", ".join(names)}) SELECT {", ".join(selected)} FROM {old}'
+    )
+    op.drop_table(old)
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    for index_columns in indexes:
+        op.create_index(_index_name(table, index_columns), table, index_columns, unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    for table, (key, columns, indexes) in TABLES.items():
+        oldest = conn.execute(sa.text(f'SELECT min({key}) FROM {table}')).scalar()
+        old = _set_aside(table, 'unpartitioned', indexes)
+
+        op.create_table(
+            table,
+            *columns(False),
+            sa.PrimaryKeyConstraint('id', key),
+            postgresql_partition_by=f'RANGE ({key})',
+        )
+        month = oldest.date().replace(day=1) if oldest is not None else current
+        while month <= _add_months(current, MONTHS_AHEAD):
+            op.execute(
+                f"CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                f"TO ('{_add_months(month, 1).isoformat()} 00:00:00+00')"
+            )
+            month = _add_months(month, 1)
+        # Catches rows outside every monthly range so inserts never fail
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+        _finish(table, old, key, columns, indexes)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    for table, (key, columns, indexes) in TABLES.items():
+        old = _set_aside(table, 'partitioned', indexes)
+        op.create_table(table, *columns(True), sa.PrimaryKeyConstraint('id'))
+        # Dropping the parent drops every partition with it
+        _finish(table, old, key, columns, indexes)
@@ -0,0 +1,54 @@
+"""Add ingredient search, blend composition and quote customer/status indexes
+
+Revision ID: e4c9a7d2b513
+Revises: b7e2f4a9c816
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c9a7d2b513'
+down_revision: Union[str, Sequence[str], None] = 'b7e2f4a9c816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_ingredients_name_lower',
+        'ingredients',
+        [sa.text('lower(name) varchar_pattern_ops')],
+        unique=False,
+    )
+    op.create_index(
+        'ix_ingredients_code_lower',
+        'ingredients',
+        [sa.text('lower(code) varchar_pattern_ops')],
+        unique=False,
+    )
+    op.create_index(
+        'ix_blend_ingredients_blend_id_ingredient_id',
+        'blend_ingredients',
+        ['blend_id', 'ingredient_id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_quotes_customer_id_status',
+        'quotes',
+        ['customer_id', 'status'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_quotes_customer_id_status', table_name='quotes')
+    op.drop_index('ix_blend_ingredients_blend_id_ingredient_id', table_name='blend_ingredients')
+    op.drop_index('ix_ingredients_code_lower', table_name='ingredients')
+    op.drop_index('ix_ingredients_name_lower', table_name='ingredients')
@@ -0,0 +1,37 @@
+"""Add table_versions change counters for catalog tables
+
+Revision ID: f1a8c3e6d402
+Revises: e4c9a7d2b513
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a8c3e6d402'
+down_revision: Union[str, Sequence[str], None] = 'e4c9a7d2b513'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table_versions = op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+    op.bulk_insert(
+        table_versions,
+        [{'table_name': name, 'version': 0} for name in ('ingredients', 'blends', 'chemicals')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_versions')
@@ -3,20 +3,22 @@ SurBlend Security Module
 JWT authentication and password hashing
 """
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-from typing import Dict, Optional
-from collections import defaultdict
+from typing import Deque, Dict, Optional, Tuple
+from collections import deque
 from functools import wraps
 from app.database import get_db
 from app.models import User, UserRole
 from app.schemas.schemas import TokenData
 from app.crud.users import get_user_by_username
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -66,7 +68,9 @@ def create_refresh_token(data: Dict[str, any]) -> str:
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(
+    request: Request, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+):
     """Get the current user from a JWT token"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -84,6 +88,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     user = get_user_by_username(db=db, username=token_data.username)
     if user is None:
         raise credentials_exception
+    # Read by the activity log middleware once the response is sent
+    request.state.user_id = user.id
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
@@ -110,34 +116,90 @@ require_sales = RoleChecker([UserRole.ADMIN, UserRole.SALES_REP])
 require_viewer = RoleChecker([UserRole.ADMIN, UserRole.SALES_REP, UserRole.VIEWER])
 
 class RateLimiter:
-    """Simple rate limiter for login attempts"""
+    """Sliding-window rate limiter keyed by client IP
+
+    Each call prunes its client's expired timestamps, and clients idle for a
+    whole ``period`` are swept out, so memory is bounded by the clients seen
+    in the last ``period`` seconds rather than every IP since startup.
+    """
     def __init__(self, calls: int = 20, period: int = 300):
         self.calls = calls
         self.period = period
-        self.calls_made = defaultdict(list)
+        self.calls_made: Dict[str, Deque[float]] = {}
+        self._next_sweep = 0.0
+
+    def _sweep(self, now: float):
+        cutoff = now - self.period
+        idle = [ip for ip, times in self.calls_made.items() if not times or times[-1] <= cutoff]
+        for ip in idle:
+            del self.calls_made[ip]
+        self._next_sweep = now + self.period
+
+    def _recent(self, client_ip: str, now: float) -> Deque[float]:
+        if now >= self._next_sweep:
+            self._sweep(now)
+        times = self.calls_made.setdefault(client_ip, deque())
+        while times and times[0] <= now - self.period:
+            times.popleft()
+        return times
+
+    def hit(self, client_ip: str) -> bool:
+        """Record a call; False when the client is over its limit"""
+        now = time.monotonic()
+        times = self._recent(client_ip, now)
+        if len(times) >= self.calls:
+            return False
+        times.append(now)
+        return True
+
+    def blocked(self, client_ip: str) -> bool:
+        """Whether the client is over its limit, without recording a call"""
+        return len(self._recent(client_ip, time.monotonic())) >= self.calls
+
+    def reset(self, client_ip: str):
+        """Forget the client's calls"""
+        self.calls_made.pop(client_ip, None)
 
     def __call__(self, func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
             request = kwargs.get("request")
-            if request:
-                client_ip = request.client.host
-                now = time.time()
-                # Clean old calls
-                self.calls_made[client_ip] = [
-                    call_time for call_time in self.calls_made[client_ip]
-                    if call_time > now - self.period
-                ]
-                # Check rate limit
-                if len(self.calls_made[client_ip]) >= self.calls:
-                    raise HTTPException(
-                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                        detail="Too many requests"
-                    )
-                # Record this call
-                self.calls_made[client_ip].append(now)
+            if request and request.client and not self.hit(request.client.host):
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests"
+                )
             return await func(*args, **kwargs)
         return wrapper
 
 # Create rate limiter for login endpoint
 login_rate_limiter = RateLimiter(calls=20, period=300)  # 20 attempts per 5 minutes
+
+class LoginLockout:
+    """Failed-login limiter that follows the security settings
+
+    The limiter is rebuilt only when ``max_login_attempts`` or
+    ``lockout_duration_minutes`` change, never reconfigured under concurrent
+    requests; a lockout duration of 0 disables lockout.
+    """
+    def __init__(self):
+        self._config: Optional[Tuple[int, int]] = None
+        self._limiter: Optional[RateLimiter] = None
+        self._lock = threading.Lock()
+
+    def limiter(self, max_attempts: int, lockout_minutes: int) -> Optional[RateLimiter]:
+        """Limiter for these settings, or None while lockout is disabled"""
+        if lockout_minutes == 0:
+            return None
+        with self._lock:
+            if self._config != (max_attempts, lockout_minutes):
+                self._limiter = RateLimiter(calls=max_attempts, period=lockout_minutes * 60)
+                self._config = (max_attempts, lockout_minutes)
+            return self._limiter
+
+    def clear(self):
+        with self._lock:
+            self._config = self._limiter = None
+
+# Failed logins per client and username
+login_lockout = LoginLockout()
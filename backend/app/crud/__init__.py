@@ -2,7 +2,7 @@
 """Database CRUD Operations Package"""
 from .blends import get_blends, get_blend_by_id, create_blend
 from .ingredients import get_ingredients, get_ingredient_by_id, create_ingredient
-from .customers import get_customers, get_customer_by_id, create_customer
+from .customers import get_customers, get_customer_by_id, get_customer_hierarchies, create_customer
 from .users import get_user_by_username
 from .quotes import get_quotes, get_quote_by_id, create_quote
 from .system import get_system_settings, get_system_setting_by_key, create_system_setting
@@ -1,5 +1,7 @@
-from sqlalchemy.orm import Session
-from app.models import Customer
+from typing import Iterable, List
+
+from sqlalchemy.orm import Session, raiseload, selectinload
+from app.models import Customer, Farm
 from app.schemas import schemas
 
 def get_customers(db: Session, skip: int = 0, limit: int = 100):
@@ -8,6 +10,22 @@ def get_customers(db: Session, skip: int = 0, limit: int = 100):
 def get_customer_by_id(db: Session, customer_id: int):
     return db.query(Customer).filter(Customer.id == customer_id).first()
 
+def get_customer_hierarchies(db: Session, customer_ids: Iterable[int]) -> List[Customer]:
+    """Customers with farms and fields loaded in three queries, whatever their size"""
+    ids = sorted(set(customer_ids))
+    if not ids:
+        return []
+    return (
+        db.query(Customer)
+        .options(
+            selectinload(Customer.farms).selectinload(Farm.fields),
+            raiseload("*"),
+        )
+        .filter(Customer.id.in_(ids))
+        .order_by(Customer.id)
+        .all()
+    )
+
 def create_customer(db: Session, customer: schemas.CustomerCreate):
     db_customer = Customer(**customer.dict())
     db.add(db_customer)
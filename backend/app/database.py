@@ -5,7 +5,9 @@ PostgreSQL connection and session management
 
 import logging
 import os
-from sqlalchemy import create_engine, text
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
@@ -34,11 +36,61 @@ engine = create_engine(
     echo=os.getenv("DB_ECHO", "false").lower() == "true",
 )
 
+# statement_timeout (ms) outside a request budget, e.g. jobs and maintenance; 0 = none
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", 0))
+
+# Set per request by QueryGuardMiddleware: the route's budget, and the DBAPI
+# connections the request has checked out so they can be cancelled
+statement_budget: ContextVar[Optional[int]] = ContextVar("statement_budget", default=None)
+request_connections: ContextVar[Optional[List]] = ContextVar("request_connections", default=None)
+
+
+@event.listens_for(engine, "checkout")
+def apply_statement_budget(dbapi_connection, connection_record, connection_proxy):
+    """Give the connection the current budget and track it for cancellation"""
+    budget = statement_budget.get()
+    budget = DB_STATEMENT_TIMEOUT if budget is None else budget
+    # Skip the round trip when the pooled connection already has this budget
+    if (
+        engine.dialect.name == "postgresql"
+        and connection_record.info.get("statement_timeout") != budget
+    ):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET statement_timeout = {int(budget)}")
+        cursor.close()
+        # Committed so the pool's reset-on-return rollback does not undo it
+        dbapi_connection.commit()
+        connection_record.info["statement_timeout"] = budget
+
+    tracked = request_connections.get()
+    if tracked is not None:
+        tracked.append(dbapi_connection)
+        connection_record.info["tracked_by"] = tracked
+
+
+@event.listens_for(engine, "checkin")
+def untrack_connection(dbapi_connection, connection_record):
+    tracked = connection_record.info.pop("tracked_by", None)
+    if tracked is not None and dbapi_connection in tracked:
+        tracked.remove(dbapi_connection)
+
+
+def cancel_query(dbapi_connection):
+    """Abort whatever the connection is running, from any thread"""
+    # psycopg2 sends a cancel request (as pg_cancel_backend would); sqlite3 interrupts
+    cancel = getattr(dbapi_connection, "cancel", None) or getattr(
+        dbapi_connection, "interrupt", None
+    )
+    if cancel is not None:
+        cancel()
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Import models to ensure they're registered
 from app.models import Base
+# Registers the session events that bump catalog table versions
+from app.services import table_versions  # noqa: E402,F401
 
 def get_db():
     """Dependency to get database session"""
@@ -9,19 +9,26 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
+from app.services.access_log import AccessLogMiddleware, configure_logging
+from app.services.admission import AdmissionMiddleware
+from app.services.activity import ActivityLogMiddleware, activity_recorder
+from app.services.monitor import read_state
+from app.services.profiling import ProfilerMiddleware
+from app.services.query_guard import QueryGuardMiddleware, query_canceled_handler
 from app.services.startup import initialize_database
-from app.routes import analytics, blends, customers, ingredients, quotes, system, users
+from app.routes import (
+    analytics, blends, chemicals, customers, ingredients, jobs, quotes, system, users
+)
 from dotenv import load_dotenv
+from sqlalchemy.exc import OperationalError
 import psutil
 from datetime import datetime
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Configure logging: JSON lines, written by a background thread
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Define lifespan function before app instantiation
@@ -30,8 +37,10 @@ async def lifespan(app: FastAPI):
     """Handle startup and shutdown events"""
     logger.info("Starting SurBlend application...")
     await initialize_database()
+    activity_recorder.start()
     yield
     logger.info("Shutting down SurBlend application...")
+    await activity_recorder.stop()
 
 # Create FastAPI app
 app = FastAPI(
@@ -41,15 +50,36 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# Configure CORS
+# Audit log for mutations, written behind the request in batches
+app.add_middleware(
+    ActivityLogMiddleware,
+    prefixes={"/api/ingredients": "ingredient", "/api/blends": "blend", "/api/users": "user"},
+)
+
+# statement_timeout budget per route class; reads are cancelled if the client leaves
+app.add_middleware(QueryGuardMiddleware)
+app.add_exception_handler(OperationalError, query_canceled_handler)
+
+# Admin-only sampling profile of a single request (?profile=1 or X-Profile: 1)
+app.add_middleware(ProfilerMiddleware)
+
+# Per-route-class concurrency limits; overload is shed with 503 + Retry-After
+app.add_middleware(AdmissionMiddleware)
+
+# CORS wraps everything below, so 503s from load shedding reach the
+# frontend with allow-origin and a readable Retry-After
 app.add_middleware(
     CORSMiddleware,
     allow_origins=os.getenv("CORS_ORIGINS", "").split(","),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
+# Outermost: request id and access log line for every request
+app.add_middleware(AccessLogMiddleware)
+
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/users/token")
 
@@ -61,30 +91,49 @@ async def root():
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    """System health check endpoint"""
-    cpu_percent = psutil.cpu_percent(interval=1)
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage("/")
+    """System health check endpoint
+
+    Reports the resident monitor's published state; if the monitor is not
+    running, falls back to instantaneous readings (never blocks the loop).
+    """
+    state = read_state()
+    if state is None:
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage("/")
+        return {
+            "status": "healthy",
+            "timestamp": datetime.utcnow().isoformat(),
+            "system": {
+                "cpu_percent": psutil.cpu_percent(interval=None),
+                "memory_percent": memory.percent,
+                "memory_available_mb": memory.available / 1024 / 1024,
+                "disk_percent": disk.percent,
+                "disk_free_gb": disk.free / 1024 / 1024 / 1024,
+            },
+            "monitor": None,
+        }
     return {
-        "status": "healthy",
+        "status": "degraded" if state["alerts"] else "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "system": {
-            "cpu_percent": cpu_percent,
-            "memory_percent": memory.percent,
-            "memory_available_mb": memory.available / 1024 / 1024,
-            "disk_percent": disk.percent,
-            "disk_free_gb": disk.free / 1024 / 1024 / 1024,
+        "system": state["latest"],
+        "monitor": {
+            "summary": state["summary"],
+            "services": state["services"],
+            "governor": state["governor"],
+            "alerts": state["alerts"],
         },
     }
 
 # Include routers
 app.include_router(ingredients.router, prefix="/api/ingredients", tags=["ingredients"])
 app.include_router(blends.router, prefix="/api/blends", tags=["blends"])
+app.include_router(chemicals.router, prefix="/api/chemicals", tags=["chemicals"])
 app.include_router(customers.router, prefix="/api/customers", tags=["customers"])
 app.include_router(quotes.router, prefix="/api/quotes", tags=["quotes"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
 app.include_router(system.router, prefix="/api/system", tags=["system"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,2 +1,2 @@
-from .models import Base, Ingredient, Chemical, IngredientType, QuoteStatus, UserRole, User, Blend, Customer, Quote, Tag, SystemSetting, ActivityLog
+from .models import Base, Ingredient, Chemical, IngredientType, QuoteStatus, JobStatus, UserRole, User, Blend, Customer, Quote, Tag, SystemSetting, ActivityLog, Farm, Field, PriceHistory, blend_ingredients, blend_chemicals, Job, TableVersion
 
@@ -4,12 +4,14 @@ from datetime import datetime
 from sqlalchemy import (
     DECIMAL,
     JSON,
+    BigInteger,
     Boolean,
     Column,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
@@ -37,6 +39,13 @@ class QuoteStatus(str, enum.Enum):
     REJECTED = "rejected"
     EXPIRED = "expired"
 
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
 # Association tables
 blend_ingredients = Table(
     "blend_ingredients",
@@ -45,6 +54,8 @@ blend_ingredients = Table(
     Column("ingredient_id", Integer, ForeignKey("ingredients.id")),
     Column("percentage", Float, nullable=False),
     Column("amount", Float, nullable=False),
+    # Composition lookups by blend (dump_blends, analysis batches)
+    Index("ix_blend_ingredients_blend_id_ingredient_id", "blend_id", "ingredient_id"),
 )
 
 blend_chemicals = Table(
@@ -125,6 +136,20 @@ class Ingredient(Base):
     # Relationships
     price_history = relationship("PriceHistory", back_populates="ingredient")
 
+    # Case-insensitive prefix search (pattern ops so LIKE 'abc%' can use them on Postgres)
+    __table_args__ = (
+        Index(
+            "ix_ingredients_name_lower",
+            func.lower(name).label("name_lower"),
+            postgresql_ops={"name_lower": "varchar_pattern_ops"},
+        ),
+        Index(
+            "ix_ingredients_code_lower",
+            func.lower(code).label("code_lower"),
+            postgresql_ops={"code_lower": "varchar_pattern_ops"},
+        ),
+    )
+
 class Chemical(Base):
     __tablename__ = "chemicals"
 
@@ -145,9 +170,15 @@ class PriceHistory(Base):
     old_price = Column(DECIMAL(10, 2))
     new_price = Column(DECIMAL(10, 2))
     changed_by = Column(Integer, ForeignKey("users.id"))
-    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Monthly partition key on PostgreSQL (see app.services.partitions)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     reason = Column(Text)
 
+    # As-of price lookups seek by ingredient, then by time
+    __table_args__ = (
+        Index("ix_price_history_ingredient_changed_at", "ingredient_id", "changed_at"),
+    )
+
     # Relationships
     ingredient = relationship("Ingredient", back_populates="price_history")
 
@@ -314,6 +345,9 @@ class Quote(Base):
     blend = relationship("Blend", back_populates="quotes")
     created_by_user = relationship("User", back_populates="quotes")
 
+    # Quote list filtered by customer, optionally by status
+    __table_args__ = (Index("ix_quotes_customer_id_status", "customer_id", "status"),)
+
 class Tag(Base):
     __tablename__ = "tags"
 
@@ -350,7 +384,50 @@ class ActivityLog(Base):
     entity_id = Column(Integer)
     details = Column(JSON)
     ip_address = Column(String(45))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Monthly partition key on PostgreSQL (see app.services.partitions)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="activity_logs")
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(100), nullable=False)
+    payload = Column(JSON)
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    priority = Column(Integer, default=0, nullable=False)
+
+    # Retries: a failed attempt is requeued with run_after pushed back
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Claim held by a worker; a stale heartbeat means the worker died
+    locked_by = Column(String(100))
+    locked_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+    cancel_requested = Column(Boolean, default=False, nullable=False)
+
+    # Progress and outcome
+    progress = Column(Float, default=0.0, nullable=False)  # 0.0 - 1.0
+    progress_message = Column(String(255))
+    result = Column(JSON)
+    error = Column(Text)
+
+    created_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True))
+
+    # Dequeue scans queued jobs that are due
+    __table_args__ = (Index("ix_jobs_status_run_after", "status", "run_after"),)
+
+class TableVersion(Base):
+    """Change counter of a table, bumped in the same transaction as each write to it"""
+
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, default=0, nullable=False)
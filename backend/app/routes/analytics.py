@@ -5,10 +5,12 @@ from sqlalchemy.orm import Session
 
 from app.auth.security import get_current_active_user
 from app.database import get_db
+from app.services.cache import response_cache
 
 router = APIRouter()
 
 
 @router.get("/dashboard")
+@response_cache.cached("analytics", ttl=60, stale_ttl=300)
 async def get_dashboard_stats(db: Session = Depends(get_db)):
     return {"message": "Analytics endpoint"}
@@ -1,18 +1,109 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import Blend, Ingredient, Chemical
-from app.schemas import BlendCreate, BlendResponse
-from typing import List
+from app.models import Blend, Ingredient, Chemical, blend_ingredients, blend_chemicals
+from app.schemas.schemas import BlendCreate, BlendResponse, KeysetPage
+from app.services.cache import response_cache
+from app.services.conditional import CatalogVersion
+from app.services.price_history import blend_cost_history, blend_costs_as_of
+from app.services.serialization import (
+    FastJSONResponse,
+    blend_serializer,
+    dump_blends,
+    dump_json,
+    json_response,
+)
+from typing import List, Optional, Tuple
 
-router = APIRouter(prefix="/api/blends", tags=["blends"])
+router = APIRouter(tags=["blends"])  # Prefix is applied in main.py
 
-@router.get("/", response_model=List[BlendResponse])
-def get_blends(db: Session = Depends(get_db)):
-    blends = db.query(Blend).all()
-    return blends
+MAX_PAGE_SIZE = 200
 
-@router.post("/", response_model=BlendResponse)
+@response_cache.cached("blends", ttl=30)
+def _blend_page(
+    db: Session,
+    version: Tuple[int, ...],
+    after: Optional[int],
+    size: int,
+    is_template: Optional[bool],
+    is_active: Optional[bool],
+) -> bytes:
+    """Rendered keyset page of blends, read as Core rows straight into JSON"""
+    stmt = blend_serializer.select()
+    if is_template is not None:
+        stmt = stmt.where(Blend.is_template == is_template)
+    if is_active is not None:
+        stmt = stmt.where(Blend.is_active == is_active)
+    if after is not None:
+        stmt = stmt.where(Blend.id > after)
+
+    # Fetch one extra row to learn whether another page exists
+    rows = db.execute(stmt.order_by(Blend.id).limit(size + 1)).all()
+    has_more = len(rows) > size
+    rows = rows[:size]
+
+    items = dump_blends(db, rows)
+    return dump_json(
+        {
+            "items": items,
+            "size": size,
+            "next_cursor": items[-1]["id"] if has_more else None,
+        }
+    )
+
+@router.get("/", response_model=KeysetPage[BlendResponse], response_class=FastJSONResponse)
+def get_blends(
+    response: Response,
+    after: Optional[int] = Query(None, description="Cursor: id of the last blend already seen"),
+    size: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    is_template: Optional[bool] = None,
+    is_active: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    # Analysis and cost depend on the ingredient catalog as well
+    version: Tuple[int, ...] = Depends(CatalogVersion(Blend, Ingredient)),
+):
+    """Keyset-paginated blend list with composition and calculated analysis"""
+    body = _blend_page(
+        db=db,
+        version=version,
+        after=after,
+        size=size,
+        is_template=is_template,
+        is_active=is_active,
+    )
+    return json_response(body, response)
+
+@router.get("/cost/as-of")
+def get_blend_costs_as_of(
+    as_of: datetime, blend_ids: List[int] = Query(...), db: Session = Depends(get_db)
+):
+    """Ingredient cost per ton of each blend at a point in time"""
+    return {"as_of": as_of, "costs": blend_costs_as_of(db, blend_ids, as_of)}
+
+@router.get("/cost/history")
+def get_blend_cost_history(
+    start: datetime,
+    end: Optional[datetime] = None,
+    blend_ids: List[int] = Query(...),
+    db: Session = Depends(get_db),
+):
+    """Step series of each blend's cost per ton between two dates"""
+    end = end or datetime.now(timezone.utc)
+    try:
+        history = blend_cost_history(db, blend_ids, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "start": start,
+        "end": end,
+        "history": {
+            blend_id: [{"at": at, "cost_per_ton": cost} for at, cost in points]
+            for blend_id, points in history.items()
+        },
+    }
+
+@router.post("/", response_model=BlendResponse, response_class=FastJSONResponse)
 def create_blend(blend: BlendCreate, db: Session = Depends(get_db)):
     db_blend = Blend(
         name=blend.name,
@@ -60,4 +151,6 @@ def create_blend(blend: BlendCreate, db: Session = Depends(get_db)):
             )
         )
     db.commit()
-    return db_blend
+    response_cache.invalidate("blends")
+    rows = db.execute(blend_serializer.select().where(Blend.id == db_blend.id)).all()
+    return FastJSONResponse(dump_blends(db, rows)[0])
@@ -2,19 +2,23 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import Chemical
-from app.schemas import ChemicalCreate, ChemicalResponse
-from typing import List
+from app.schemas.schemas import ChemicalCreate, ChemicalResponse
+from app.services.conditional import CatalogVersion
+from typing import List, Tuple
 
-router = APIRouter(prefix="/api/chemicals", tags=["chemicals"])
+router = APIRouter(tags=["chemicals"])  # Prefix is applied in main.py
 
 @router.get("/", response_model=List[ChemicalResponse])
-def get_chemicals(db: Session = Depends(get_db)):
-    chemicals = db.query(Chemical).all()
+def get_chemicals(
+    db: Session = Depends(get_db),
+    version: Tuple[int, ...] = Depends(CatalogVersion(Chemical)),
+):
+    chemicals = db.query(Chemical).order_by(Chemical.display_order, Chemical.id).all()
     return chemicals
 
 @router.post("/", response_model=ChemicalResponse)
 def create_chemical(chemical: ChemicalCreate, db: Session = Depends(get_db)):
-    db_chemical = Chemical(**chemical.dict())
+    db_chemical = Chemical(**chemical.model_dump())
     db.add(db_chemical)
     db.commit()
     db.refresh(db_chemical)
@@ -1,14 +1,103 @@
 # backend/app/routes/customers.py
 """Customers API Routes"""
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.auth.security import get_current_active_user
+from app.crud.customers import get_customer_hierarchies
 from app.database import get_db
+from app.models import Customer, User
+from app.schemas.schemas import CustomerHierarchy
+from app.services.recommendations import build_plan
 
 router = APIRouter()
 
+# Upper bound on customers per bulk hierarchy request
+MAX_BULK_CUSTOMERS = 500
+
 
 @router.get("/")
 async def get_customers(db: Session = Depends(get_db)):
     return {"message": "Customers endpoint"}
+
+
+@router.get("/hierarchy")
+def get_customer_hierarchy_bulk(
+    ids: List[int] = Query(..., description="Customer ids"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Stream customers with their farms and fields as newline-delimited JSON"""
+    if len(ids) > MAX_BULK_CUSTOMERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BULK_CUSTOMERS} customers per request",
+        )
+
+    # Everything is loaded up front so the stream never touches the session
+    customers = get_customer_hierarchies(db, ids)
+
+    def rows():
+        for customer in customers:
+            yield CustomerHierarchy.model_validate(customer).model_dump_json(exclude_none=True)
+            yield "\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+@router.get("/recommendations")
+def get_territory_recommendations(
+    customer_ids: Optional[List[int]] = Query(None),
+    state: Optional[str] = None,
+    blend_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Fertilizer plan for every field of several customers or a whole state"""
+    if customer_ids is None and state is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide customer_ids or state",
+        )
+    try:
+        return build_plan(db, customer_ids=customer_ids, state=state, blend_id=blend_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/{customer_id}/recommendations")
+def get_customer_recommendations(
+    customer_id: int,
+    blend_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Fertilizer plan for every field of one customer"""
+    if db.get(Customer, customer_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found")
+    try:
+        return build_plan(db, customer_ids=[customer_id], blend_id=blend_id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get(
+    "/{customer_id}", response_model=CustomerHierarchy, response_model_exclude_none=True
+)
+def get_customer(
+    customer_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Get a customer with all farms and fields"""
+    customers = get_customer_hierarchies(db, [customer_id])
+    if not customers:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found")
+    return customers[0]
@@ -5,46 +5,112 @@ Ingredients API Routes
 import csv
 import io
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
 
 from app.auth.security import get_current_active_user, require_sales
 from app.crud import ingredients as crud_ingredients
 from app.database import get_db
-from app.models import Ingredient, User
+from app.models import Ingredient, PriceHistory, User
 from app.schemas.schemas import (
     IngredientCreate,
     IngredientResponse,
     IngredientUpdate,
     PaginatedResponse,
 )
+from app.services.cache import response_cache
+from app.services.conditional import CatalogVersion
+from app.services.jobs import enqueue
+from app.services.price_history import ingredient_prices_as_of, price_changes_between
+from app.services.serialization import (
+    FastJSONResponse,
+    dump_json,
+    ingredient_serializer,
+    json_response,
+)
 
 router = APIRouter()
 
 
-@router.get("/", response_model=PaginatedResponse[IngredientResponse])
-async def get_ingredients(
-    page: int = 1,
-    size: int = 20,
+def ingredient_filters(search: Optional[str], is_available: Optional[bool]) -> list:
+    """WHERE conditions for the ingredient list
+
+    ``search`` is a case-insensitive prefix of the name or code, matched as
+    ``lower(col) LIKE 'term%'`` so the ``ix_ingredients_*_lower`` indexes apply.
+    """
+    conditions = []
+    if search:
+        pattern = (
+            search.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        )
+        conditions.append(
+            or_(
+                func.lower(Ingredient.name).like(pattern, escape="\\"),
+                func.lower(Ingredient.code).like(pattern, escape="\\"),
+            )
+        )
+    if is_available is not None:
+        conditions.append(Ingredient.is_available == is_available)
+    return conditions
+
+
+@response_cache.cached("ingredients", ttl=30)
+def _ingredient_page(
+    db: Session,
+    version: Tuple[int, ...],
+    page: int,
+    size: int,
+    search: Optional[str],
+    is_available: Optional[bool],
+) -> bytes:
+    """Rendered ingredient page, read as Core rows straight into JSON
+
+    ``version`` only keys the cache, so writes from any process start a new entry.
+    """
+    conditions = ingredient_filters(search, is_available)
+    total = db.execute(select(func.count(Ingredient.id)).where(*conditions)).scalar_one()
+    rows = db.execute(
+        ingredient_serializer.select()
+        .where(*conditions)
+        .order_by(Ingredient.id)
+        .offset((page - 1) * size)
+        .limit(size)
+    )
+
+    return dump_json(
+        {
+            "items": ingredient_serializer.dump_all(rows),
+            "total": total,
+            "page": page,
+            "size": size,
+            "pages": (total + size - 1) // size,
+        }
+    )
+
+
+@router.get(
+    "/",
+    response_model=PaginatedResponse[IngredientResponse],
+    response_class=FastJSONResponse,
+)
+def get_ingredients(
+    response: Response,
+    page: int = Query(1, ge=1),
+    size: int = Query(20, ge=1, le=200),
     search: Optional[str] = None,
     is_available: Optional[bool] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
+    version: Tuple[int, ...] = Depends(CatalogVersion(Ingredient)),
 ):
     """Get paginated list of ingredients"""
-    # TODO: Implement pagination and filtering
-    total = db.query(Ingredient).count()
-    ingredients = db.query(Ingredient).offset((page - 1) * size).limit(size).all()
-
-    return {
-        "items": ingredients,
-        "total": total,
-        "page": page,
-        "size": size,
-        "pages": (total + size - 1) // size,
-    }
+    body = _ingredient_page(
+        db=db, version=version, page=page, size=size, search=search, is_available=is_available
+    )
+    return json_response(body, response)
 
 
 @router.get("/{ingredient_id}", response_model=IngredientResponse)
@@ -84,6 +150,8 @@ async def create_ingredient(
     db.add(db_ingredient)
     db.commit()
     db.refresh(db_ingredient)
+    response_cache.invalidate("ingredients")
+    response_cache.invalidate("blends")  # blend analysis reads the catalog
 
     return db_ingredient
 
@@ -102,11 +170,27 @@ async def update_ingredient(
 
     # Update only provided fields
     update_data = ingredient_update.dict(exclude_unset=True)
+
+    # Record price changes so historical quotes can be re-priced as of any date
+    new_price = update_data.get("cost_per_ton")
+    if new_price is not None and new_price != ingredient.cost_per_ton:
+        db.add(
+            PriceHistory(
+                ingredient_id=ingredient.id,
+                old_price=ingredient.cost_per_ton,
+                new_price=new_price,
+                changed_by=current_user.id,
+                reason="Ingredient update",
+            )
+        )
+
     for field, value in update_data.items():
         setattr(ingredient, field, value)
 
     db.commit()
     db.refresh(ingredient)
+    response_cache.invalidate("ingredients")
+    response_cache.invalidate("blends")
 
     return ingredient
 
@@ -125,57 +209,33 @@ async def delete_ingredient(
 
     db.delete(ingredient)
     db.commit()
+    response_cache.invalidate("ingredients")
+    response_cache.invalidate("blends")
 
     return {"message": "Ingredient deleted successfully"}
 
 
-@router.post("/import")
+@router.post("/import", status_code=status.HTTP_202_ACCEPTED)
 async def import_ingredients(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_sales),
 ):
-    """Import ingredients from CSV file"""
+    """Queue an ingredient import from a CSV file; poll /api/jobs/{job_id}"""
     if not file.filename.endswith(".csv"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Only CSV files are supported"
         )
 
     contents = await file.read()
-    csv_data = csv.DictReader(io.StringIO(contents.decode("utf-8")))
-
-    imported = 0
-    errors = []
-
-    for row_num, row in enumerate(csv_data, start=2):
-        try:
-            # Validate and create ingredient
-            ingredient_data = {
-                "name": row["name"],
-                "code": row.get("code"),
-                "type": row["type"],
-                "nitrogen": float(row.get("nitrogen", 0)),
-                "phosphate": float(row.get("phosphate", 0)),
-                "potash": float(row.get("potash", 0)),
-                "cost_per_ton": float(row["cost_per_ton"]),
-                # Add other fields as needed
-            }
-
-            ingredient = Ingredient(**ingredient_data)
-            db.add(ingredient)
-            imported += 1
-
-        except Exception as e:
-            errors.append(f"Row {row_num}: {str(e)}")
-
-    if imported > 0:
-        db.commit()
+    job = enqueue(
+        db,
+        "ingredients.import",
+        {"csv": contents.decode("utf-8"), "filename": file.filename},
+        created_by=current_user.id,
+    )
 
-    return {
-        "imported": imported,
-        "errors": errors,
-        "message": f"Successfully imported {imported} ingredients",
-    }
+    return {"job_id": job.id, "status": job.status, "message": "Import queued"}
 
 
 @router.get("/export/csv")
@@ -230,3 +290,37 @@ async def export_ingredients(
         "content": output.getvalue(),
         "content_type": "text/csv",
     }
+
+
+@router.get("/prices/as-of")
+async def get_ingredient_prices_as_of(
+    as_of: datetime,
+    ingredient_ids: List[int] = Query(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Cost per ton of each ingredient in effect at a point in time"""
+    return {"as_of": as_of, "prices": ingredient_prices_as_of(db, ingredient_ids, as_of)}
+
+
+@router.get("/prices/changes")
+async def get_ingredient_price_changes(
+    start: datetime,
+    end: datetime,
+    ingredient_ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Price changes recorded in ``[start, end)``"""
+    changes = price_changes_between(db, start, end, ingredient_ids)
+    return [
+        {
+            "ingredient_id": change.ingredient_id,
+            "old_price": change.old_price,
+            "new_price": change.new_price,
+            "changed_by": change.changed_by,
+            "changed_at": change.changed_at,
+            "reason": change.reason,
+        }
+        for change in changes
+    ]
@@ -0,0 +1,71 @@
+# backend/app/routes/jobs.py
+"""Background Job API Routes"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.auth.security import get_current_active_user
+from app.database import get_db
+from app.models import Job, JobStatus, User, UserRole
+from app.schemas.schemas import JobResponse
+from app.services.job_events import job_events
+from app.services.jobs import request_cancel
+
+router = APIRouter()
+
+
+def get_visible_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Job:
+    """A job the current user queued; admins see every job"""
+    job = db.get(Job, job_id)
+    if job is None or (
+        current_user.role != UserRole.ADMIN and job.created_by != current_user.id
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.get("/", response_model=List[JobResponse])
+def get_jobs(
+    status: Optional[JobStatus] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """The current user's jobs, newest first"""
+    query = select(Job).where(Job.created_by == current_user.id)
+    if status is not None:
+        query = query.where(Job.status == status)
+    return db.scalars(query.order_by(Job.id.desc()).limit(limit)).all()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(job: Job = Depends(get_visible_job)):
+    """Status, progress and result of a job"""
+    return job
+
+
+@router.get("/{job_id}/events")
+def stream_job_events(request: Request, job: Job = Depends(get_visible_job)):
+    """Server-sent events: ``progress``, ``partial`` and a final ``complete``"""
+    return StreamingResponse(
+        job_events.events(job.id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+def cancel_job(job: Job = Depends(get_visible_job), db: Session = Depends(get_db)):
+    """Cancel a queued job, or ask a running one to stop"""
+    if job.status not in (JobStatus.QUEUED, JobStatus.RUNNING):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=f"Job already {job.status.value}"
+        )
+    return request_cancel(db, job)
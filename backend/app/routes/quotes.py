@@ -1,14 +1,60 @@
 # backend/app/routes/quotes.py
 """Quotes API Routes"""
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.auth.security import get_current_active_user
 from app.database import get_db
+from app.models import Quote, QuoteStatus, User
+from app.schemas.schemas import PaginatedResponse, QuoteResponse
+from app.services.serialization import FastJSONResponse, quote_serializer
 
 router = APIRouter()
 
 
-@router.get("/")
-async def get_quotes(db: Session = Depends(get_db)):
-    return {"message": "Quotes endpoint"}
+def quote_filters(status: Optional[QuoteStatus], customer_id: Optional[int]) -> list:
+    """WHERE conditions for the quote list (served by ix_quotes_customer_id_status)"""
+    conditions = []
+    if status is not None:
+        conditions.append(Quote.status == status)
+    if customer_id is not None:
+        conditions.append(Quote.customer_id == customer_id)
+    return conditions
+
+
+@router.get(
+    "/",
+    response_model=PaginatedResponse[QuoteResponse],
+    response_class=FastJSONResponse,
+)
+def get_quotes(
+    page: int = Query(1, ge=1),
+    size: int = Query(20, ge=1, le=200),
+    status: Optional[QuoteStatus] = None,
+    customer_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Get paginated list of quotes, newest first"""
+    conditions = quote_filters(status, customer_id)
+    total = db.execute(select(func.count(Quote.id)).where(*conditions)).scalar_one()
+    rows = db.execute(
+        quote_serializer.select()
+        .where(*conditions)
+        .order_by(Quote.id.desc())
+        .offset((page - 1) * size)
+        .limit(size)
+    )
+
+    return FastJSONResponse(
+        {
+            "items": quote_serializer.dump_all(rows),
+            "total": total,
+            "page": page,
+            "size": size,
+            "pages": (total + size - 1) // size,
+        }
+    )
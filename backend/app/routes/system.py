@@ -1,14 +1,180 @@
 # backend/app/routes/system.py
 """System API Routes"""
-from fastapi import APIRouter, Depends
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.auth.security import require_admin
+from app.auth.security import get_current_active_user, require_admin
 from app.database import get_db
+from app.models import Job, User
+from app.schemas.schemas import SystemSettingUpdate
+from app.services.activity import activity_between, activity_recorder
+from app.services.admission import admission_controller
+from app.services.cache import response_cache
+from app.services.governor import LEVELS
+from app.services.memory import GROUP_BY, memory_tracker
+from app.services.monitor import read_state
+from app.services.profiling import profile_store
+from app.services.settings import SETTING_MODELS, settings_store
 
 router = APIRouter()
 
 
 @router.get("/settings")
-async def get_settings(db: Session = Depends(get_db)):
-    return {"message": "System settings endpoint"}
+async def get_settings(
+    db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """All system settings, keyed by name"""
+    return settings_store.all(db)
+
+
+@router.get("/settings/{key}")
+async def get_setting(
+    key: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """A single system setting"""
+    if key not in SETTING_MODELS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown setting")
+    return settings_store.get(db, key)
+
+
+@router.put("/settings/{key}")
+async def update_setting(
+    key: str,
+    update: SystemSettingUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    """Validate and store a system setting"""
+    if key not in SETTING_MODELS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown setting")
+    try:
+        return settings_store.set(db, key, update.value)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors(include_url=False)
+        )
+
+
+@router.get("/cache")
+async def get_cache_stats(current_user: User = Depends(require_admin)):
+    """Response cache hit/miss counters for this worker"""
+    return response_cache.stats()
+
+
+@router.delete("/cache")
+async def clear_cache(current_user: User = Depends(require_admin)):
+    """Drop every cached response in this worker"""
+    return {"cleared": response_cache.invalidate()}
+
+
+@router.get("/activity")
+async def get_activity_stats(current_user: User = Depends(require_admin)):
+    """Audit log write-behind queue counters for this worker"""
+    return activity_recorder.stats()
+
+
+@router.get("/activity/log")
+async def get_activity_log(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    entity_type: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    """Audit log entries in ``[start, end)``, newest first (default: last 7 days)"""
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=7)
+    return [
+        {
+            "id": entry.id,
+            "user_id": entry.user_id,
+            "action": entry.action,
+            "entity_type": entry.entity_type,
+            "entity_id": entry.entity_id,
+            "details": entry.details,
+            "ip_address": entry.ip_address,
+            "created_at": entry.created_at,
+        }
+        for entry in activity_between(db, start, end, user_id, entity_type, limit)
+    ]
+
+
+@router.get("/profiles")
+async def list_profiles(current_user: User = Depends(require_admin)):
+    """Names of stored request profiles (``?profile=1``), newest first"""
+    return profile_store.names()
+
+
+@router.get("/profiles/{name}")
+async def get_profile(
+    name: str,
+    format: str = Query("json", pattern="^(json|folded)$"),
+    current_user: User = Depends(require_admin),
+):
+    """A request profile: the JSON summary, or collapsed stacks for a flamegraph"""
+    path = profile_store.path(name, f".{format}")
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    media_type = "application/json" if format == "json" else "text/plain"
+    return FileResponse(path, media_type=media_type)
+
+
+@router.get("/memory")
+async def get_memory_stats(current_user: User = Depends(require_admin)):
+    """RSS, GC and tracemalloc state of the worker that served this request"""
+    return memory_tracker.stats()
+
+
+@router.post("/memory/snapshot")
+async def take_memory_snapshot(
+    limit: int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", pattern=f"^({'|'.join(GROUP_BY)})$"),
+    current_user: User = Depends(require_admin),
+):
+    """Top allocation growth since this worker's previous snapshot
+
+    The first call starts tracemalloc; call again after some traffic. Each
+    uvicorn worker traces separately, so compare snapshots with the same pid.
+    """
+    return await asyncio.to_thread(memory_tracker.snapshot, limit, group_by)
+
+
+@router.delete("/memory/snapshot")
+async def stop_memory_tracing(current_user: User = Depends(require_admin)):
+    """Stop tracemalloc in this worker"""
+    return {"stopped": memory_tracker.stop()}
+
+
+@router.get("/admission")
+async def get_admission_stats(current_user: User = Depends(require_admin)):
+    """Running, queued, admitted and shed requests per route class in this worker"""
+    return admission_controller.stats()
+
+
+@router.get("/governor")
+def get_governor(
+    db: Session = Depends(get_db), current_user: User = Depends(require_admin)
+) -> Dict[str, Any]:
+    """Background-work throttle level and the job queue it holds back
+
+    ``governor`` is None while the monitor is not running; the worker then
+    judges the level itself.
+    """
+    state = read_state()
+    jobs = db.execute(select(Job.status, func.count()).group_by(Job.status)).all()
+    return {
+        "governor": state["governor"] if state else None,
+        "levels": LEVELS,
+        "jobs": {job_status.value: count for job_status, count in jobs},
+    }
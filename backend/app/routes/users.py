@@ -1,24 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.auth.security import get_current_active_user, create_access_token, verify_password, login_rate_limiter
+from app.auth.security import (
+    create_access_token,
+    get_current_active_user,
+    login_lockout,
+    login_rate_limiter,
+    verify_password,
+)
 from app.models import User
-from app.schemas.schemas import UserResponse, Token
+from app.schemas.schemas import SecuritySettings, UserResponse, Token
+from app.services.settings import settings_store
 
 router = APIRouter(tags=["users"])  # Removed prefix="/api/users"
 
 @router.post("/token", response_model=Token)
 @login_rate_limiter
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+):
+    security = settings_store.typed(db, SecuritySettings)
+    lockout = login_lockout.limiter(
+        security.max_login_attempts, security.lockout_duration_minutes
+    )
+    attempt = f"{request.client.host if request.client else ''}:{form_data.username}"
+    if lockout is not None and lockout.blocked(attempt):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed logins; try again later",
+        )
+
     user = db.query(User).filter(User.username == form_data.username).first()
     if not user or not verify_password(form_data.password, user.hashed_password):
+        if lockout is not None:
+            lockout.hit(attempt)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": user.username, "role": user.role})
+    if lockout is not None:
+        lockout.reset(attempt)
+    access_token = create_access_token(
+        data={"sub": user.username, "role": user.role},
+        expires_delta=timedelta(minutes=security.session_timeout_minutes),
+    )
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
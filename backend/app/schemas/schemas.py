@@ -8,10 +8,10 @@ from decimal import Decimal
 from enum import Enum
 from typing import Any, Dict, List, Optional, Generic, TypeVar
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, validator
+from pydantic import AliasChoices, BaseModel, ConfigDict, EmailStr, Field, validator
 
 # Import enums from models
-from app.models import IngredientType, QuoteStatus, UserRole
+from app.models import IngredientType, JobStatus, QuoteStatus, UserRole
 
 
 # Base schemas with common configuration
@@ -34,7 +34,7 @@ class UserBase(BaseModel):
     username: str = Field(..., min_length=3, max_length=50)
     email: EmailStr
     full_name: Optional[str] = Field(None, max_length=100)
-    role: UserRole = UserRole.USER
+    role: UserRole = UserRole.VIEWER
 
 
 class UserCreate(UserBase):
@@ -138,6 +138,33 @@ class IngredientResponse(IngredientBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+
+# Chemical schemas
+class ChemicalBase(BaseModel):
+    name: str = Field(..., max_length=100)
+    # The blend calculator posts camelCase keys
+    ai_percentage: Decimal = Field(
+        ..., ge=0, le=100, validation_alias=AliasChoices("ai_percentage", "aiPercentage")
+    )
+    cost_per_unit: Decimal = Field(
+        ..., ge=0, validation_alias=AliasChoices("cost_per_unit", "costPerUnit")
+    )
+    display_order: int = Field(
+        default=0, validation_alias=AliasChoices("display_order", "displayOrder")
+    )
+    notes: Optional[str] = None
+
+
+class ChemicalCreate(ChemicalBase):
+    pass
+
+
+class ChemicalResponse(ChemicalBase):
+    id: int
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
 T = TypeVar("T")  # Define the generic type variable
 
 class PaginatedResponse(BaseModel, Generic[T]):
@@ -146,6 +173,14 @@ class PaginatedResponse(BaseModel, Generic[T]):
     page: Optional[int] = None
     page_size: Optional[int] = None
 
+
+class KeysetPage(BaseModel, Generic[T]):
+    """One page of a keyset-paginated list; pass ``next_cursor`` as ``after``"""
+
+    items: List[T]
+    size: int
+    next_cursor: Optional[int] = None
+
 # Customer schemas
 class CustomerBase(BaseModel):
     name: str = Field(..., max_length=200)
@@ -207,12 +242,45 @@ class FarmResponse(FarmBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Field schemas
+class FieldBase(BaseModel):
+    name: str = Field(..., max_length=100)
+    acres: Optional[float] = Field(None, ge=0)
+    crop_type: Optional[str] = Field(None, max_length=100)
+    planting_date: Optional[datetime] = None
+    harvest_date: Optional[datetime] = None
+
+    soil_test_date: Optional[datetime] = None
+    soil_ph: Optional[float] = Field(None, ge=0, le=14)
+    soil_om: Optional[float] = Field(None, ge=0, le=100)
+    soil_cec: Optional[float] = Field(None, ge=0)
+    notes: Optional[str] = None
+
+
+class FieldResponse(FieldBase):
+    id: int
+    farm_id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Customer hierarchy schemas
+class FarmHierarchy(FarmResponse):
+    fields: List[FieldResponse] = []
+
+
+class CustomerHierarchy(CustomerResponse):
+    farms: List[FarmHierarchy] = []
+
+
 # Blend schemas
 class BlendIngredient(BaseModel):
     ingredient_id: int
     percentage: float = Field(..., ge=0, le=100)
     amount: float = Field(..., ge=0)
 
+    model_config = ConfigDict(from_attributes=True)
+
 
 class BlendBase(BaseModel):
     name: str = Field(..., max_length=200)
@@ -251,15 +319,19 @@ class BlendCreate(BlendBase):
 class BlendResponse(BlendBase):
     id: int
     is_active: bool
-    created_by: int
+    created_by: Optional[int]
     created_at: datetime
     updated_at: Optional[datetime]
 
+    # Composition, from the blend_ingredients rows
+    ingredients: List[BlendIngredient] = Field(default_factory=list)
+
     # Calculated fields
     total_n: Optional[Decimal] = None
     total_p: Optional[Decimal] = None
     total_k: Optional[Decimal] = None
     cost_per_ton: Optional[Decimal] = None
+    guaranteed_analysis: Optional[Dict[str, Decimal]] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -349,6 +421,79 @@ class SystemSettingResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+
+# Background job schemas
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    progress: float
+    progress_message: Optional[str]
+    result: Optional[Any]
+    error: Optional[str]
+    created_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+# Typed system setting values, one model per system_settings key
+class CompanyInfoSettings(BaseModel):
+    name: str = "Bulloch Fertilizer Co., Inc."
+    address: str = ""
+    city: str = ""
+    state: str = ""
+    zip: str = ""
+    phone: str = ""
+    email: str = ""
+    website: str = ""
+
+
+class QuoteSettings(BaseModel):
+    default_margin_type: str = Field(default="percent", pattern="^(percent|fixed)$")
+    default_margin_value: float = Field(default=20.0, ge=0)
+    quote_validity_days: int = Field(default=30, gt=0)
+    price_rounding: float = Field(default=2.50, ge=0)
+    min_order_quantity: float = Field(default=1.0, ge=0)
+    quote_number_prefix: str = "Q"
+    quote_number_format: str = "Q-{year}{month:02d}-{number:04d}"
+
+
+class BlendSettings(BaseModel):
+    default_application_rate: float = Field(default=200.0, gt=0)
+    default_application_unit: str = "lbs/acre"
+    allow_custom_blends: bool = True
+    require_blend_approval: bool = False
+
+
+class PdfSettings(BaseModel):
+    logo_url: str = ""
+    header_color: str = "#1e40af"
+    show_guaranteed_analysis: bool = True
+    show_application_instructions: bool = True
+    footer_text: str = "Thank you for your business!"
+
+
+class ServiceOption(BaseModel):
+    name: str
+    default_cost: float = Field(..., ge=0)
+    unit: str
+
+
+class ServicesSettings(BaseModel):
+    available_services: List[ServiceOption] = []
+
+
+class SecuritySettings(BaseModel):
+    password_min_length: int = Field(default=8, ge=8)
+    password_require_uppercase: bool = True
+    password_require_number: bool = True
+    session_timeout_minutes: int = Field(default=60, gt=0)
+    max_login_attempts: int = Field(default=5, gt=0)
+    lockout_duration_minutes: int = Field(default=15, ge=0)
+
+
 # Import/Export schemas
 class IngredientImport(BaseModel):
     ingredients: List[IngredientCreate]
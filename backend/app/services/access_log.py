@@ -0,0 +1,208 @@
+"""
+SurBlend Access Log Service
+Structured JSON logging with request ids, written off the event loop by a listener thread
+"""
+
+import atexit
+import copy
+import logging
+import os
+import queue
+import re
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("surblend.access")
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# "json" (one object per line) or "text"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Records waiting for the writer thread; beyond this they are dropped, never waited on
+LOG_QUEUE_MAX = int(os.getenv("LOG_QUEUE_MAX", 10000))
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+# Accepted as-is from X-Request-ID (nginx sends 32 hex chars); anything else is replaced
+_REQUEST_ID = re.compile(r"^[\w.:-]{1,128}$")
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+# [seconds, statements] spent in the database by the current request; the list
+# is shared with threadpool copies of the context, so their queries count too
+_db_time: ContextVar[Optional[List[float]]] = ContextVar("db_time", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    if _db_time.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    timings = _db_time.get()
+    started = conn.info.get("query_started")
+    if timings is not None and started:
+        timings[0] += time.perf_counter() - started.pop()
+        timings[1] += 1
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the current request id ("-" outside a request)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; ``extra={"fields": {...}}`` adds keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", "-")
+        if request_id != "-":
+            entry["request_id"] = request_id
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """``QueueHandler`` that drops records when the queue is full
+
+    Records are stamped with the request id in the calling thread, and
+    exceptions are rendered there too since tracebacks do not survive the
+    hand-off; the listener thread does the rest of the formatting and all I/O.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.addFilter(RequestIdFilter())
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> QueueListener:
+    """Send all logging through a queue to a stderr writer thread (idempotent)
+
+    Replaces ``logging.basicConfig``: loggers only enqueue, so a slow disk or a
+    full supervisor pipe never stalls the event loop. uvicorn's loggers are
+    routed through the same queue.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    log_queue: queue.Queue = queue.Queue(LOG_QUEUE_MAX)
+    _listener = QueueListener(log_queue, output)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(NonBlockingQueueHandler(log_queue))
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+    return _listener
+
+
+class AccessLogMiddleware:
+    """Logs one structured line per request and tags everything it logs
+
+    The request id comes from nginx's ``X-Request-ID`` (or is generated),
+    is available to all logging during the request and is echoed back in the
+    response. DB time is the time spent in cursor executes for the request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")
+        if not _REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        id_token = request_id_var.set(request_id)
+        timings = [0.0, 0]
+        db_token = _db_time.set(timings)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []), (b"x-request-id", request_id.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency_ms = (time.perf_counter() - started) * 1000
+            route = scope.get("route")
+            client = scope.get("client")
+            access_logger.info(
+                f"{scope['method']} {scope['path']} {status_code} {latency_ms:.1f}ms",
+                extra={
+                    "fields": {
+                        "request_id": request_id,
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": getattr(route, "path", None),
+                        "status": status_code,
+                        "latency_ms": round(latency_ms, 2),
+                        "db_ms": round(timings[0] * 1000, 2),
+                        "db_statements": timings[1],
+                        "user_id": (scope.get("state") or {}).get("user_id"),
+                        "client": client[0] if client else None,
+                    }
+                },
+            )
+            _db_time.reset(db_token)
+            request_id_var.reset(id_token)
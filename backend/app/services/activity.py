@@ -0,0 +1,247 @@
+"""
+SurBlend Activity Service
+Write-behind audit log: events are queued in memory and inserted in batches
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database import SessionLocal
+from app.models import ActivityLog
+from app.services.partitions import month_window
+
+logger = logging.getLogger(__name__)
+
+# A batch is written once this many events are queued or the interval passes
+ACTIVITY_BATCH_SIZE = int(os.getenv("ACTIVITY_BATCH_SIZE", 100))
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_FLUSH_INTERVAL", 2.0))
+# A full queue makes the next request wait for a flush instead of growing memory
+ACTIVITY_QUEUE_MAX = int(os.getenv("ACTIVITY_QUEUE_MAX", 5000))
+
+
+class ActivityRecorder:
+    """Queues ``ActivityLog`` rows and writes them with multi-row inserts
+
+    Producers run on the event loop; the insert itself runs in a worker
+    thread. ``run()`` flushes whenever ``batch_size`` events are queued or
+    ``flush_interval`` seconds pass, and ``stop()`` drains what is left.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = ACTIVITY_BATCH_SIZE,
+        flush_interval: float = ACTIVITY_FLUSH_INTERVAL,
+        max_queue: int = ACTIVITY_QUEUE_MAX,
+        session_factory: Callable[[], Any] = SessionLocal,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.session_factory = session_factory
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+        self.throttled = 0
+
+    def _primitives(self):
+        # Created lazily so they bind to the running loop, not the import-time one
+        if self._wake is None:
+            self._wake = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+        return self._wake, self._flush_lock
+
+    async def record(
+        self,
+        action: str,
+        user_id: Optional[int] = None,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+    ):
+        """Queue one event; waits for a flush first when the queue is full"""
+        wake, _ = self._primitives()
+        if len(self._queue) >= self.max_queue:
+            self.throttled += 1
+            await self.flush()
+
+        self._queue.append(
+            {
+                "user_id": user_id,
+                "action": action,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "details": details,
+                "ip_address": ip_address,
+                # Stamped now, not at insert time, so batching doesn't skew the log
+                "created_at": datetime.now(timezone.utc),
+            }
+        )
+        if len(self._queue) >= self.batch_size:
+            wake.set()
+
+    async def flush(self) -> int:
+        """Write every queued event, one batch at a time; returns rows written"""
+        _, lock = self._primitives()
+        total = 0
+        async with lock:
+            while self._queue:
+                batch = [
+                    self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))
+                ]
+                try:
+                    await asyncio.to_thread(self._insert, batch)
+                except Exception as e:
+                    # Audit rows must never take requests down with them
+                    self.dropped += len(batch)
+                    logger.error(f"Dropped {len(batch)} activity log rows: {e}")
+                    break
+                total += len(batch)
+        self.written += total
+        return total
+
+    def _insert(self, rows: List[Dict[str, Any]]):
+        db = self.session_factory()
+        try:
+            db.execute(insert(ActivityLog), rows)
+            db.commit()
+        finally:
+            db.close()
+
+    async def run(self):
+        """Flush on size or time threshold until cancelled"""
+        wake, _ = self._primitives()
+        while True:
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the background task and drain the queue"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        # Loop-bound primitives are recreated by the next start()
+        self._wake = self._flush_lock = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "written": self.written,
+            "dropped": self.dropped,
+            "throttled": self.throttled,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+
+activity_recorder = ActivityRecorder()
+
+
+def activity_between(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    user_id: Optional[int] = None,
+    entity_type: Optional[str] = None,
+    limit: int = 500,
+) -> List[ActivityLog]:
+    """Newest-first activity in ``[start, end)``, reading only those months' partitions"""
+    stmt = select(ActivityLog).where(*month_window(ActivityLog.created_at, start, end))
+    if user_id is not None:
+        stmt = stmt.where(ActivityLog.user_id == user_id)
+    if entity_type is not None:
+        stmt = stmt.where(ActivityLog.entity_type == entity_type)
+    return list(db.scalars(stmt.order_by(ActivityLog.created_at.desc()).limit(limit)))
+
+
+class ActivityLogMiddleware:
+    """Records successful mutations under the given path prefixes
+
+    ``prefixes`` maps a path prefix to its entity type. The action is the
+    route's endpoint name, the entity id is the route's first integer path
+    parameter, and the user id is the one ``get_current_user`` resolved.
+    """
+
+    METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        prefixes: Dict[str, str],
+        recorder: ActivityRecorder = activity_recorder,
+    ):
+        self.app = app
+        self.prefixes = sorted(prefixes.items(), key=lambda item: -len(item[0]))
+        self.recorder = recorder
+
+    def _entity_type(self, path: str) -> Optional[str]:
+        for prefix, entity_type in self.prefixes:
+            if path.startswith(prefix):
+                return entity_type
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in self.METHODS:
+            await self.app(scope, receive, send)
+            return
+        entity_type = self._entity_type(scope["path"])
+        if entity_type is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        if status_code < 400:
+            await self.recorder.record(**self._event(scope, entity_type, status_code))
+
+    @staticmethod
+    def _event(scope: Scope, entity_type: str, status_code: int) -> Dict[str, Any]:
+        route = scope.get("route")
+        path_params: Iterable[Any] = (scope.get("path_params") or {}).values()
+        entity_id = next(
+            (int(value) for value in path_params if isinstance(value, int) or str(value).isdigit()),
+            None,
+        )
+        client = scope.get("client")
+        return {
+            "action": getattr(route, "name", None) or f"{scope['method'].lower()} {entity_type}",
+            "user_id": (scope.get("state") or {}).get("user_id"),
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "details": {
+                "method": scope["method"],
+                "path": getattr(route, "path", scope["path"]),
+                "status": status_code,
+            },
+            "ip_address": client[0] if client else None,
+        }
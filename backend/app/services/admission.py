@@ -0,0 +1,187 @@
+"""
+SurBlend Admission Service
+Per-route-class concurrency limits with short queues; overload is shed with 503
+"""
+
+import asyncio
+import logging
+import os
+import re
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Requests running at once per worker process; kept under the engine's
+# pool_size + max_overflow (15) so admitted requests never wait on the pool
+ADMISSION_CAPACITY = int(os.getenv("ADMISSION_CAPACITY", 12))
+# Slots only critical requests may use, so a flood of reads cannot lock out logins
+ADMISSION_RESERVED = int(os.getenv("ADMISSION_RESERVED", 2))
+ADMISSION_BULK_LIMIT = int(os.getenv("ADMISSION_BULK_LIMIT", 2))
+
+
+class RouteClass(NamedTuple):
+    name: str
+    # Requests of this class running at once
+    limit: int
+    # Requests allowed to wait for a slot; more are shed at once
+    queue: int
+    # Seconds a queued request waits before it is shed
+    wait: float
+    retry_after: int
+
+
+def default_classes(
+    capacity: int = ADMISSION_CAPACITY,
+    reserved: int = ADMISSION_RESERVED,
+    bulk: int = ADMISSION_BULK_LIMIT,
+) -> Dict[str, RouteClass]:
+    """Route classes in priority order: freed slots go to the first with a waiter"""
+    return {
+        "critical": RouteClass("critical", capacity, 32, 10.0, 2),
+        "interactive": RouteClass("interactive", max(1, capacity - reserved), 16, 2.0, 2),
+        "bulk": RouteClass("bulk", bulk, 2, 0.5, 10),
+    }
+
+
+_WRITES = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# First match wins; everything else under /api is interactive
+ROUTE_RULES = (
+    ("critical", frozenset({"POST"}), re.compile(r"^/api/users/token$")),
+    ("critical", _WRITES, re.compile(r"^/api/quotes(/|$)")),
+    ("bulk", None, re.compile(r"^/api/analytics(/|$)|/export(/|$)")),
+)
+# Cheap or long-lived (event streams) requests that never take a slot
+EXEMPT = re.compile(r"^/(health)?$|^/api/jobs/\d+/events$")
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Route class of a request, or None if it bypasses admission control"""
+    if method == "OPTIONS" or EXEMPT.match(path) or not path.startswith("/api/"):
+        return None
+    for name, methods, pattern in ROUTE_RULES:
+        if (methods is None or method in methods) and pattern.search(path):
+            return name
+    return "interactive"
+
+
+class AdmissionController:
+    """Counts running requests per class and hands freed slots out by priority
+
+    Lives on one event loop per worker process. A request runs at once when
+    its class has no queue and both its class limit and the shared capacity
+    have room; otherwise it queues (or is refused when the queue is full)
+    until a release grants it a slot or its wait runs out.
+    """
+
+    def __init__(self, capacity: int = ADMISSION_CAPACITY, classes=None):
+        self.capacity = capacity
+        self.classes: Dict[str, RouteClass] = classes or default_classes(capacity)
+        self.running = dict.fromkeys(self.classes, 0)
+        self.waiting: Dict[str, Deque[asyncio.Future]] = {name: deque() for name in self.classes}
+        self.admitted = dict.fromkeys(self.classes, 0)
+        self.shed = dict.fromkeys(self.classes, 0)
+
+    def _has_room(self, name: str) -> bool:
+        return (
+            self.running[name] < self.classes[name].limit
+            and sum(self.running.values()) < self.capacity
+        )
+
+    def _take(self, name: str):
+        self.running[name] += 1
+        self.admitted[name] += 1
+
+    async def acquire(self, name: str) -> bool:
+        """Wait for a slot; False means the request should be shed"""
+        queue = self.waiting[name]
+        if not queue and self._has_room(name):
+            self._take(name)
+            return True
+        if len(queue) >= self.classes[name].queue:
+            self.shed[name] += 1
+            return False
+
+        granted = asyncio.get_running_loop().create_future()
+        queue.append(granted)
+        try:
+            await asyncio.wait_for(granted, self.classes[name].wait)
+            return True
+        except BaseException as e:
+            if granted.done() and not granted.cancelled():
+                self.release(name)  # granted just as we gave up
+            elif granted in queue:
+                queue.remove(granted)
+            if not isinstance(e, asyncio.TimeoutError):
+                raise
+            self.shed[name] += 1
+            return False
+
+    def release(self, name: str):
+        self.running[name] -= 1
+        for cls in self.classes:
+            queue = self.waiting[cls]
+            while queue and self._has_room(cls):
+                granted = queue.popleft()
+                if not granted.done():
+                    self._take(cls)
+                    granted.set_result(True)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            "capacity": self.capacity,
+            "classes": {
+                name: {
+                    **cls._asdict(),
+                    "running": self.running[name],
+                    "waiting": len(self.waiting[name]),
+                    "admitted": self.admitted[name],
+                    "shed": self.shed[name],
+                }
+                for name, cls in self.classes.items()
+            },
+        }
+
+
+admission_controller = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """Holds each API request to its route class's slot, or answers 503"""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        name = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.acquire(name):
+            logger.warning(f"Shed {scope['method']} {scope['path']} ({name})")
+            await self._reject(send, self.controller.classes[name].retry_after)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(name)
+
+    @staticmethod
+    async def _reject(send: Send, retry_after: int):
+        body = orjson.dumps({"detail": "Server busy, please retry shortly"})
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,231 @@
+"""
+SurBlend Blend Analysis Service
+Guaranteed analysis and ingredient cost for many blends in one matrix product
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Ingredient, blend_ingredients
+from app.services.table_versions import table_versions
+
+logger = logging.getLogger(__name__)
+
+# Ingredient nutrient columns, in guaranteed-analysis order
+NUTRIENTS: Tuple[str, ...] = (
+    "nitrogen",
+    "phosphate",
+    "potash",
+    "sulfur",
+    "calcium",
+    "magnesium",
+    "iron",
+    "zinc",
+    "manganese",
+    "boron",
+    "chlorine",
+    "copper",
+    "molybdenum",
+)
+
+BLEND_ANALYSIS_CACHE_SIZE = int(os.getenv("BLEND_ANALYSIS_CACHE_SIZE", 2048))
+
+_TWO_PLACES = Decimal("0.01")
+
+
+@dataclass(frozen=True)
+class BlendAnalysis:
+    """Guaranteed analysis (%) and ingredient cost ($/ton) of one blend"""
+
+    nutrients: Dict[str, Decimal]
+    cost_per_ton: Optional[Decimal]
+
+    @property
+    def total_n(self) -> Decimal:
+        return self.nutrients["nitrogen"]
+
+    @property
+    def total_p(self) -> Decimal:
+        return self.nutrients["phosphate"]
+
+    @property
+    def total_k(self) -> Decimal:
+        return self.nutrients["potash"]
+
+
+def _quantize(value: float) -> Decimal:
+    return Decimal(repr(float(value))).quantize(_TWO_PLACES)
+
+
+def catalog_version(db: Session) -> Tuple:
+    """Version of the ingredient catalog; changes with every committed write to it"""
+    return table_versions(db, "ingredients")
+
+
+def analysis_version(db: Session) -> Tuple:
+    """Versions of the ingredient catalog and of the blends with their compositions
+
+    Any committed write to a blend or its ingredient links moves the second,
+    so an analysis cached while a blend was half-written is never reused.
+    """
+    return table_versions(db, "ingredients", "blends")
+
+
+class BlendAnalysisCache:
+    """LRU of analyses keyed by blend id and tagged with the analysis version"""
+
+    def __init__(self, max_entries: int = BLEND_ANALYSIS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[Tuple, BlendAnalysis]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: int, version: Tuple) -> Optional[BlendAnalysis]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None or cached[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+    def put(self, key: int, version: Tuple, analysis: BlendAnalysis):
+        with self._lock:
+            self._entries[key] = (version, analysis)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+analysis_cache = BlendAnalysisCache()
+
+
+def compute_analyses(
+    db: Session,
+    blend_ids: Iterable[int],
+    links: Optional[Iterable[Tuple[int, int, float]]] = None,
+) -> Dict[int, BlendAnalysis]:
+    """Analyse blends without caching: two queries and one matrix product
+
+    ``fractions`` (blends x ingredients) holds each ingredient's mass fraction,
+    ``composition`` (ingredients x nutrients+cost) holds the catalog values, and
+    their product is every blend's analysis and cost at once. Callers that have
+    already loaded the (blend_id, ingredient_id, percentage) rows pass them as
+    ``links`` to skip the first query.
+    """
+    ids = sorted(set(blend_ids))
+    if not ids:
+        return {}
+
+    if links is None:
+        links = db.execute(
+            select(
+                blend_ingredients.c.blend_id,
+                blend_ingredients.c.ingredient_id,
+                blend_ingredients.c.percentage,
+            ).where(blend_ingredients.c.blend_id.in_(ids))
+        )
+    rows = [(blend_id, ingredient_id, percentage) for blend_id, ingredient_id, percentage in links]
+    ingredient_ids = sorted({ingredient_id for _, ingredient_id, _ in rows})
+    blend_index = {blend_id: i for i, blend_id in enumerate(ids)}
+    ingredient_index = {ingredient_id: j for j, ingredient_id in enumerate(ingredient_ids)}
+
+    catalog = []
+    if ingredient_ids:
+        columns = [getattr(Ingredient, name) for name in NUTRIENTS] + [Ingredient.cost_per_ton]
+        catalog = db.execute(
+            select(Ingredient.id, *columns).where(Ingredient.id.in_(ingredient_ids))
+        )
+
+    return analyses_from_matrices(
+        blend_index,
+        fraction_matrix(rows, blend_index, ingredient_index),
+        composition_matrix(catalog, ingredient_index),
+    )
+
+
+def fraction_matrix(
+    rows: Iterable[Tuple[int, int, float]],
+    blend_index: Dict[int, int],
+    ingredient_index: Dict[int, int],
+) -> np.ndarray:
+    """(blends x ingredients) mass fractions from (blend_id, ingredient_id, percentage) rows"""
+    fractions = np.zeros((len(blend_index), len(ingredient_index)), dtype=np.float64)
+    for blend_id, ingredient_id, percentage in rows:
+        if blend_id in blend_index:
+            fractions[blend_index[blend_id], ingredient_index[ingredient_id]] += percentage / 100.0
+    return fractions
+
+
+def composition_matrix(rows: Iterable[Tuple], ingredient_index: Dict[int, int]) -> np.ndarray:
+    """(ingredients x nutrients+cost) from (id, *NUTRIENTS, cost_per_ton) rows"""
+    composition = np.zeros((len(ingredient_index), len(NUTRIENTS) + 1), dtype=np.float64)
+    for row in rows:
+        composition[ingredient_index[row[0]]] = [
+            float(value) if value is not None else 0.0 for value in row[1:]
+        ]
+    return composition
+
+
+def analyses_from_matrices(
+    blend_index: Dict[int, int], fractions: np.ndarray, composition: np.ndarray
+) -> Dict[int, BlendAnalysis]:
+    """Every blend's analysis and cost from one matrix product"""
+    totals = fractions @ composition
+
+    analyses = {}
+    for blend_id, i in blend_index.items():
+        has_ingredients = fractions[i].any()
+        analyses[blend_id] = BlendAnalysis(
+            nutrients={name: _quantize(totals[i, k]) for k, name in enumerate(NUTRIENTS)},
+            cost_per_ton=_quantize(totals[i, -1]) if has_ingredients else None,
+        )
+    return analyses
+
+
+def cached_analyses(
+    db: Session,
+    blend_ids: Iterable[int],
+    links: Optional[Iterable[Tuple[int, int, float]]] = None,
+) -> Dict[int, BlendAnalysis]:
+    """Analyses by blend id, served from cache where still valid
+
+    ``links`` may hold the composition rows of any superset of the blends.
+    """
+    ids = set(blend_ids)
+    if not ids:
+        return {}
+
+    version = analysis_version(db)
+    results: Dict[int, BlendAnalysis] = {}
+    stale = set()
+    for blend_id in ids:
+        cached = analysis_cache.get(blend_id, version)
+        if cached is not None:
+            results[blend_id] = cached
+        else:
+            stale.add(blend_id)
+
+    if stale:
+        if links is not None:
+            links = [link for link in links if link[0] in stale]
+        computed = compute_analyses(db, stale, links)
+        for blend_id, analysis in computed.items():
+            analysis_cache.put(blend_id, version, analysis)
+        results.update(computed)
+    return results
@@ -0,0 +1,268 @@
+"""
+SurBlend Response Cache
+Single-flight request coalescing with a TTL / stale-while-revalidate LRU
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from enum import Enum
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+# Each uvicorn worker keeps its own cache, so keep the bound small for the Pi
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 256))
+
+# Only simple query/path parameters and version tuples take part in the cache
+# key; sessions, users and requests are injected dependencies and never
+# identify a result
+_KEY_TYPES = (str, int, float, bool, Enum, tuple, type(None))
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "ttl", "stale_ttl")
+
+    def __init__(self, value: Any, stored_at: float, ttl: float, stale_ttl: float):
+        self.value = value
+        self.stored_at = stored_at
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+
+class _LeaderCancelled(Exception):
+    """Set on a flight whose leader was cancelled; its waiters try again"""
+
+
+class ResponseCache:
+    """In-process result cache shared by identical read requests
+
+    Concurrent callers with the same key wait on a single in-flight computation.
+    Fresh entries are served for ``ttl`` seconds; for a further ``stale_ttl``
+    seconds the first caller recomputes while everyone else is served the stale
+    value, so a refresh never stalls more than one request.
+
+    The cache is per process: each uvicorn worker and the job worker has its
+    own, and ``invalidate`` only reaches the process that calls it. Results
+    that must follow writes made elsewhere need a version in their cache key.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        # Bumped by invalidate(); a computation started under an older
+        # generation still answers its callers but is not stored
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "coalesced": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any]) -> Tuple:
+        """Build a cache key from a namespace and the route's keyword arguments"""
+        return (
+            namespace,
+            tuple(sorted((k, v) for k, v in params.items() if isinstance(v, _KEY_TYPES))),
+        )
+
+    def _generation(self, namespace: str) -> Tuple[int, int]:
+        return self._epoch, self._generations.get(namespace, 0)
+
+    def _acquire(self, key: Hashable) -> Tuple[str, Any, Tuple[int, int]]:
+        """Decide whether the caller is served, waits, or computes the value"""
+        with self._lock:
+            generation = self._generation(key[0])
+            now = self.clock()
+            entry = self._entries.get(key)
+            revalidating = False
+            if entry is not None:
+                age = now - entry.stored_at
+                if age < entry.ttl:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return "hit", entry.value, generation
+                if age < entry.ttl + entry.stale_ttl:
+                    if key in self._inflight:
+                        self._counters["stale_hits"] += 1
+                        return "hit", entry.value, generation
+                    revalidating = True
+                else:
+                    del self._entries[key]
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self._counters["coalesced"] += 1
+                return "wait", flight, generation
+
+            flight = Future()
+            self._inflight[key] = flight
+            self._counters["revalidations" if revalidating else "misses"] += 1
+            return "lead", flight, generation
+
+    def _complete(
+        self,
+        key: Hashable,
+        flight: Future,
+        generation: Tuple[int, int],
+        value: Any,
+        ttl: float,
+        stale_ttl: float,
+    ):
+        with self._lock:
+            if generation == self._generation(key[0]):
+                self._entries[key] = _Entry(value, self.clock(), ttl, stale_ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+        flight.set_result(value)
+
+    def _fail(self, key: Hashable, flight: Future, exc: Exception):
+        with self._lock:
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+        flight.set_exception(exc)
+
+    def cached(
+        self,
+        namespace: str,
+        ttl: float = 30.0,
+        stale_ttl: float = 120.0,
+        response_model: Any = None,
+    ):
+        """Decorator caching a route's result under ``namespace``
+
+        ``response_model`` should match the route's own response model; results
+        are converted once by the leader so cached values never hold ORM objects
+        bound to a closed session.
+        """
+        adapter = TypeAdapter(response_model) if response_model is not None else None
+
+        def convert(result: Any) -> Any:
+            if adapter is None:
+                return result
+            return adapter.validate_python(result, from_attributes=True)
+
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    key = self.make_key(namespace, kwargs)
+                    while True:
+                        state, payload, generation = self._acquire(key)
+                        if state == "hit":
+                            return payload
+                        if state == "wait":
+                            try:
+                                # Shielded: a waiter going away must not cancel the flight
+                                return await asyncio.shield(asyncio.wrap_future(payload))
+                            except _LeaderCancelled:
+                                continue
+                        try:
+                            value = convert(await func(*args, **kwargs))
+                        except Exception as e:
+                            self._fail(key, payload, e)
+                            raise
+                        except BaseException:
+                            self._fail(key, payload, _LeaderCancelled())
+                            raise
+                        self._complete(key, payload, generation, value, ttl, stale_ttl)
+                        return value
+
+                return async_wrapper
+
+            @wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                key = self.make_key(namespace, kwargs)
+                while True:
+                    state, payload, generation = self._acquire(key)
+                    if state == "hit":
+                        return payload
+                    if state == "wait":
+                        try:
+                            return payload.result()
+                        except _LeaderCancelled:
+                            continue
+                    try:
+                        value = convert(func(*args, **kwargs))
+                    except Exception as e:
+                        self._fail(key, payload, e)
+                        raise
+                    except BaseException:
+                        self._fail(key, payload, _LeaderCancelled())
+                        raise
+                    self._complete(key, payload, generation, value, ttl, stale_ttl)
+                    return value
+
+            return sync_wrapper
+
+        return decorator
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        """Drop cached entries for a namespace (or everything); returns the count
+
+        Computations already running are fenced off: their callers still get
+        the result, but it is not stored, and later callers start afresh.
+        Only this process's cache is affected.
+        """
+        with self._lock:
+            if namespace is None:
+                self._epoch += 1
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._inflight.clear()
+                return dropped
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for key in [key for key in self._inflight if key[0] == namespace]:
+                del self._inflight[key]
+            keys = [key for key in self._entries if key[0] == namespace]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = (
+                self._counters["hits"]
+                + self._counters["stale_hits"]
+                + self._counters["misses"]
+                + self._counters["revalidations"]
+                + self._counters["coalesced"]
+            )
+            served = lookups - self._counters["misses"] - self._counters["revalidations"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "in_flight": len(self._inflight),
+                "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Process-wide cache used by the read routes
+response_cache = ResponseCache()
@@ -0,0 +1,63 @@
+"""
+SurBlend Conditional Requests
+ETag / Last-Modified validation for catalog endpoints
+"""
+
+import hashlib
+import logging
+from typing import Tuple
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.services.table_versions import table_versions
+
+logger = logging.getLogger(__name__)
+
+# Browsers keep the copy but revalidate every time; nginx must not share it
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+
+class CatalogVersion:
+    """Dependency answering ``If-None-Match`` with 304 and returning the version
+
+    The version is the tuple of the models' ``table_versions`` counters, which
+    every committed write advances. The strong ETag hashes it with the request
+    path and query string, so every page and filter combination validates
+    independently. On a match the request ends with 304 before the route
+    runs, so no rows are loaded or serialized. Routes that cache their body
+    must put the returned version in the cache key, so a write made by
+    another process can never be served under the new ETag. Timestamps are
+    not precise enough to validate with, so there is no Last-Modified.
+    Declare it after the auth dependency so 304s still require credentials.
+    """
+
+    def __init__(self, *models, cache_control: str = DEFAULT_CACHE_CONTROL):
+        self.tables = tuple(model.__tablename__ for model in models)
+        self.cache_control = cache_control
+
+    def __call__(
+        self, request: Request, response: Response, db: Session = Depends(get_db)
+    ) -> Tuple[int, ...]:
+        version = table_versions(db, *self.tables)
+        signature = "|".join(
+            [request.url.path, str(sorted(request.query_params.multi_items()))]
+            + [f"{table}@{counter}" for table, counter in zip(self.tables, version)]
+        )
+        etag = '"' + hashlib.sha256(signature.encode()).hexdigest()[:32] + '"'
+
+        headers = {"ETag": etag, "Cache-Control": self.cache_control, "Vary": "Authorization"}
+        if request.method in ("GET", "HEAD") and self._not_modified(request, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response.headers.update(headers)
+        return version
+
+    @staticmethod
+    def _not_modified(request: Request, etag: str) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is None:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
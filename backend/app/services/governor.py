@@ -0,0 +1,107 @@
+"""
+SurBlend Governor Service
+Throttle level for background work from CPU temperature, load and memory pressure
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _limits(name: str, default: str) -> Tuple[float, ...]:
+    return tuple(float(value) for value in os.getenv(name, default).split(","))
+
+
+LEVELS = ("normal", "warm", "hot", "critical")
+
+# Readings at which each level above normal starts. The Pi 5 firmware
+# throttles its own clock from 80°C, so critical sits just below that
+GOVERNOR_TEMPERATURE = _limits("GOVERNOR_TEMPERATURE", "70,75,79")
+# One-minute load average per CPU
+GOVERNOR_LOAD = _limits("GOVERNOR_LOAD", "1.0,1.5,2.0")
+GOVERNOR_MEMORY = _limits("GOVERNOR_MEMORY", "80,88,94")
+# Seconds readings must stay lower before the level steps down
+GOVERNOR_COOLDOWN = float(os.getenv("GOVERNOR_COOLDOWN", 30))
+
+# Share of the worker's job slots usable at each level (critical starts nothing new)
+GOVERNOR_SHARE = (1.0, 0.5, 0.25, 0.0)
+# Seconds a running job sleeps after each progress report at each level
+GOVERNOR_PAUSE = (0.0, 0.0, 0.25, 1.0)
+
+
+class Governor:
+    """Maps readings to a throttle level, rising at once and falling after a cooldown"""
+
+    def __init__(self, cpus: Optional[int] = None, cooldown: float = GOVERNOR_COOLDOWN):
+        self.cpus = cpus or os.cpu_count() or 1
+        self.cooldown = cooldown
+        self.level = 0
+        self.reasons: List[str] = []
+        self.since = time.time()
+        self._calm_since: Optional[float] = None
+
+    def pressure(
+        self, temperature: Optional[float], load_1m: float, memory_percent: float
+    ) -> Tuple[int, List[str]]:
+        """Level the readings call for, and which readings caused it"""
+        level, reasons = 0, []
+        readings = (
+            ("temperature", temperature, GOVERNOR_TEMPERATURE, "{:.1f}°C"),
+            ("load", load_1m / self.cpus, GOVERNOR_LOAD, "{:.2f} per CPU"),
+            ("memory", memory_percent, GOVERNOR_MEMORY, "{:.0f}%"),
+        )
+        for name, value, limits, fmt in readings:
+            if value is None:
+                continue
+            reached = sum(1 for limit in limits if value >= limit)
+            if reached:
+                reasons.append(f"{name} {fmt.format(value)}")
+                level = max(level, reached)
+        return level, reasons
+
+    def update(
+        self,
+        temperature: Optional[float],
+        load_1m: float,
+        memory_percent: float,
+        now: Optional[float] = None,
+    ) -> int:
+        now = time.time() if now is None else now
+        target, reasons = self.pressure(temperature, load_1m, memory_percent)
+        if target >= self.level:
+            self._calm_since = None
+            if target > self.level:
+                self._set(target, reasons, now)
+            self.reasons = reasons
+        elif self._calm_since is None:
+            self._calm_since = now
+        elif now - self._calm_since >= self.cooldown:
+            self._calm_since = None
+            self._set(target, reasons, now)
+        return self.level
+
+    def _set(self, level: int, reasons: List[str], now: float):
+        logger.info(
+            f"Throttle {LEVELS[self.level]} -> {LEVELS[level]}"
+            + (f" ({', '.join(reasons)})" if reasons else "")
+        )
+        self.level, self.reasons, self.since = level, reasons, now
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "level": self.level,
+            "name": LEVELS[self.level],
+            "reasons": self.reasons,
+            "since": self.since,
+            "share": GOVERNOR_SHARE[self.level],
+            "pause": GOVERNOR_PAUSE[self.level],
+        }
+
+
+def slots(level: int, maximum: int) -> int:
+    """Jobs allowed to run at once at ``level`` out of ``maximum``"""
+    share = GOVERNOR_SHARE[level]
+    return max(1, int(maximum * share)) if share else 0
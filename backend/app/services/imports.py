@@ -0,0 +1,66 @@
+"""
+SurBlend Import Service
+CSV ingredient import, run as a background job
+"""
+
+import csv
+import io
+import logging
+from typing import Any, Dict
+
+from app.models import Ingredient
+from app.services.cache import response_cache
+from app.services.jobs import JobContext, job_handler
+
+logger = logging.getLogger(__name__)
+
+
+def parse_ingredient_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """Ingredient columns from one CSV row; raises on missing or malformed values"""
+    return {
+        "name": row["name"],
+        "code": row.get("code"),
+        "type": row["type"],
+        "nitrogen": float(row.get("nitrogen", 0)),
+        "phosphate": float(row.get("phosphate", 0)),
+        "potash": float(row.get("potash", 0)),
+        "cost_per_ton": float(row["cost_per_ton"]),
+    }
+
+
+@job_handler("ingredients.import")
+def import_ingredients(context: JobContext):
+    """Create ingredients from the CSV text in the job payload"""
+    rows = list(csv.DictReader(io.StringIO(context.payload["csv"])))
+    db = context.db
+
+    imported = 0
+    errors = []
+
+    for row_num, row in enumerate(rows, start=2):
+        try:
+            db.add(Ingredient(**parse_ingredient_row(row)))
+            imported += 1
+
+        except Exception as e:
+            errors.append(f"Row {row_num}: {str(e)}")
+
+        context.report(
+            row_num - 1,
+            len(rows),
+            f"Row {row_num - 1} of {len(rows)}",
+            partial={"imported": imported, "errors": errors},
+        )
+
+    if imported > 0:
+        db.commit()
+        # Only reaches this process's cache; API workers key their pages by the
+        # catalog version, which this commit advanced
+        response_cache.invalidate("ingredients")
+        response_cache.invalidate("blends")
+
+    return {
+        "imported": imported,
+        "errors": errors,
+        "message": f"Successfully imported {imported} ingredients",
+    }
@@ -0,0 +1,114 @@
+"""
+SurBlend Job Event Service
+Server-sent event stream of a job's progress, partial results and completion
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models import Job, JobStatus
+from app.services.serialization import dump_json
+
+logger = logging.getLogger(__name__)
+
+# How often a stream re-reads its job row
+JOB_EVENT_INTERVAL = float(os.getenv("JOB_EVENT_INTERVAL", 1.0))
+# Comment lines keep nginx's 60s proxy_read_timeout from closing a quiet stream
+JOB_EVENT_KEEPALIVE = float(os.getenv("JOB_EVENT_KEEPALIVE", 15))
+# Client reconnect delay, sent once per stream
+JOB_EVENT_RETRY_MS = int(os.getenv("JOB_EVENT_RETRY_MS", 3000))
+
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """One ``text/event-stream`` frame with a JSON payload"""
+    return b"event: " + event.encode() + b"\ndata: " + dump_json(data) + b"\n\n"
+
+
+class JobEventStream:
+    """Turns changes to a job row into ``progress``, ``partial`` and ``complete`` events
+
+    Workers run in another process, so the stream polls the row; each poll is
+    one primary-key read in its own short session, off the event loop.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        interval: float = JOB_EVENT_INTERVAL,
+        keepalive: float = JOB_EVENT_KEEPALIVE,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.keepalive = keepalive
+
+    def snapshot(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """The fields a client sees, or None if the job is gone"""
+        db = self.session_factory()
+        try:
+            row = db.execute(
+                select(
+                    Job.status,
+                    Job.attempts,
+                    Job.progress,
+                    Job.progress_message,
+                    Job.result,
+                    Job.error,
+                ).where(Job.id == job_id)
+            ).first()
+        finally:
+            db.close()
+        if row is None:
+            return None
+        return {
+            "id": job_id,
+            "status": row.status,
+            "attempts": row.attempts,
+            "progress": row.progress,
+            "message": row.progress_message,
+            "result": row.result,
+            "error": row.error,
+        }
+
+    async def events(
+        self, job_id: int, is_disconnected: Callable[[], Awaitable[bool]]
+    ) -> AsyncIterator[bytes]:
+        """Yield events until the job finishes or the client goes away"""
+        yield f"retry: {JOB_EVENT_RETRY_MS}\n\n".encode()
+        last_progress = last_result = None
+        last_sent = time.monotonic()
+
+        while not await is_disconnected():
+            state = await asyncio.to_thread(self.snapshot, job_id)
+            if state is None:
+                yield sse_event("error", {"id": job_id, "detail": "Job not found"})
+                return
+            if state["status"] in FINISHED_STATUSES:
+                yield sse_event("complete", state)
+                return
+
+            progress = {
+                key: state[key] for key in ("id", "status", "attempts", "progress", "message")
+            }
+            if progress != last_progress:
+                yield sse_event("progress", progress)
+                last_progress, last_sent = progress, time.monotonic()
+            if state["result"] is not None and state["result"] != last_result:
+                yield sse_event("partial", {"id": job_id, "result": state["result"]})
+                last_result, last_sent = state["result"], time.monotonic()
+            if time.monotonic() - last_sent >= self.keepalive:
+                yield b": keepalive\n\n"
+                last_sent = time.monotonic()
+
+            await asyncio.sleep(self.interval)
+
+
+# Shared by the API process
+job_events = JobEventStream()
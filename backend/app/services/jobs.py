@@ -0,0 +1,459 @@
+"""
+SurBlend Job Service
+Durable job queue on the jobs table, dequeued with FOR UPDATE SKIP LOCKED
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import Job, JobStatus
+from app.services.access_log import configure_logging
+from app.services.governor import GOVERNOR_PAUSE, LEVELS, Governor, slots
+from app.services.monitor import SystemReader, read_state
+
+logger = logging.getLogger(__name__)
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 2.0))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+# Retry n waits base * 2**(n-1) seconds, capped, plus up to 10% jitter
+JOB_RETRY_BASE_DELAY = float(os.getenv("JOB_RETRY_BASE_DELAY", 10))
+JOB_RETRY_MAX_DELAY = float(os.getenv("JOB_RETRY_MAX_DELAY", 600))
+# A running job whose heartbeat is older than this is returned to the queue
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", 300))
+# The worker heartbeats each running job this often, whether or not it reports
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", JOB_STALE_AFTER / 5))
+# Progress is written at most this often so loops can report every row
+JOB_PROGRESS_INTERVAL = float(os.getenv("JOB_PROGRESS_INTERVAL", 0.5))
+# Jobs run at once when the Pi is cool; the governor lowers this as it heats up
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", 2))
+# Niceness of the worker process, so background work yields CPU to the API
+JOB_NICE = int(os.getenv("JOB_NICE", 10))
+
+# Modules whose import registers job handlers; loaded by the worker
+JOB_MODULES = ("app.services.imports",)
+
+JOB_HANDLERS: Dict[str, Callable[["JobContext"], Any]] = {}
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler once cancellation of its job was requested"""
+
+
+def job_handler(kind: str):
+    """Register a function as the handler for jobs of ``kind``"""
+
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+
+    return decorator
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def retry_delay(attempt: int) -> float:
+    """Seconds before retry number ``attempt`` (1-based)"""
+    delay = min(JOB_RETRY_BASE_DELAY * 2 ** (attempt - 1), JOB_RETRY_MAX_DELAY)
+    return delay * (1 + random.random() * 0.1)
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    created_by: Optional[int] = None,
+    priority: int = 0,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+) -> Job:
+    """Queue a job; it runs once a worker claims it"""
+    job = Job(
+        kind=kind,
+        payload=payload or {},
+        created_by=created_by,
+        priority=priority,
+        max_attempts=max_attempts,
+        run_after=_now(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def request_cancel(db: Session, job: Job) -> Job:
+    """Cancel a queued job now, or ask a running one to stop at its next report"""
+    if job.status == JobStatus.QUEUED:
+        job.status = JobStatus.CANCELLED
+        job.finished_at = _now()
+    elif job.status == JobStatus.RUNNING:
+        job.cancel_requested = True
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+class JobContext:
+    """What a handler gets: its payload, a session, and progress reporting"""
+
+    def __init__(
+        self,
+        job_id: int,
+        payload: Dict[str, Any],
+        db: Session,
+        session_factory,
+        pause: Optional[Callable[[], float]] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.job_id = job_id
+        self.payload = payload
+        self.db = db
+        self._session_factory = session_factory
+        self._pause = pause
+        self._worker_id = worker_id
+        self._last_report = 0.0
+
+    def report(self, done: float, total: Optional[float] = None, message: Optional[str] = None,
+               partial: Any = None, force: bool = False):
+        """Record progress (``done`` of ``total``, or a 0-1 fraction) and heartbeat
+
+        ``partial`` is stored as the job's result until the handler returns.
+        Written in its own short transaction so readers see it while the
+        handler's own transaction is still open. Raises ``JobCancelled`` if
+        cancellation was requested or the job was handed to another worker,
+        and sleeps while the worker is throttled.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_report < JOB_PROGRESS_INTERVAL:
+            return
+        self._last_report = now
+
+        fraction = done / total if total else done
+        values = {"progress": max(0.0, min(float(fraction), 1.0)), "heartbeat_at": _now()}
+        if message is not None:
+            values["progress_message"] = message[:255]
+        if partial is not None:
+            values["result"] = partial
+
+        owned = [Job.id == self.job_id]
+        if self._worker_id is not None:
+            owned.append(Job.locked_by == self._worker_id)
+        db = self._session_factory()
+        try:
+            kept = db.execute(update(Job).where(*owned).values(**values)).rowcount
+            cancelled = not kept or db.execute(
+                select(Job.cancel_requested).where(Job.id == self.job_id)
+            ).scalar()
+            db.commit()
+        finally:
+            db.close()
+        if cancelled:
+            raise JobCancelled()
+        delay = self._pause() if self._pause else 0.0
+        if delay:
+            time.sleep(delay)
+
+
+class JobWorker:
+    """Claims and runs jobs, up to ``concurrency`` at once as the throttle allows"""
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        session_factory=SessionLocal,
+        poll_interval: float = JOB_POLL_INTERVAL,
+        concurrency: int = JOB_CONCURRENCY,
+        heartbeat_interval: float = JOB_HEARTBEAT_INTERVAL,
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.concurrency = concurrency
+        self.heartbeat_interval = heartbeat_interval
+        self.throttle = 0
+        # Only used while the monitor is not publishing a level
+        self._governor: Optional[Governor] = None
+        self._reader: Optional[SystemReader] = None
+        self._stopping = False
+
+    def refresh_throttle(self) -> int:
+        """Adopt the monitor's throttle level, or judge it locally when it is down"""
+        state = read_state()
+        if state is not None:
+            level = state["governor"]["level"]
+        else:
+            if self._governor is None:
+                self._governor, self._reader = Governor(), SystemReader()
+            try:
+                sample = self._reader.sample()
+            except OSError:
+                return self.throttle  # no /proc here; keep what we have
+            level = self._governor.update(
+                sample.temperature, sample.load_1m, sample.memory_percent
+            )
+        if level != self.throttle:
+            logger.info(
+                f"Job worker throttle {LEVELS[level]}: "
+                f"{slots(level, self.concurrency)} of {self.concurrency} slots"
+            )
+            self.throttle = level
+        return level
+
+    def pause(self) -> float:
+        return GOVERNOR_PAUSE[self.throttle]
+
+    def claim(self) -> Optional[int]:
+        """Lock the next due job for this worker; returns its id"""
+        db = self.session_factory()
+        try:
+            now = _now()
+            # SKIP LOCKED lets concurrent workers pass over each other's rows
+            # on PostgreSQL; the conditional UPDATE keeps SQLite single-claim too
+            job_id = db.execute(
+                select(Job.id)
+                .where(Job.status == JobStatus.QUEUED, Job.run_after <= now)
+                .order_by(Job.priority.desc(), Job.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).scalar()
+            if job_id is None:
+                db.rollback()
+                return None
+            claimed = db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+                .values(
+                    status=JobStatus.RUNNING,
+                    attempts=Job.attempts + 1,
+                    locked_by=self.worker_id,
+                    locked_at=now,
+                    heartbeat_at=now,
+                    result=None,
+                    error=None,
+                )
+            ).rowcount
+            db.commit()
+            return job_id if claimed else None
+        finally:
+            db.close()
+
+    def heartbeat(self, job_id: int) -> bool:
+        """Mark a job this worker still holds as alive; False once it lost it"""
+        db = self.session_factory()
+        try:
+            kept = db.execute(
+                update(Job)
+                .where(
+                    Job.id == job_id,
+                    Job.status == JobStatus.RUNNING,
+                    Job.locked_by == self.worker_id,
+                )
+                .values(heartbeat_at=_now())
+            ).rowcount
+            db.commit()
+            return bool(kept)
+        finally:
+            db.close()
+
+    def _keep_alive(self, job_id: int, done: threading.Event):
+        while not done.wait(self.heartbeat_interval):
+            try:
+                if not self.heartbeat(job_id):
+                    return
+            except Exception as e:
+                logger.error(f"Heartbeat of job {job_id} failed: {e}")
+
+    def execute(self, job_id: int) -> JobStatus:
+        """Run a claimed job and record its outcome
+
+        A heartbeat thread keeps the job from looking stale while a handler
+        runs for long stretches without reporting progress.
+        """
+        done = threading.Event()
+        heart = threading.Thread(
+            target=self._keep_alive, args=(job_id, done), name=f"heartbeat-{job_id}", daemon=True
+        )
+        heart.start()
+        try:
+            return self._execute(job_id)
+        finally:
+            done.set()
+            heart.join()
+
+    def _execute(self, job_id: int) -> JobStatus:
+        db = self.session_factory()
+        try:
+            job = db.get(Job, job_id)
+            handler = JOB_HANDLERS.get(job.kind)
+            context = JobContext(
+                job.id,
+                job.payload or {},
+                db,
+                self.session_factory,
+                pause=self.pause,
+                worker_id=self.worker_id,
+            )
+            try:
+                if handler is None:
+                    raise LookupError(f"No handler registered for job kind {job.kind!r}")
+                result = handler(context)
+            except JobCancelled:
+                db.rollback()
+                return self._finish(db, job_id, JobStatus.CANCELLED, error="Cancelled")
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Job {job_id} ({job.kind}) failed: {e}")
+                return self._fail(db, job_id, traceback.format_exc(limit=5))
+            return self._finish(db, job_id, JobStatus.SUCCEEDED, result=result)
+        finally:
+            db.close()
+
+    def _finish(self, db: Session, job_id: int, status: JobStatus, result=None, error=None):
+        """Record the outcome, unless the job was requeued and is no longer ours"""
+        finished = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == self.worker_id)
+            .values(
+                status=status,
+                result=result,
+                error=error,
+                progress=1.0 if status == JobStatus.SUCCEEDED else Job.progress,
+                locked_by=None,
+                finished_at=_now(),
+            )
+        ).rowcount
+        db.commit()
+        if not finished:
+            return self._lost(db, job_id)
+        return status
+
+    def _lost(self, db: Session, job_id: int) -> JobStatus:
+        job = db.get(Job, job_id)
+        logger.warning(f"Job {job_id} is no longer held by {self.worker_id}; dropping this run")
+        return job.status
+
+    def _fail(self, db: Session, job_id: int, error: str) -> JobStatus:
+        job = db.get(Job, job_id)
+        if job.locked_by != self.worker_id:
+            return self._lost(db, job_id)
+        if job.attempts >= job.max_attempts:
+            return self._finish(db, job_id, JobStatus.FAILED, error=error)
+        job.status = JobStatus.QUEUED
+        job.run_after = _now() + timedelta(seconds=retry_delay(job.attempts))
+        job.locked_by = None
+        job.error = error
+        db.commit()
+        return JobStatus.QUEUED
+
+    def requeue_stale(self) -> int:
+        """Return jobs of workers that stopped heartbeating to the queue"""
+        db = self.session_factory()
+        try:
+            cutoff = _now() - timedelta(seconds=JOB_STALE_AFTER)
+            stale = db.scalars(
+                select(Job).where(Job.status == JobStatus.RUNNING, Job.heartbeat_at < cutoff)
+            ).all()
+            for job in stale:
+                logger.warning(f"Job {job.id} lost its worker {job.locked_by}; requeueing")
+                job.locked_by = None
+                if job.attempts >= job.max_attempts:
+                    job.status = JobStatus.FAILED
+                    job.error = "Worker stopped responding"
+                    job.finished_at = _now()
+                else:
+                    job.status = JobStatus.QUEUED
+                    job.run_after = _now()
+            db.commit()
+            return len(stale)
+        finally:
+            db.close()
+
+    def run_once(self) -> Optional[JobStatus]:
+        """Claim and run one job; None when the queue has nothing due"""
+        job_id = self.claim()
+        if job_id is None:
+            return None
+        return self.execute(job_id)
+
+    def _run(self, job_id: int):
+        try:
+            self.execute(job_id)
+        except Exception as e:
+            logger.error(f"Job worker error on job {job_id}: {e}")
+
+    def run_forever(self):
+        """Work until SIGTERM/SIGINT; running jobs are finished first
+
+        New jobs are claimed only while fewer than the throttle's share of
+        ``concurrency`` are running, so a hot or loaded Pi drains to fewer
+        jobs (none at critical) without interrupting any.
+        """
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._stop)
+        logger.info(f"Job worker {self.worker_id} started with {self.concurrency} slots")
+
+        last_reap = 0.0
+        running = set()
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="job") as pool:
+            while not self._stopping:
+                if time.monotonic() - last_reap > JOB_STALE_AFTER / 2:
+                    self.requeue_stale()
+                    last_reap = time.monotonic()
+                running = {future for future in running if not future.done()}
+                job_id = None
+                if len(running) < slots(self.refresh_throttle(), self.concurrency):
+                    try:
+                        job_id = self.claim()
+                    except Exception as e:
+                        logger.error(f"Job worker error: {e}")
+                if job_id is not None:
+                    running.add(pool.submit(self._run, job_id))
+                elif running:
+                    wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                elif not self._stopping:
+                    time.sleep(self.poll_interval)
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    def _stop(self, signum, frame):
+        self._stopping = True
+
+
+def main(argv=None):
+    """Run a job worker (supervisor program surblend-worker)"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--poll-interval", type=float, default=JOB_POLL_INTERVAL)
+    parser.add_argument("--concurrency", type=int, default=JOB_CONCURRENCY)
+    parser.add_argument("--once", action="store_true", help="run due jobs, then exit")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    os.nice(JOB_NICE)
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+
+    worker = JobWorker(poll_interval=args.poll_interval, concurrency=args.concurrency)
+    if args.once:
+        while worker.run_once() is not None:
+            pass
+    else:
+        worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()
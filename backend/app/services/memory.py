@@ -0,0 +1,119 @@
+"""
+SurBlend Memory Service
+tracemalloc snapshots of a running worker, diffed to find what keeps growing
+"""
+
+import gc
+import logging
+import os
+import threading
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Frames kept per allocation; more frames cost more memory and time while tracing
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", 10))
+
+GROUP_BY = ("lineno", "filename", "traceback")
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_mb(pid: Optional[int] = None) -> float:
+    return round(psutil.Process(pid).memory_info().rss / 1024 / 1024, 2)
+
+
+class MemoryTracker:
+    """Takes tracemalloc snapshots in this process and diffs each against the last
+
+    The first snapshot starts tracing (allocations made before that are not
+    attributed), so take one, run traffic, then take another to see growth.
+    Tracing slows allocation down; ``stop()`` turns it off again.
+    """
+
+    def __init__(self, frames: int = TRACEMALLOC_FRAMES):
+        self.frames = frames
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._previous_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def snapshot(self, limit: int = 25, group_by: str = "lineno") -> Dict[str, Any]:
+        """Top allocation sites, as growth since the previous snapshot when there is one"""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._previous = self._previous_at = None
+                logger.info(f"tracemalloc started ({self.frames} frames) in pid {os.getpid()}")
+            gc.collect()
+            snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+            taken_at = datetime.now(timezone.utc)
+            traced, peak = tracemalloc.get_traced_memory()
+
+            result: Dict[str, Any] = {
+                "pid": os.getpid(),
+                "taken_at": taken_at.isoformat(),
+                "compared_to": self._previous_at.isoformat() if self._previous_at else None,
+                "rss_mb": rss_mb(),
+                "traced_mb": round(traced / 1024 / 1024, 2),
+                "peak_traced_mb": round(peak / 1024 / 1024, 2),
+            }
+            if self._previous is None:
+                result["top"] = [
+                    self._stat(stat, group_by) for stat in snapshot.statistics(group_by)[:limit]
+                ]
+            else:
+                diffs = snapshot.compare_to(self._previous, group_by)
+                result["top"] = [self._diff(stat, group_by) for stat in diffs[:limit]]
+            self._previous, self._previous_at = snapshot, taken_at
+            return result
+
+    @staticmethod
+    def _where(stat, group_by: str) -> List[str]:
+        frames = stat.traceback if group_by == "traceback" else stat.traceback[:1]
+        return [f"{frame.filename}:{frame.lineno}" for frame in frames]
+
+    def _stat(self, stat: tracemalloc.Statistic, group_by: str) -> Dict[str, Any]:
+        return {
+            "where": self._where(stat, group_by),
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+
+    def _diff(self, stat: tracemalloc.StatisticDiff, group_by: str) -> Dict[str, Any]:
+        return {
+            "where": self._where(stat, group_by),
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff,
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+
+    def stop(self) -> bool:
+        """Stop tracing and drop the stored snapshot; False if it was not running"""
+        with self._lock:
+            was_tracing = tracemalloc.is_tracing()
+            tracemalloc.stop()
+            self._previous = self._previous_at = None
+            return was_tracing
+
+    def stats(self) -> Dict[str, Any]:
+        traced, peak = tracemalloc.get_traced_memory()
+        return {
+            "pid": os.getpid(),
+            "rss_mb": rss_mb(),
+            "tracing": tracemalloc.is_tracing(),
+            "traced_mb": round(traced / 1024 / 1024, 2),
+            "gc_objects": len(gc.get_objects()),
+            "gc_counts": gc.get_count(),
+        }
+
+
+memory_tracker = MemoryTracker()
@@ -0,0 +1,430 @@
+"""
+SurBlend Monitor Service
+Resident system monitor: samples /proc and /sys every second and raises deduplicated alerts
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import smtplib
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.mime.text import MIMEText
+from typing import Any, Deque, Dict, List, NamedTuple, Optional
+
+from app.services.access_log import configure_logging
+from app.services.governor import Governor
+
+logger = logging.getLogger(__name__)
+
+MONITOR_INTERVAL = float(os.getenv("MONITOR_INTERVAL", 1.0))
+# Samples kept in memory: one hour at one per second
+MONITOR_HISTORY = int(os.getenv("MONITOR_HISTORY", 3600))
+# Published every tick for the API; tmpfs, so it never touches the SD card
+MONITOR_STATE_FILE = os.getenv("MONITOR_STATE_FILE", "/dev/shm/surblend-monitor.json")
+# The API ignores a state file older than this (monitor not running)
+MONITOR_STATE_MAX_AGE = float(os.getenv("MONITOR_STATE_MAX_AGE", 10))
+# Services and disk usage change slowly; check them every this many seconds
+MONITOR_SLOW_INTERVAL = float(os.getenv("MONITOR_SLOW_INTERVAL", 30))
+
+# An unresolved alert is repeated after this long; at most this many notifications an hour
+ALERT_REPEAT_AFTER = float(os.getenv("ALERT_REPEAT_AFTER", 6 * 3600))
+# After a failed send, wait this long before trying the notifier again
+ALERT_RETRY_AFTER = float(os.getenv("ALERT_RETRY_AFTER", 60))
+ALERT_MAX_PER_HOUR = int(os.getenv("ALERT_MAX_PER_HOUR", 6))
+ALERT_EMAIL = os.getenv("ALERT_EMAIL", "jonmarsh@bullochfertilizer.com")
+# Where the local notifier appends alerts when SMTP is not configured
+ALERT_LOG = os.getenv("ALERT_LOG", "/opt/surblend/logs/alerts.log")
+
+THERMAL_ZONE = "/sys/class/thermal/thermal_zone0/temp"
+
+# Service name -> command-line substring of its process
+SERVICES = {
+    "postgresql": "postgres",
+    "nginx": "nginx",
+    "surblend": "app.main:app",
+    "surblend-worker": "app.services.jobs",
+}
+
+
+class Sample(NamedTuple):
+    ts: float
+    cpu_percent: Optional[float]
+    load_1m: float
+    memory_percent: float
+    memory_available_mb: float
+    temperature: Optional[float]
+
+
+class Threshold(NamedTuple):
+    field: str
+    limit: float
+    # Only alert once every sample over this many seconds is above the limit
+    sustain: float
+    message: str
+
+
+THRESHOLDS = (
+    Threshold("cpu_percent", 80, 120, "High CPU usage: {value:.0f}%"),
+    Threshold("memory_percent", 85, 60, "High memory usage: {value:.0f}%"),
+    Threshold("temperature", 70, 30, "High CPU temperature: {value:.1f}°C"),
+)
+DISK_LIMIT = 90
+
+
+class SystemReader:
+    """Reads /proc and /sys directly, without spawning processes
+
+    Keeps the previous /proc/stat counters so CPU usage is measured over the
+    interval between reads rather than by sleeping.
+    """
+
+    def __init__(self, proc: str = "/proc", thermal_zone: str = THERMAL_ZONE, disk: str = "/"):
+        self.proc = proc
+        self.thermal_zone = thermal_zone
+        self.disk_path = disk
+        self._cpu: Optional[tuple] = None
+
+    def _read(self, *parts: str) -> str:
+        with open(os.path.join(self.proc, *parts), encoding="utf-8") as fh:
+            return fh.read()
+
+    def cpu_percent(self) -> Optional[float]:
+        """Busy share of all CPUs since the previous call (None on the first)"""
+        fields = [int(value) for value in self._read("stat").split("\n", 1)[0].split()[1:9]]
+        idle, total = fields[3] + fields[4], sum(fields)
+        previous, self._cpu = self._cpu, (idle, total)
+        if previous is None or total == previous[1]:
+            return None
+        return round(100.0 * (1 - (idle - previous[0]) / (total - previous[1])), 1)
+
+    def load_1m(self) -> float:
+        return float(self._read("loadavg").split()[0])
+
+    def memory(self) -> Dict[str, float]:
+        info = {}
+        for line in self._read("meminfo").splitlines():
+            key, _, value = line.partition(":")
+            if key in ("MemTotal", "MemAvailable"):
+                info[key] = int(value.split()[0])  # kB
+        available = info["MemAvailable"]
+        return {
+            "percent": round(100.0 * (1 - available / info["MemTotal"]), 1),
+            "available_mb": round(available / 1024, 1),
+        }
+
+    def temperature(self) -> Optional[float]:
+        try:
+            with open(self.thermal_zone, encoding="utf-8") as fh:
+                return int(fh.read()) / 1000
+        except (OSError, ValueError):
+            return None
+
+    def disk(self) -> Dict[str, float]:
+        stat = os.statvfs(self.disk_path)
+        total, free = stat.f_blocks * stat.f_frsize, stat.f_bavail * stat.f_frsize
+        return {
+            "percent": round(100.0 * (1 - free / total), 1) if total else 0.0,
+            "free_gb": round(free / 1024**3, 2),
+        }
+
+    def services(self, patterns: Dict[str, str] = SERVICES) -> Dict[str, bool]:
+        """Which services have a process whose command line contains their pattern"""
+        running = dict.fromkeys(patterns, False)
+        for pid in os.listdir(self.proc):
+            if not pid.isdigit():
+                continue
+            try:
+                cmdline = self._read(pid, "cmdline").replace("\0", " ")
+            except OSError:
+                continue  # exited while we looked
+            for name, pattern in patterns.items():
+                if pattern in cmdline:
+                    running[name] = True
+        return running
+
+    def sample(self) -> Sample:
+        memory = self.memory()
+        return Sample(
+            ts=time.time(),
+            cpu_percent=self.cpu_percent(),
+            load_1m=self.load_1m(),
+            memory_percent=memory["percent"],
+            memory_available_mb=memory["available_mb"],
+            temperature=self.temperature(),
+        )
+
+
+class LogNotifier:
+    """Local stand-in for email: appends alerts to a file and the log"""
+
+    def __init__(self, path: str = ALERT_LOG):
+        self.path = path
+
+    def send(self, subject: str, body: str):
+        logger.warning(f"{subject}: {body}")
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(f"=== {datetime.now(timezone.utc).isoformat()} {subject}\n{body}\n\n")
+
+
+class SmtpNotifier:
+    """Emails alerts through the SMTP_* server"""
+
+    def __init__(self, to: str = ALERT_EMAIL):
+        self.to = to
+        self.host = os.getenv("SMTP_HOST", "smtp.gmail.com")
+        self.port = int(os.getenv("SMTP_PORT", "587"))
+        self.user = os.getenv("SMTP_USER")
+        self.password = os.getenv("SMTP_PASSWORD")
+
+    def send(self, subject: str, body: str):
+        message = MIMEText(body, "plain")
+        message["From"] = self.user
+        message["To"] = self.to
+        message["Subject"] = f"SurBlend Alert: {subject}"
+        with smtplib.SMTP(self.host, self.port, timeout=30) as server:
+            server.starttls()
+            server.login(self.user, self.password)
+            server.send_message(message)
+
+
+def make_notifier(kind: Optional[str] = None):
+    """MONITOR_NOTIFIER=smtp|log; defaults to smtp when SMTP_USER is set"""
+    kind = kind or os.getenv("MONITOR_NOTIFIER") or ("smtp" if os.getenv("SMTP_USER") else "log")
+    return SmtpNotifier() if kind == "smtp" else LogNotifier()
+
+
+class AlertManager:
+    """Turns the current set of problems into rate-limited notifications
+
+    A problem is notified when it starts, again every ``repeat_after`` while it
+    lasts, and once more when it clears. Everything due in one check goes out
+    as a single message. Beyond ``max_per_hour`` messages, or after a failed
+    send, nothing is marked as notified: what was due stays due, including
+    resolutions, and goes out with the next message that can be sent.
+    """
+
+    def __init__(
+        self,
+        notifier,
+        repeat_after: float = ALERT_REPEAT_AFTER,
+        max_per_hour: int = ALERT_MAX_PER_HOUR,
+        retry_after: float = ALERT_RETRY_AFTER,
+    ):
+        self.notifier = notifier
+        self.repeat_after = repeat_after
+        self.max_per_hour = max_per_hour
+        self.retry_after = retry_after
+        self.active: Dict[str, Dict[str, Any]] = {}
+        # Cleared problems whose resolution has not been sent yet
+        self.resolved: Dict[str, str] = {}
+        self._sent: Deque[float] = deque()
+        self._retry_at = 0.0
+        self._holding = False
+        self.suppressed = 0
+
+    def update(self, problems: Dict[str, str], now: float) -> Optional[str]:
+        """``problems`` maps an alert key to its message; returns what was sent"""
+        due: List[str] = []
+        due_keys: List[str] = []
+        for key, message in problems.items():
+            alert = self.active.setdefault(key, {"since": now, "notified": None})
+            alert["message"] = message
+            self.resolved.pop(key, None)
+            if alert["notified"] is None:
+                due.append(message)
+            elif now - alert["notified"] >= self.repeat_after:
+                due.append(f"{message} (ongoing since {_iso(alert['since'])})")
+            else:
+                continue
+            due_keys.append(key)
+        for key in [key for key in self.active if key not in problems]:
+            self.resolved[key] = self.active.pop(key)["message"]
+        due.extend(f"Resolved: {message}" for message in self.resolved.values())
+        if not due or now < self._retry_at:
+            return None
+
+        while self._sent and self._sent[0] <= now - 3600:
+            self._sent.popleft()
+        if len(self._sent) >= self.max_per_hour:
+            self.suppressed += 1
+            if not self._holding:
+                self._holding = True
+                logger.warning(f"Alerts held back by rate limit: {'; '.join(due)}")
+            return None
+
+        body = "\n".join(f"- {line}" for line in due) + f"\n\nTimestamp: {_iso(now)}"
+        try:
+            self.notifier.send("System Warning", body)
+        except Exception as e:
+            # Nothing is marked as sent, so it all goes out on the next attempt
+            self._retry_at = now + self.retry_after
+            logger.error(f"Failed to send alert: {e}")
+            return None
+        self._sent.append(now)
+        self._holding = False
+        self.resolved.clear()
+        for key in due_keys:
+            self.active[key]["notified"] = now
+        return body
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds")
+
+
+class SystemMonitor:
+    """Samples every ``interval`` seconds into a ring buffer and publishes a summary
+
+    The published state includes the throttle level the job worker obeys.
+    """
+
+    def __init__(
+        self,
+        reader: Optional[SystemReader] = None,
+        alerts: Optional[AlertManager] = None,
+        interval: float = MONITOR_INTERVAL,
+        history: int = MONITOR_HISTORY,
+        state_file: str = MONITOR_STATE_FILE,
+    ):
+        self.reader = reader or SystemReader()
+        self.alerts = alerts or AlertManager(make_notifier())
+        self.interval = interval
+        self.samples: Deque[Sample] = deque(maxlen=history)
+        self.state_file = state_file
+        self.governor = Governor()
+        self.services: Dict[str, bool] = {}
+        self.disk: Dict[str, float] = {}
+        self._slow_due = 0.0
+        self._down: Dict[str, int] = {}
+        self._stopping = False
+
+    def _sustained(self, threshold: Threshold, now: float) -> Optional[float]:
+        """Lowest value over the window if every sample in it breached the limit"""
+        window = [s for s in self.samples if s.ts >= now - threshold.sustain]
+        oldest = self.samples[0].ts if self.samples else now
+        values = [getattr(s, threshold.field) for s in window]
+        if not values or oldest > now - threshold.sustain + self.interval:
+            return None  # not enough history yet
+        if any(value is None or value <= threshold.limit for value in values):
+            return None
+        return min(values)
+
+    def problems(self, now: float) -> Dict[str, str]:
+        found = {}
+        for threshold in THRESHOLDS:
+            value = self._sustained(threshold, now)
+            if value is not None:
+                found[threshold.field] = threshold.message.format(value=value)
+        if self.disk.get("percent", 0) > DISK_LIMIT:
+            found["disk"] = f"Low disk space: {self.disk['percent']:.0f}% used"
+        for name, count in self._down.items():
+            # Two checks in a row, so a restart in progress is not an outage
+            if count >= 2:
+                found[f"service:{name}"] = f"Service {name} is not running"
+        return found
+
+    def tick(self):
+        sample = self.reader.sample()
+        self.samples.append(sample)
+        if sample.ts >= self._slow_due:
+            self._slow_due = sample.ts + MONITOR_SLOW_INTERVAL
+            self.disk = self.reader.disk()
+            self.services = self.reader.services()
+            for name, running in self.services.items():
+                self._down[name] = 0 if running else self._down.get(name, 0) + 1
+        self.governor.update(sample.temperature, sample.load_1m, sample.memory_percent, sample.ts)
+        self.alerts.update(self.problems(sample.ts), sample.ts)
+        self.publish()
+
+    def summary(self, seconds: float) -> Dict[str, Any]:
+        """Average and peak of each reading over the last ``seconds``"""
+        if not self.samples:
+            return {}
+        cutoff = self.samples[-1].ts - seconds
+        window = [s for s in self.samples if s.ts > cutoff]
+        result = {}
+        for field in ("cpu_percent", "load_1m", "memory_percent", "temperature"):
+            values = [getattr(s, field) for s in window if getattr(s, field) is not None]
+            if values:
+                result[field] = {
+                    "avg": round(sum(values) / len(values), 1), "max": round(max(values), 1)
+                }
+        return result
+
+    def state(self) -> Dict[str, Any]:
+        latest = self.samples[-1]
+        return {
+            "updated_at": latest.ts,
+            "pid": os.getpid(),
+            "latest": {
+                **latest._asdict(),
+                "disk_percent": self.disk.get("percent"),
+                "disk_free_gb": self.disk.get("free_gb"),
+            },
+            "summary": {"1m": self.summary(60), "5m": self.summary(300)},
+            "services": self.services,
+            "governor": self.governor.state(),
+            "alerts": [
+                {"key": key, "message": alert["message"], "since": _iso(alert["since"])}
+                for key, alert in self.alerts.active.items()
+            ],
+        }
+
+    def publish(self):
+        """Atomically replace the state file read by the API"""
+        tmp = f"{self.state_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.state(), fh)
+        os.replace(tmp, self.state_file)
+
+    def _stop(self, signum, frame):
+        self._stopping = True
+
+    def run_forever(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        logger.info(f"Monitor sampling every {self.interval}s, publishing to {self.state_file}")
+        next_tick = time.monotonic()
+        while not self._stopping:
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Monitor tick failed")
+            next_tick += self.interval
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+
+
+def read_state(path: Optional[str] = None, max_age: float = MONITOR_STATE_MAX_AGE):
+    """The monitor's latest published state, or None if it is missing or stale"""
+    try:
+        with open(path or MONITOR_STATE_FILE, encoding="utf-8") as fh:
+            state = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return state if time.time() - state["updated_at"] <= max_age else None
+
+
+def main(argv=None):
+    """Run the resident system monitor (supervisor program surblend-monitor)"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--interval", type=float, default=MONITOR_INTERVAL)
+    parser.add_argument("--once", action="store_true", help="print one state and exit")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    monitor = SystemMonitor(interval=args.interval)
+    if args.once:
+        monitor.reader.cpu_percent()
+        time.sleep(args.interval)
+        monitor.tick()
+        print(json.dumps(monitor.state(), indent=2))
+        return
+    monitor.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+SurBlend Partition Service
+Monthly range partitions, retention and cold archive for append-only tables
+"""
+
+import argparse
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app import database
+
+logger = logging.getLogger(__name__)
+
+# Create partitions this many months past the current one
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", 3))
+PARTITION_ARCHIVE_DIR = os.getenv("PARTITION_ARCHIVE_DIR", "/opt/surblend/archive")
+
+
+class PartitionedTable(NamedTuple):
+    column: str
+    retention_months: int
+
+
+# Table -> partition key and how many whole months stay in the hot table.
+# As-of price lookups before the price_history horizon need the archive.
+PARTITIONED_TABLES: Dict[str, PartitionedTable] = {
+    "activity_logs": PartitionedTable(
+        "created_at", int(os.getenv("ACTIVITY_LOG_RETENTION_MONTHS", 12))
+    ),
+    "price_history": PartitionedTable(
+        "changed_at", int(os.getenv("PRICE_HISTORY_RETENTION_MONTHS", 36))
+    ),
+}
+
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month.year:04d}_{month.month:02d}"
+
+
+def month_window(column, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Half-open ``[start, end)`` conditions on a partition key
+
+    Comparing the key itself against bound values (never wrapping it in a
+    function or cast) lets Postgres skip partitions outside the window.
+    """
+    conditions = []
+    if start is not None:
+        conditions.append(column >= start)
+    if end is not None:
+        conditions.append(column < end)
+    return conditions
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(
+        conn.execute(
+            text("SELECT 1 FROM pg_class WHERE relname = :table AND relkind = 'p'"),
+            {"table": table},
+        ).scalar()
+    )
+
+
+def list_partitions(conn: Connection, table: str) -> List[date]:
+    """Months with a partition attached to ``table``, oldest first"""
+    names = conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    ).scalars()
+    months = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match and match["table"] == table:
+            months.append(date(int(match["year"]), int(match["month"]), 1))
+    return sorted(months)
+
+
+def default_partition(conn: Connection, table: str) -> Optional[str]:
+    """Name of the DEFAULT partition of ``table``, if it has one"""
+    return conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table "
+            "AND pg_get_expr(child.relpartbound, child.oid) = 'DEFAULT'"
+        ),
+        {"table": table},
+    ).scalar()
+
+
+def _month_bounds(month: date):
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    following = add_months(month, 1)
+    return start, datetime(following.year, following.month, 1, tzinfo=timezone.utc)
+
+
+def create_partition(conn: Connection, table: str, month: date) -> int:
+    """Create the partition for ``month``; returns the rows moved out of DEFAULT
+
+    Postgres refuses to create a partition while the DEFAULT partition holds
+    rows in its range, so those rows are moved: DEFAULT is detached, the new
+    partition created, the rows moved across and DEFAULT attached again, all
+    in the caller's transaction.
+    """
+    name = partition_name(table, month)
+    start, end = _month_bounds(month)
+    create = text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    default = default_partition(conn, table)
+    column = PARTITIONED_TABLES[table].column
+    in_range = f"{column} >= :start AND {column} < :end"
+    if default is None or not conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})"),
+        {"start": start, "end": end},
+    ).scalar():
+        conn.execute(create)
+        return 0
+
+    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    conn.execute(create)
+    moved = conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"start": start, "end": end},
+    ).rowcount
+    conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    logger.info(f"Moved {moved} rows of {default} into {name}")
+    return moved
+
+
+def default_months(conn: Connection, table: str, since: date) -> List[date]:
+    """Months from ``since`` on that have rows sitting in the DEFAULT partition"""
+    default = default_partition(conn, table)
+    if default is None:
+        return []
+    column = PARTITIONED_TABLES[table].column
+    months = conn.execute(
+        text(
+            f"SELECT DISTINCT date_trunc('month', {column} AT TIME ZONE 'UTC') "
+            f"FROM {default} WHERE {column} >= :since"
+        ),
+        {"since": _month_bounds(since)[0]},
+    ).scalars()
+    return sorted(month_start(value) for value in months)
+
+
+def ensure_partitions(
+    engine: Engine, months_ahead: int = PARTITION_MONTHS_AHEAD, today: Optional[date] = None
+) -> Dict[str, List[str]]:
+    """Create missing partitions from the current month ``months_ahead`` forward
+
+    Months inside the retention window whose rows landed in DEFAULT get their
+    own partition too. A no-op on SQLite and on tables that were never
+    converted.
+    """
+    current = month_start(today or datetime.now(timezone.utc).date())
+    created: Dict[str, List[str]] = {}
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # API workers and the cron job may run this at the same moment
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('surblend.partitions'))"))
+        for table, config in PARTITIONED_TABLES.items():
+            if not is_partitioned(conn, table):
+                continue
+            existing = set(list_partitions(conn, table))
+            wanted = {add_months(current, offset) for offset in range(months_ahead + 1)}
+            wanted.update(
+                default_months(conn, table, add_months(current, -config.retention_months))
+            )
+            for month in sorted(wanted - existing):
+                create_partition(conn, table, month)
+                created.setdefault(table, []).append(partition_name(table, month))
+    for table, names in created.items():
+        logger.info(f"Created partitions of {table}: {', '.join(names)}")
+    return created
+
+
+def _copy_to_archive(conn: Connection, query: str, path: str):
+    partial = f"{path}.partial"
+    cursor = conn.connection.cursor()
+    try:
+        with gzip.open(partial, "wt", encoding="utf-8") as archive:
+            cursor.copy_expert(f"COPY {query} TO STDOUT WITH (FORMAT csv, HEADER)", archive)
+        with open(partial, "rb") as written:
+            os.fsync(written.fileno())
+    finally:
+        cursor.close()
+    os.replace(partial, path)
+
+
+def archive_partition(conn: Connection, table: str, month: date, archive_dir: str) -> str:
+    """Detach a partition, write it to ``<name>.csv.gz`` and drop it
+
+    Runs inside the caller's transaction: if the archive cannot be written the
+    detach is rolled back with it and nothing is lost.
+    """
+    name = partition_name(table, month)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+
+    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    _copy_to_archive(conn, name, path)
+    conn.execute(text(f"DROP TABLE {name}"))
+    return path
+
+
+def archive_default_rows(
+    conn: Connection, table: str, before: date, archive_dir: str
+) -> Optional[str]:
+    """Move DEFAULT-partition rows older than ``before`` to an archive file
+
+    Covers rows no monthly partition ever held, such as back-dated loads.
+    Writers to DEFAULT wait until the transaction ends, so nothing is deleted
+    that was not written out.
+    """
+    default = default_partition(conn, table)
+    if default is None:
+        return None
+    column = PARTITIONED_TABLES[table].column
+    cutoff = _month_bounds(before)[0].isoformat()
+    expired = f"{column} < '{cutoff}'"
+    conn.execute(text(f"LOCK TABLE {default} IN EXCLUSIVE MODE"))
+    if not conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {expired})")).scalar():
+        return None
+
+    path = os.path.join(archive_dir, f"{default}_before_{before:%Y_%m}.csv.gz")
+    if os.path.exists(path):
+        path = path.replace(".csv.gz", f"_{datetime.now(timezone.utc):%Y%m%d%H%M%S}.csv.gz")
+    _copy_to_archive(conn, f"(SELECT * FROM {default} WHERE {expired})", path)
+    conn.execute(text(f"DELETE FROM {default} WHERE {expired}"))
+    return path
+
+
+def apply_retention(
+    engine: Engine,
+    archive_dir: str = PARTITION_ARCHIVE_DIR,
+    today: Optional[date] = None,
+    dry_run: bool = False,
+) -> List[str]:
+    """Archive everything older than each table's retention; returns paths
+
+    Whole monthly partitions are detached and dropped; expired rows held in
+    the DEFAULT partition are archived by range.
+    """
+    current = month_start(today or datetime.now(timezone.utc).date())
+    archived: List[str] = []
+    os.makedirs(archive_dir, exist_ok=True)
+
+    with engine.connect() as conn:
+        expired = {
+            table: [
+                month
+                for month in list_partitions(conn, table)
+                if month < add_months(current, -config.retention_months)
+            ]
+            for table, config in PARTITIONED_TABLES.items()
+            if is_partitioned(conn, table)
+        }
+
+    for table, months in expired.items():
+        for month in months:
+            if dry_run:
+                logger.info(f"Would archive {partition_name(table, month)}")
+                continue
+            # One transaction per partition keeps the parent's lock short
+            with engine.begin() as conn:
+                path = archive_partition(conn, table, month, archive_dir)
+            logger.info(f"Archived {partition_name(table, month)} to {path}")
+            archived.append(path)
+
+    for table in expired:
+        before = add_months(current, -PARTITIONED_TABLES[table].retention_months)
+        if dry_run:
+            logger.info(f"Would archive {table} DEFAULT rows before {before.isoformat()}")
+            continue
+        with engine.begin() as conn:
+            path = archive_default_rows(conn, table, before, archive_dir)
+        if path:
+            logger.info(f"Archived {table} DEFAULT rows before {before.isoformat()} to {path}")
+            archived.append(path)
+    return archived
+
+
+def main(argv: Optional[List[str]] = None):
+    """Monthly maintenance: create upcoming partitions, archive expired ones"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--archive-dir", default=PARTITION_ARCHIVE_DIR)
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--dry-run", action="store_true", help="only log what would be archived")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    ensure_partitions(database.engine, args.months_ahead)
+    apply_retention(database.engine, args.archive_dir, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
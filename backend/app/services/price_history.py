@@ -0,0 +1,241 @@
+"""
+SurBlend Price History Service
+As-of ingredient and blend pricing over the price_history table
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Ingredient, PriceHistory, blend_ingredients
+from app.services.partitions import month_window
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_micros(value: datetime) -> int:
+    """Datetime to integer microseconds since the epoch (naive values are UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(value: int) -> datetime:
+    return datetime.fromtimestamp(value / 1_000_000, tz=timezone.utc)
+
+
+class PriceTimeline:
+    """Per-ingredient price step functions built from price_history rows
+
+    Each ingredient is stored as two arrays: sorted change instants and the
+    price in effect on each interval between them (one longer than the change
+    array, the first element being the price before the first change). A lookup
+    is a single ``searchsorted`` over however many instants are requested.
+    """
+
+    def __init__(self):
+        self._changes: Dict[int, np.ndarray] = {}
+        self._prices: Dict[int, np.ndarray] = {}
+
+    @classmethod
+    def build(
+        cls,
+        current_prices: Dict[int, float],
+        rows: Iterable[Tuple[int, datetime, Optional[float], Optional[float]]],
+    ) -> "PriceTimeline":
+        """Build from current prices and (ingredient_id, changed_at, old, new) rows
+
+        Rows must be ordered by ingredient_id, then changed_at.
+        """
+        timeline = cls()
+        grouped: Dict[int, List[Tuple[int, Optional[float], Optional[float]]]] = {}
+        for ingredient_id, changed_at, old_price, new_price in rows:
+            if changed_at is None:
+                continue
+            grouped.setdefault(ingredient_id, []).append(
+                (
+                    _to_micros(changed_at),
+                    None if old_price is None else float(old_price),
+                    None if new_price is None else float(new_price),
+                )
+            )
+
+        for ingredient_id in set(current_prices) | set(grouped):
+            changes = grouped.get(ingredient_id, [])
+            current = current_prices.get(ingredient_id)
+            if not changes:
+                timeline._changes[ingredient_id] = np.empty(0, dtype=np.int64)
+                timeline._prices[ingredient_id] = np.array(
+                    [np.nan if current is None else current], dtype=np.float64
+                )
+                continue
+
+            first_old = changes[0][1]
+            prices = [first_old if first_old is not None else changes[0][2]]
+            for _, _, new_price in changes:
+                prices.append(prices[-1] if new_price is None else new_price)
+            timeline._changes[ingredient_id] = np.fromiter(
+                (c[0] for c in changes), dtype=np.int64, count=len(changes)
+            )
+            timeline._prices[ingredient_id] = np.array(
+                [np.nan if p is None else p for p in prices], dtype=np.float64
+            )
+        return timeline
+
+    def __contains__(self, ingredient_id: int) -> bool:
+        return ingredient_id in self._prices
+
+    def prices_at(self, ingredient_id: int, instants: np.ndarray) -> np.ndarray:
+        """Prices of one ingredient at each instant (microseconds since epoch)"""
+        if ingredient_id not in self._prices:
+            return np.full(len(instants), np.nan)
+        idx = np.searchsorted(self._changes[ingredient_id], instants, side="right")
+        return self._prices[ingredient_id][idx]
+
+    def price_matrix(self, ingredient_ids: Sequence[int], instants: np.ndarray) -> np.ndarray:
+        """(ingredients x instants) price matrix"""
+        matrix = np.empty((len(ingredient_ids), len(instants)), dtype=np.float64)
+        for row, ingredient_id in enumerate(ingredient_ids):
+            matrix[row] = self.prices_at(ingredient_id, instants)
+        return matrix
+
+    def change_points(self, ingredient_ids: Iterable[int], start: int, end: int) -> np.ndarray:
+        """Sorted unique change instants in ``(start, end]`` for the given ingredients"""
+        points = [
+            changes[(changes > start) & (changes <= end)]
+            for changes in (self._changes.get(i) for i in ingredient_ids)
+            if changes is not None and len(changes)
+        ]
+        if not points:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(points))
+
+
+def load_price_timeline(db: Session, ingredient_ids: Iterable[int]) -> PriceTimeline:
+    """Load a timeline for the given ingredients in two indexed queries"""
+    ids = sorted(set(ingredient_ids))
+    if not ids:
+        return PriceTimeline()
+
+    current = {
+        row.id: float(row.cost_per_ton)
+        for row in db.execute(
+            select(Ingredient.id, Ingredient.cost_per_ton).where(Ingredient.id.in_(ids))
+        )
+        if row.cost_per_ton is not None
+    }
+
+    stmt = (
+        select(
+            PriceHistory.ingredient_id,
+            PriceHistory.changed_at,
+            PriceHistory.old_price,
+            PriceHistory.new_price,
+        )
+        .where(PriceHistory.ingredient_id.in_(ids))
+        .order_by(PriceHistory.ingredient_id, PriceHistory.changed_at)
+    )
+    return PriceTimeline.build(current, db.execute(stmt))
+
+
+def _blend_weights(
+    db: Session, blend_ids: Iterable[int]
+) -> Tuple[List[int], List[int], np.ndarray]:
+    """Blend ids, ingredient ids and the (blends x ingredients) mass-fraction matrix"""
+    ids = sorted(set(blend_ids))
+    rows = list(
+        db.execute(
+            select(
+                blend_ingredients.c.blend_id,
+                blend_ingredients.c.ingredient_id,
+                blend_ingredients.c.percentage,
+            ).where(blend_ingredients.c.blend_id.in_(ids))
+        )
+    )
+    ingredient_ids = sorted({row.ingredient_id for row in rows})
+    blend_index = {blend_id: i for i, blend_id in enumerate(ids)}
+    ingredient_index = {ingredient_id: j for j, ingredient_id in enumerate(ingredient_ids)}
+
+    weights = np.zeros((len(ids), len(ingredient_ids)), dtype=np.float64)
+    for row in rows:
+        weights[blend_index[row.blend_id], ingredient_index[row.ingredient_id]] += (
+            row.percentage / 100.0
+        )
+    return ids, ingredient_ids, weights
+
+
+def ingredient_prices_as_of(
+    db: Session, ingredient_ids: Iterable[int], as_of: datetime
+) -> Dict[int, Optional[float]]:
+    """Price per ton of each ingredient in effect at ``as_of``"""
+    ids = sorted(set(ingredient_ids))
+    timeline = load_price_timeline(db, ids)
+    instants = np.array([_to_micros(as_of)], dtype=np.int64)
+    prices = timeline.price_matrix(ids, instants)[:, 0]
+    return {i: (None if np.isnan(p) else round(float(p), 2)) for i, p in zip(ids, prices)}
+
+
+def blend_costs_as_of(
+    db: Session, blend_ids: Iterable[int], as_of: datetime
+) -> Dict[int, Optional[float]]:
+    """Ingredient cost per ton of each blend at ``as_of``"""
+    ids, ingredient_ids, weights = _blend_weights(db, blend_ids)
+    timeline = load_price_timeline(db, ingredient_ids)
+    instants = np.array([_to_micros(as_of)], dtype=np.int64)
+    costs = weights @ timeline.price_matrix(ingredient_ids, instants)
+    return {
+        blend_id: (None if np.isnan(cost) or not weights[i].any() else round(float(cost), 2))
+        for i, (blend_id, cost) in enumerate(zip(ids, costs[:, 0]))
+    }
+
+
+def blend_cost_history(
+    db: Session, blend_ids: Iterable[int], start: datetime, end: datetime
+) -> Dict[int, List[Tuple[datetime, Optional[float]]]]:
+    """Step series of each blend's cost per ton over ``[start, end]``
+
+    Each blend gets its cost at ``start`` followed by one point per change of
+    any of its ingredients' prices inside the range.
+    """
+    start_us, end_us = _to_micros(start), _to_micros(end)
+    if end_us < start_us:
+        raise ValueError("end must not be before start")
+    ids, ingredient_ids, weights = _blend_weights(db, blend_ids)
+    timeline = load_price_timeline(db, ingredient_ids)
+    instants = np.concatenate(
+        ([start_us], timeline.change_points(ingredient_ids, start_us, end_us))
+    ).astype(np.int64)
+    costs = weights @ timeline.price_matrix(ingredient_ids, instants)
+
+    history: Dict[int, List[Tuple[datetime, Optional[float]]]] = {}
+    for i, blend_id in enumerate(ids):
+        series: List[Tuple[datetime, Optional[float]]] = []
+        previous = object()
+        if weights[i].any():
+            for instant, cost in zip(instants, costs[i]):
+                value = None if np.isnan(cost) else round(float(cost), 2)
+                if value != previous:
+                    series.append((_from_micros(int(instant)), value))
+                    previous = value
+        history[blend_id] = series
+    return history
+
+
+def price_changes_between(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    ingredient_ids: Optional[Iterable[int]] = None,
+) -> List[PriceHistory]:
+    """Price changes in ``[start, end)``, reading only those months' partitions"""
+    stmt = select(PriceHistory).where(*month_window(PriceHistory.changed_at, start, end))
+    if ingredient_ids is not None:
+        stmt = stmt.where(PriceHistory.ingredient_id.in_(list(ingredient_ids)))
+    return list(db.scalars(stmt.order_by(PriceHistory.changed_at, PriceHistory.id)))
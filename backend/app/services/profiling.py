@@ -0,0 +1,296 @@
+"""
+SurBlend Profiling Service
+Opt-in sampling profiler for single requests, available to admins only
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.security.utils import get_authorization_scheme_param
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth.security import ALGORITHM, SECRET_KEY
+from app.crud.users import get_user_by_username
+from app.database import get_db
+from app.models import UserRole
+
+logger = logging.getLogger(__name__)
+
+# Reports land here as <name>.json (summary) and <name>.folded (flamegraph input)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/opt/surblend/logs/profiles")
+# Seconds between samples; CPython's 5 ms switch interval is the practical floor
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.005))
+# Newest reports kept; older ones are deleted as new ones are written
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 50))
+
+# Samples are attributed to the first category any frame of a busy thread matches
+CATEGORIES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("db", ("/sqlalchemy/", "/psycopg2/", "/sqlite3/")),
+    (
+        "serialization",
+        (
+            "/orjson", "/pydantic/", "/pydantic_core/", "/json/", "/fastapi/encoders.py",
+            "/app/services/serialization.py",
+        ),
+    ),
+)
+# A thread whose innermost frame is one of these is waiting, not working
+_IDLE_FRAMES = frozenset(
+    {("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get")}
+)
+_REPORT_NAME = re.compile(r"^[\w.-]+$")
+
+
+def _label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the request's threads from a background thread
+
+    Watches the event loop thread plus the threadpool workers that run sync
+    endpoints and dependencies. Each tick is attributed to ``db``,
+    ``serialization`` or ``python`` by what the busy threads are executing,
+    or to ``waiting`` when none is busy (network, locks, awaiting a client).
+    """
+
+    def __init__(self, loop_thread: int, interval: float = PROFILE_INTERVAL):
+        self.loop_thread = loop_thread
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.ticks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started = self.elapsed = 0.0
+
+    def _threads(self) -> List[int]:
+        workers = [t.ident for t in threading.enumerate() if t.name.startswith("AnyIO worker")]
+        return [self.loop_thread, *workers]
+
+    def sample(self):
+        frames = sys._current_frames()
+        busy = set()
+        for ident in self._threads():
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[tuple(_label(code) for code in stack)] += 1
+            busy.add(self._category(stack))
+
+        for category in ("db", "serialization", "python"):
+            if category in busy:
+                self.ticks[category] += 1
+                return
+        self.ticks["waiting"] += 1
+
+    @staticmethod
+    def _category(stack) -> str:
+        for category, markers in CATEGORIES:
+            if any(marker in code.co_filename for code in stack for marker in markers):
+                return category
+        return "python"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.started
+        self._stop.set()
+        self._thread.join()
+
+    def breakdown_ms(self) -> Dict[str, float]:
+        """Wall time split by category, in proportion to the ticks each got"""
+        total = sum(self.ticks.values()) or 1
+        return {
+            category: round(self.elapsed * 1000 * self.ticks[category] / total, 2)
+            for category in ("db", "serialization", "python", "waiting")
+        }
+
+    def top_frames(self, limit: int = 30) -> List[Dict[str, Any]]:
+        """Functions by samples spent in them (self) and under them (total)"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                total[label] += count
+        return [
+            {"frame": label, "self": count, "total": total[label]}
+            for label, count in own.most_common(limit)
+        ]
+
+    def folded(self) -> str:
+        """Collapsed stacks, as read by flamegraph.pl and speedscope"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.items())
+
+
+class ProfileStore:
+    """Profile reports on disk, newest ``keep`` retained"""
+
+    def __init__(self, directory: str = PROFILE_DIR, keep: int = PROFILE_KEEP):
+        self.directory = directory
+        self.keep = keep
+
+    def save(self, name: str, report: Dict[str, Any], folded: str):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{name}.folded"), "w", encoding="utf-8") as fh:
+            fh.write(folded)
+        with open(os.path.join(self.directory, f"{name}.json"), "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        for old in self.names()[self.keep:]:
+            for suffix in (".json", ".folded"):
+                try:
+                    os.remove(os.path.join(self.directory, old + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def names(self) -> List[str]:
+        """Report names, newest first"""
+        try:
+            files = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted((f[: -len(".json")] for f in files if f.endswith(".json")), reverse=True)
+
+    def path(self, name: str, suffix: str) -> Optional[str]:
+        if not _REPORT_NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name + suffix)
+        return path if os.path.exists(path) else None
+
+
+profile_store = ProfileStore()
+
+
+class ProfilerMiddleware:
+    """Profiles a request sent with ``?profile=1`` or ``X-Profile: 1`` by an admin
+
+    The request runs normally for everyone else. One request is profiled at a
+    time; the report name is returned in ``X-Profile-Report`` and the report is
+    written once the response has been sent. ``concurrent_requests`` in the
+    report flags profiles whose samples may include other requests' work.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore = profile_store):
+        self.app = app
+        self.store = store
+        self.in_flight = 0
+        self._busy = False
+
+    @staticmethod
+    def _requested(scope: Scope) -> bool:
+        query = scope.get("query_string", b"").decode("latin-1")
+        if re.search(r"(?:^|&)profile=(?:1|true)(?:&|$)", query):
+            return True
+        return dict(scope["headers"]).get(b"x-profile", b"").lower() in (b"1", b"true")
+
+    @staticmethod
+    def _is_admin(scope: Scope) -> bool:
+        """Whether the bearer token belongs to an active admin; queries the database"""
+        authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+        kind, token = get_authorization_scheme_param(authorization)
+        if kind.lower() != "bearer":
+            return False
+        try:
+            username = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+        except JWTError:
+            return False
+        if username is None:
+            return False
+        session = scope["app"].dependency_overrides.get(get_db, get_db)()
+        db = next(session)
+        try:
+            user = get_user_by_username(db=db, username=username)
+        finally:
+            session.close()
+        return user is not None and user.is_active and user.role == UserRole.ADMIN
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.in_flight += 1
+        try:
+            if self._busy or not self._requested(scope):
+                await self.app(scope, receive, send)
+                return
+            # Claimed before the admin check awaits, so a second request cannot slip in
+            self._busy = True
+            profiled = False
+            try:
+                if await run_in_threadpool(self._is_admin, scope):
+                    profiled = True
+                    await self._profile(scope, receive, send)
+            finally:
+                self._busy = False
+            if not profiled:
+                await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send):
+        started_at = datetime.now(timezone.utc)
+        slug = re.sub(r"[^\w]+", "_", scope["path"]).strip("_") or "root"
+        name = f"{started_at:%Y%m%dT%H%M%S%f}-{scope['method'].lower()}-{slug}"[:120]
+        status_code = 500
+        concurrent = self.in_flight
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, concurrent
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []), (b"x-profile-report", name.encode())
+                ]
+            concurrent = max(concurrent, self.in_flight)
+            await send(message)
+
+        profiler = SamplingProfiler(threading.get_ident())
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            report = {
+                "name": name,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "started_at": started_at.isoformat(),
+                "wall_ms": round(profiler.elapsed * 1000, 2),
+                "interval_ms": profiler.interval * 1000,
+                "samples": sum(profiler.ticks.values()),
+                "concurrent_requests": concurrent,
+                "breakdown_ms": profiler.breakdown_ms(),
+                "top": profiler.top_frames(),
+            }
+            try:
+                await asyncio.to_thread(self.store.save, name, report, profiler.folded())
+                logger.info(f"Profiled {scope['method']} {scope['path']}: {report['breakdown_ms']}")
+            except OSError as e:
+                logger.error(f"Could not write profile {name}: {e}")
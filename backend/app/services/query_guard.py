@@ -0,0 +1,102 @@
+"""
+SurBlend Query Guard Service
+Per-route statement_timeout budgets, and cancelling the queries of clients that left
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict
+
+from fastapi import Request
+from sqlalchemy.exc import OperationalError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database import cancel_query, request_connections, statement_budget
+from app.services.admission import classify
+from app.services.serialization import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+def _budgets(value: str) -> Dict[str, int]:
+    return {name: int(ms) for name, ms in (item.split(":") for item in value.split(","))}
+
+
+# statement_timeout (ms) per admission route class: logins and quote writes
+# must be quick; analytics and exports get longer but still bounded
+STATEMENT_BUDGETS = _budgets(
+    os.getenv("STATEMENT_BUDGETS", "critical:5000,interactive:15000,bulk:60000")
+)
+# Only reads are cancelled when the client goes away; a submitted write still lands
+CANCEL_METHODS = frozenset({"GET", "HEAD"})
+
+# PostgreSQL's SQLSTATE for a statement cancelled by timeout or cancel request
+QUERY_CANCELED = "57014"
+
+
+class QueryGuardMiddleware:
+    """Sets the route's statement budget and cancels its queries on disconnect
+
+    While a read runs, the client's messages are pulled by a watcher task and
+    handed to the app through a queue; an ``http.disconnect`` cancels every
+    connection the request has checked out, freeing it for other requests.
+    """
+
+    def __init__(self, app: ASGIApp, budgets: Dict[str, int] = STATEMENT_BUDGETS):
+        self.app = app
+        self.budgets = budgets
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        name = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        budget_token = statement_budget.set(self.budgets.get(name))
+        connections: list = []
+        connections_token = request_connections.set(connections)
+        try:
+            if scope["method"] not in CANCEL_METHODS:
+                await self.app(scope, receive, send)
+                return
+
+            messages: asyncio.Queue = asyncio.Queue()
+
+            async def watch():
+                while True:
+                    message = await receive()
+                    messages.put_nowait(message)
+                    if message["type"] == "http.disconnect":
+                        if connections:
+                            logger.info(
+                                f"Client left {scope['method']} {scope['path']}; "
+                                f"cancelling {len(connections)} queries"
+                            )
+                        for connection in list(connections):
+                            cancel_query(connection)
+                        return
+
+            async def receive_wrapper() -> Message:
+                return await messages.get()
+
+            watcher = asyncio.create_task(watch())
+            try:
+                await self.app(scope, receive_wrapper, send)
+            finally:
+                watcher.cancel()
+        finally:
+            request_connections.reset(connections_token)
+            statement_budget.reset(budget_token)
+
+
+async def query_canceled_handler(request: Request, exc: OperationalError):
+    """503 for statements stopped by their budget; other database errors re-raise"""
+    if getattr(exc.orig, "pgcode", None) != QUERY_CANCELED:
+        raise exc
+    logger.warning(f"Query cancelled on {request.method} {request.url.path}: {exc.orig}")
+    return FastJSONResponse(
+        {"detail": "The request took too long; narrow it down or retry later"},
+        status_code=503,
+        headers={"Retry-After": "30"},
+    )
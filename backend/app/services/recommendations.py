@@ -0,0 +1,220 @@
+"""
+SurBlend Recommendation Service
+Field-level nutrient targets, blend rates and tonnage from soil tests
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Blend, Customer, Farm, Field
+from app.services.blend_analysis import compute_analyses
+
+logger = logging.getLogger(__name__)
+
+# Base crop requirements in lbs/acre of N, P2O5 and K2O
+CROP_REQUIREMENTS: Dict[str, Sequence[float]] = {
+    "corn": (180.0, 60.0, 80.0),
+    "cotton": (90.0, 50.0, 70.0),
+    "peanuts": (0.0, 30.0, 60.0),
+    "soybeans": (0.0, 40.0, 60.0),
+    "wheat": (100.0, 40.0, 50.0),
+    "sorghum": (120.0, 40.0, 60.0),
+    "bermudagrass": (200.0, 50.0, 150.0),
+    "hay": (200.0, 50.0, 150.0),
+}
+DEFAULT_REQUIREMENT = (100.0, 40.0, 60.0)
+
+# Values assumed when a field has no soil test
+DEFAULT_SOIL_PH = 6.2
+DEFAULT_SOIL_OM = 1.5
+DEFAULT_SOIL_CEC = 8.0
+
+TARGET_PH = 6.2
+OM_N_CREDIT_PER_PERCENT = 15.0  # lbs N released per % organic matter above 1%
+MAX_OM_N_CREDIT = 40.0
+MAX_LIME_TONS_PER_ACRE = 4.0
+MAX_BLEND_RATE = 1000.0  # lbs/acre
+
+NUTRIENT_KEYS = ("n", "p", "k")
+
+
+@dataclass
+class FieldInputs:
+    """Column arrays describing a batch of fields"""
+
+    field_ids: np.ndarray
+    acres: np.ndarray
+    crop_types: List[Optional[str]]
+    soil_ph: np.ndarray
+    soil_om: np.ndarray
+    soil_cec: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> "FieldInputs":
+        """Build from (id, acres, crop_type, soil_ph, soil_om, soil_cec) rows"""
+        rows = list(rows)
+
+        def column(index: int) -> np.ndarray:
+            return np.array(
+                [np.nan if row[index] is None else row[index] for row in rows], dtype=np.float64
+            )
+
+        return cls(
+            field_ids=np.array([row[0] for row in rows], dtype=np.int64),
+            acres=np.nan_to_num(column(1), nan=0.0),
+            crop_types=[row[2] for row in rows],
+            soil_ph=column(3),
+            soil_om=column(4),
+            soil_cec=column(5),
+        )
+
+    def __len__(self) -> int:
+        return len(self.field_ids)
+
+
+def _requirements(crop_types: List[Optional[str]]) -> np.ndarray:
+    """(fields x 3) base N/P2O5/K2O requirements, looked up once per distinct crop"""
+    keys = np.array([(crop or "").strip().lower() for crop in crop_types], dtype=object)
+    if not len(keys):
+        return np.empty((0, 3))
+    crops, inverse = np.unique(keys, return_inverse=True)
+    table = np.array([CROP_REQUIREMENTS.get(crop, DEFAULT_REQUIREMENT) for crop in crops])
+    return table[inverse]
+
+
+def nutrient_targets(inputs: FieldInputs) -> Dict[str, np.ndarray]:
+    """N, P2O5, K2O (lbs/acre) and lime (tons/acre) targets for every field"""
+    ph = np.where(np.isnan(inputs.soil_ph), DEFAULT_SOIL_PH, inputs.soil_ph)
+    om = np.where(np.isnan(inputs.soil_om), DEFAULT_SOIL_OM, inputs.soil_om)
+    cec = np.where(np.isnan(inputs.soil_cec), DEFAULT_SOIL_CEC, inputs.soil_cec)
+    base = _requirements(inputs.crop_types)
+
+    # Mineralized N from organic matter, only for crops that need N at all
+    n_credit = np.clip((om - 1.0) * OM_N_CREDIT_PER_PERCENT, 0.0, MAX_OM_N_CREDIT)
+    n = np.where(base[:, 0] > 0, np.maximum(base[:, 0] - n_credit, 0.0), 0.0)
+
+    # Phosphorus ties up outside pH 6.0-7.0
+    p = base[:, 1] * (1.0 + 0.2 * np.clip(np.abs(ph - 6.5) - 0.5, 0.0, 1.5))
+
+    # Sandy, low-CEC soils lose potassium; heavy soils hold it
+    k = base[:, 2] * np.select([cec < 5.0, cec > 15.0], [1.25, 0.9], default=1.0)
+
+    # Lime requirement scales with buffer capacity
+    lime = np.clip((TARGET_PH - ph) * (0.5 + 0.1 * cec), 0.0, MAX_LIME_TONS_PER_ACRE)
+
+    return {
+        "n": np.round(n / 5.0) * 5.0,
+        "p": np.round(p / 5.0) * 5.0,
+        "k": np.round(k / 5.0) * 5.0,
+        "lime": np.round(lime, 1),
+    }
+
+
+def blend_rates(
+    targets: Dict[str, np.ndarray],
+    acres: np.ndarray,
+    grade: Sequence[float],
+    cost_per_ton: Optional[float] = None,
+) -> Dict[str, np.ndarray]:
+    """Blend rate (lbs/acre), tonnage and shortfall for every field
+
+    The rate is the smallest one meeting every target the blend supplies,
+    capped at ``MAX_BLEND_RATE``; unmet nutrients are reported as shortfall.
+    """
+    needed = np.column_stack([targets[key] for key in NUTRIENT_KEYS])
+    fractions = np.asarray(grade, dtype=np.float64) / 100.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_nutrient = np.where(fractions > 0, needed / fractions, 0.0)
+    rate = np.minimum(per_nutrient.max(axis=1, initial=0.0), MAX_BLEND_RATE)
+    supplied = rate[:, None] * fractions
+    shortfall = np.maximum(needed - supplied, 0.0)
+    tons = rate * acres / 2000.0
+
+    result = {
+        "rate": np.round(rate, 1),
+        "tons": np.round(tons, 3),
+        "shortfall": np.round(shortfall, 1),
+    }
+    if cost_per_ton is not None:
+        result["cost"] = np.round(tons * cost_per_ton, 2)
+    return result
+
+
+def load_field_inputs(
+    db: Session,
+    customer_ids: Optional[Iterable[int]] = None,
+    state: Optional[str] = None,
+) -> FieldInputs:
+    """Soil and crop columns for the fields of some customers or a whole state"""
+    stmt = (
+        select(Field.id, Field.acres, Field.crop_type, Field.soil_ph, Field.soil_om, Field.soil_cec)
+        .join(Farm, Field.farm_id == Farm.id)
+        .join(Customer, Farm.customer_id == Customer.id)
+        .order_by(Field.id)
+    )
+    if customer_ids is not None:
+        stmt = stmt.where(Customer.id.in_(list(customer_ids)))
+    if state is not None:
+        stmt = stmt.where(Customer.state == state)
+    return FieldInputs.from_rows(db.execute(stmt))
+
+
+def build_plan(
+    db: Session,
+    customer_ids: Optional[Iterable[int]] = None,
+    state: Optional[str] = None,
+    blend_id: Optional[int] = None,
+) -> Dict[str, object]:
+    """Recommendation plan for every matching field, plus totals
+
+    Raises ``LookupError`` for an unknown blend and ``ValueError`` for one
+    that cannot be priced.
+    """
+    if blend_id is not None and db.get(Blend, blend_id) is None:
+        raise LookupError("Blend not found")
+    inputs = load_field_inputs(db, customer_ids, state)
+    targets = nutrient_targets(inputs)
+
+    rates = None
+    if blend_id is not None:
+        analysis = compute_analyses(db, [blend_id]).get(blend_id)
+        if analysis is None or analysis.cost_per_ton is None:
+            raise ValueError("Blend has no ingredients")
+        grade = [float(analysis.total_n), float(analysis.total_p), float(analysis.total_k)]
+        rates = blend_rates(targets, inputs.acres, grade, float(analysis.cost_per_ton))
+
+    # Convert columns to Python lists once; only assembling the rows is per field
+    columns = {
+        "field_id": inputs.field_ids.tolist(),
+        "crop_type": inputs.crop_types,
+        "acres": inputs.acres.tolist(),
+        "target_n": targets["n"].tolist(),
+        "target_p": targets["p"].tolist(),
+        "target_k": targets["k"].tolist(),
+        "lime_tons_per_acre": targets["lime"].tolist(),
+    }
+    if rates is not None:
+        columns.update(
+            rate_lbs_per_acre=rates["rate"].tolist(),
+            tons=rates["tons"].tolist(),
+            cost=rates["cost"].tolist(),
+            shortfall=[dict(zip(NUTRIENT_KEYS, row)) for row in rates["shortfall"].tolist()],
+        )
+    names = list(columns)
+    fields = [dict(zip(names, values)) for values in zip(*columns.values())]
+
+    totals = {
+        "fields": len(inputs),
+        "acres": round(float(inputs.acres.sum()), 2),
+        "lime_tons": round(float((targets["lime"] * inputs.acres).sum()), 1),
+    }
+    if rates is not None:
+        totals["tons"] = round(float(rates["tons"].sum()), 3)
+        totals["cost"] = round(float(rates["cost"].sum()), 2)
+    return {"blend_id": blend_id, "fields": fields, "totals": totals}
@@ -0,0 +1,149 @@
+"""
+SurBlend Serialization Service
+orjson responses and prebuilt row serializers for large list endpoints
+"""
+
+import logging
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Type
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Numeric, Table, select
+from sqlalchemy.orm import Session
+
+from app.models import Blend, Ingredient, Quote, blend_ingredients
+from app.schemas.schemas import BlendIngredient, BlendResponse, IngredientResponse, QuoteResponse
+from app.services.blend_analysis import cached_analyses
+
+logger = logging.getLogger(__name__)
+
+# Matches Pydantic's JSON mode: "Z" for UTC, non-string dict keys allowed
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dump_json(content: Any) -> bytes:
+    """Encode with orjson, rendering Decimals as strings like Pydantic does"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson response that also accepts an already-rendered ``bytes`` body"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dump_json(content)
+
+
+def json_response(body: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """Response for a route that bypasses ``response_model`` serialization
+
+    Headers set by dependencies on the injected ``response`` (ETag,
+    Cache-Control) are carried over, since FastAPI only merges them into
+    responses it builds itself.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(body, headers=headers)
+
+
+def _decimal_str(value: Optional[Decimal]) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+class RowSerializer:
+    """Turns Core rows into dicts shaped like a Pydantic response model
+
+    Field to column mapping and per-column converters are resolved once, when
+    the serializer is built; rows are then copied without validation. Values
+    were validated by the write schemas on the way in. Model fields that are
+    not table columns must be listed in ``computed`` and filled by the caller.
+    """
+
+    def __init__(self, model: Type[BaseModel], table: Table, computed: Sequence[str] = ()):
+        self.model = model
+        self.fields = [name for name in model.model_fields if name not in computed]
+        missing = [name for name in self.fields if name not in table.c]
+        if missing:
+            raise ValueError(f"{model.__name__} fields without a {table.name} column: {missing}")
+
+        self.columns = [table.c[name] for name in self.fields]
+        self._converters: List[Optional[Callable[[Any], Any]]] = [
+            _decimal_str
+            if isinstance(column.type, Numeric) and column.type.asdecimal
+            else None
+            for column in self.columns
+        ]
+
+    def select(self):
+        """SELECT of exactly the columns the response needs"""
+        return select(*self.columns)
+
+    def dump(self, row: Sequence[Any]) -> Dict[str, Any]:
+        return {
+            name: value if convert is None else convert(value)
+            for name, convert, value in zip(self.fields, self._converters, row)
+        }
+
+    def dump_all(self, rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+        return [self.dump(row) for row in rows]
+
+
+ingredient_serializer = RowSerializer(IngredientResponse, Ingredient.__table__)
+quote_serializer = RowSerializer(QuoteResponse, Quote.__table__)
+blend_serializer = RowSerializer(
+    BlendResponse,
+    Blend.__table__,
+    computed=(
+        "ingredients", "total_n", "total_p", "total_k", "cost_per_ton", "guaranteed_analysis"
+    ),
+)
+_link_serializer = RowSerializer(BlendIngredient, blend_ingredients)
+
+
+def dump_blends(db: Session, rows: Sequence[Any]) -> List[Dict[str, Any]]:
+    """``BlendResponse`` dicts for rows of ``blend_serializer.select()``
+
+    Loads the composition of all blends in one query and fills the calculated
+    fields from the shared analysis cache.
+    """
+    if not rows:
+        return []
+    index = blend_serializer.fields.index("id")
+    ids = [row[index] for row in rows]
+
+    link_rows = db.execute(
+        select(blend_ingredients.c.blend_id, *_link_serializer.columns)
+        .where(blend_ingredients.c.blend_id.in_(ids))
+        .order_by(blend_ingredients.c.blend_id, blend_ingredients.c.ingredient_id)
+    ).all()
+    composition: Dict[int, List[Dict[str, Any]]] = {blend_id: [] for blend_id in ids}
+    for link in link_rows:
+        composition[link[0]].append(_link_serializer.dump(link[1:]))
+
+    analyses = cached_analyses(db, ids, [(link[0], link[1], link[2]) for link in link_rows])
+
+    blends = []
+    for blend_id, row in zip(ids, rows):
+        item = blend_serializer.dump(row)
+        item["ingredients"] = composition[blend_id]
+        analysis = analyses[blend_id]
+        item.update(
+            total_n=str(analysis.total_n),
+            total_p=str(analysis.total_p),
+            total_k=str(analysis.total_k),
+            cost_per_ton=_decimal_str(analysis.cost_per_ton),
+            guaranteed_analysis={name: str(value) for name, value in analysis.nutrients.items()},
+        )
+        blends.append(item)
+    return blends
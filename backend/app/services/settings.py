@@ -0,0 +1,128 @@
+"""
+SurBlend Settings Service
+Typed, cached access to the system_settings table
+"""
+
+import ast
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.models import SystemSetting
+from app.schemas.schemas import (
+    BlendSettings,
+    CompanyInfoSettings,
+    PdfSettings,
+    QuoteSettings,
+    SecuritySettings,
+    ServicesSettings,
+)
+
+logger = logging.getLogger(__name__)
+
+# Key -> value model for every known setting
+SETTING_MODELS: Dict[str, Type[BaseModel]] = {
+    "company_info": CompanyInfoSettings,
+    "quote_settings": QuoteSettings,
+    "blend_settings": BlendSettings,
+    "pdf_settings": PdfSettings,
+    "services": ServicesSettings,
+    "security": SecuritySettings,
+}
+
+# Writes in another worker become visible after at most this many seconds
+SETTINGS_CACHE_TTL = float(os.getenv("SETTINGS_CACHE_TTL", 30))
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def parse_setting_value(value: Any) -> Any:
+    """Decode a stored value, including legacy str()-serialized Python literals"""
+    if isinstance(value, str):
+        try:
+            return ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return value
+    return value
+
+
+class SettingsStore:
+    """Process-wide cache of parsed settings, refreshed on write or after a TTL"""
+
+    def __init__(self, ttl: float = SETTINGS_CACHE_TTL):
+        self.ttl = ttl
+        self._cache: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, key: str) -> BaseModel:
+        """Parsed setting model; falls back to model defaults when the row is missing"""
+        model = SETTING_MODELS.get(key)
+        if model is None:
+            raise KeyError(key)
+
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+
+        row = db.query(SystemSetting).filter(SystemSetting.key == key).first()
+        if row is None:
+            value = model()
+        else:
+            try:
+                value = model.model_validate(parse_setting_value(row.value))
+            except ValueError as e:
+                logger.error(f"Invalid stored value for setting {key}, using defaults: {e}")
+                value = model()
+
+        with self._lock:
+            self._cache[key] = (value, time.monotonic())
+        return value
+
+    def typed(self, db: Session, model: Type[M]) -> M:
+        """Setting by model class, e.g. ``settings_store.typed(db, SecuritySettings)``"""
+        for key, candidate in SETTING_MODELS.items():
+            if candidate is model:
+                return self.get(db, key)
+        raise KeyError(model.__name__)
+
+    def all(self, db: Session) -> Dict[str, BaseModel]:
+        return {key: self.get(db, key) for key in SETTING_MODELS}
+
+    def set(
+        self, db: Session, key: str, value: Any, description: Optional[str] = None
+    ) -> BaseModel:
+        """Validate and persist a setting, then refresh the cache"""
+        model = SETTING_MODELS.get(key)
+        if model is None:
+            raise KeyError(key)
+        parsed = model.model_validate(value)
+
+        row = db.query(SystemSetting).filter(SystemSetting.key == key).first()
+        if row is None:
+            row = SystemSetting(
+                key=key, description=description or f"Default {key.replace('_', ' ').title()}"
+            )
+            db.add(row)
+        elif description is not None:
+            row.description = description
+        row.value = parsed.model_dump(mode="json")
+        db.commit()
+
+        with self._lock:
+            self._cache[key] = (parsed, time.monotonic())
+        return parsed
+
+    def invalidate(self, key: Optional[str] = None):
+        with self._lock:
+            if key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(key, None)
+
+
+settings_store = SettingsStore()
@@ -8,9 +8,11 @@ import os
 from decimal import Decimal
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
-from app.database import get_db, test_connection, create_tables
+from app.database import engine, get_db, test_connection, create_tables
 from app.models import Ingredient, IngredientType, SystemSetting, User, UserRole
 from app.auth.security import get_password_hash
+from app.services.partitions import ensure_partitions
+from app.services.settings import SETTING_MODELS
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +25,11 @@ async def initialize_database():
         if not await test_connection():
             raise Exception("Failed to connect to database")
         create_tables()
+        try:
+            ensure_partitions(engine)
+        except Exception as e:
+            # The monthly cron run creates them too; never keep the API down for it
+            logger.warning(f"Could not create upcoming partitions: {e}")
         db = next(get_db())  # Get a single session
         try:
             await initialize_system_settings(db)
@@ -118,7 +125,7 @@ async def initialize_system_settings(db: Session):
             if not existing:
                 setting = SystemSetting(
                     key=key,
-                    value=str(value),  # Convert to string for storage
+                    value=SETTING_MODELS[key].model_validate(value).model_dump(mode="json"),
                     description=f"Default {key.replace('_', ' ').title()}"
                 )
                 db.add(setting)
@@ -140,7 +147,7 @@ async def load_sample_ingredients(db: Session):
             {
                 "name": "Urea",
                 "code": "UREA",
-                "type": IngredientType.NUTRIENT,
+                "type": IngredientType.DRY,
                 "nitrogen": Decimal("46.0"),
                 "density": 48.0,
                 "cost_per_ton": Decimal("580.00"),
@@ -149,7 +156,7 @@ async def load_sample_ingredients(db: Session):
             {
                 "name": "Ammonium Sulfate",
                 "code": "AMS",
-                "type": IngredientType.NUTRIENT,
+                "type": IngredientType.DRY,
                 "nitrogen": Decimal("21.0"),
                 "sulfur": Decimal("24.0"),
                 "density": 62.0,
@@ -159,7 +166,7 @@ async def load_sample_ingredients(db: Session):
             {
                 "name": "UAN 32%",
                 "code": "UAN32",
-                "type": IngredientType.NUTRIENT,
+                "type": IngredientType.LIQUID,
                 "nitrogen": Decimal("32.0"),
                 "density": 11.06,
                 "cost_per_ton": Decimal("425.00"),
@@ -168,7 +175,7 @@ async def load_sample_ingredients(db: Session):
             {
                 "name": "DAP (18-46-0)",
                 "code": "DAP",
-                "type": IngredientType.NUTRIENT,
+                "type": IngredientType.DRY,
                 "nitrogen": Decimal("18.0"),
                 "phosphate": Decimal("46.0"),
                 "density": 60.0,
@@ -178,7 +185,7 @@ async def load_sample_ingredients(db: Session):
             {
                 "name": "MAP (11-52-0)",
                 "code": "MAP",
-                "type": IngredientType.NUTRIENT,
+                "type": IngredientType.DRY,
                 "nitrogen": Decimal("11.0"),
                 "phosphate": Decimal("52.0"),
                 "density": 60.0,
@@ -188,7 +195,7 @@ async def load_sample_ingredients(db: Session):
             {
                 "name": "Muriate of Potash",
                 "code": "MOP",
-                "type": IngredientType.NUTRIENT,
+                "type": IngredientType.DRY,
                 "potash": Decimal("60.0"),
                 "density": 64.0,
                 "cost_per_ton": Decimal("520.00"),
@@ -197,7 +204,7 @@ async def load_sample_ingredients(db: Session):
             {
                 "name": "Sulfate of Potash",
                 "code": "SOP",
-                "type": IngredientType.NUTRIENT,
+                "type": IngredientType.DRY,
                 "potash": Decimal("50.0"),
                 "sulfur": Decimal("18.0"),
                 "density": 75.0,
@@ -207,7 +214,7 @@ async def load_sample_ingredients(db: Session):
             {
                 "name": "Zinc Sulfate",
                 "code": "ZNSO4",
-                "type": IngredientType.NUTRIENT,
+                "type": IngredientType.DRY,
                 "zinc": Decimal("35.5"),
                 "sulfur": Decimal("17.5"),
                 "density": 70.0,
@@ -217,7 +224,7 @@ async def load_sample_ingredients(db: Session):
             {
                 "name": "Boron 15%",
                 "code": "BORON",
-                "type": IngredientType.NUTRIENT,
+                "type": IngredientType.DRY,
                 "boron": Decimal("15.0"),
                 "density": 55.0,
                 "cost_per_ton": Decimal("2100.00"),
@@ -0,0 +1,517 @@
+"""
+SurBlend Synthetic Data Service
+Seeded, reproducible bulk data for scale and performance testing
+"""
+
+import argparse
+import csv
+import enum
+import io
+import json
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import Table, func, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app import database
+from app.auth.security import get_password_hash
+from app.models import (
+    Blend,
+    Chemical,
+    Customer,
+    Farm,
+    Field,
+    Ingredient,
+    IngredientType,
+    PriceHistory,
+    Quote,
+    QuoteStatus,
+    User,
+    UserRole,
+    blend_ingredients,
+)
+from app.services.table_versions import bump
+
+logger = logging.getLogger(__name__)
+
+# Rows per COPY / multi-row INSERT
+SYNTHETIC_CHUNK_SIZE = int(os.getenv("SYNTHETIC_CHUNK_SIZE", 5000))
+# Quotes and price history are spread over this many days before today
+SYNTHETIC_HISTORY_DAYS = int(os.getenv("SYNTHETIC_HISTORY_DAYS", 3 * 365))
+
+
+class Preset(NamedTuple):
+    ingredients: int
+    chemicals: int
+    customers: int
+    blends: int
+    quotes: int
+    price_changes: int  # per ingredient
+    sales_reps: int = 10
+
+
+PRESETS: Dict[str, Preset] = {
+    "tiny": Preset(
+        ingredients=40, chemicals=10, customers=50, blends=30, quotes=200, price_changes=4
+    ),
+    # Loads in a few minutes on the Pi's SD card and stays well inside its RAM
+    "pi": Preset(
+        ingredients=2_000, chemicals=500, customers=20_000, blends=5_000, quotes=200_000,
+        price_changes=12,
+    ),
+    "dev": Preset(
+        ingredients=5_000, chemicals=2_000, customers=100_000, blends=20_000, quotes=1_000_000,
+        price_changes=24,
+    ),
+}
+
+# (name, type, N, P2O5, K2O, S, density, $/ton) the generated catalog is varied from
+BASE_INGREDIENTS = [
+    ("Urea", IngredientType.DRY, 46, 0, 0, 0, 48.0, 580),
+    ("Ammonium Sulfate", IngredientType.DRY, 21, 0, 0, 24, 62.0, 385),
+    ("DAP", IngredientType.DRY, 18, 46, 0, 0, 60.0, 685),
+    ("MAP", IngredientType.DRY, 11, 52, 0, 0, 62.0, 720),
+    ("Potash", IngredientType.DRY, 0, 0, 60, 0, 70.0, 475),
+    ("Sulfate of Potash", IngredientType.DRY, 0, 0, 50, 17, 75.0, 890),
+    ("Triple Super Phosphate", IngredientType.DRY, 0, 46, 0, 0, 65.0, 610),
+    ("Gypsum", IngredientType.DRY, 0, 0, 0, 17, 55.0, 120),
+    ("UAN 32%", IngredientType.LIQUID, 32, 0, 0, 0, 1.33, 425),
+    ("UAN 28%", IngredientType.LIQUID, 28, 0, 0, 0, 1.28, 390),
+    ("Ammonium Thiosulfate", IngredientType.LIQUID, 12, 0, 0, 26, 1.33, 410),
+    ("10-34-0", IngredientType.LIQUID, 10, 34, 0, 0, 1.39, 640),
+]
+
+CHEMICAL_NAMES = ["Atrazine", "Glyphosate", "Metolachlor", "Dicamba", "2,4-D", "Mesotrione"]
+CROPS = ["Corn", "Soybeans", "Cotton", "Peanuts", "Wheat", "Sorghum", "Pasture"]
+SOILS = ["Sandy loam", "Loamy sand", "Clay loam", "Silt loam", "Sandy clay loam"]
+IRRIGATION = ["Center pivot", "Drip", "Furrow", None]
+CITIES = [
+    ("Statesboro", "GA"), ("Tifton", "GA"), ("Vidalia", "GA"), ("Dothan", "AL"),
+    ("Orangeburg", "SC"), ("Florence", "SC"), ("Valdosta", "GA"), ("Quincy", "FL"),
+]
+SURNAMES = ["Akins", "Brannen", "Deal", "Hendrix", "Lanier", "Mikell", "Nevil", "Rushing"]
+FARM_WORDS = ["Creek", "Pines", "Branch", "Bottom", "Ridge", "Pond", "Mill", "Crossroads"]
+
+# Older quotes have mostly resolved; recent ones are still drafts or out for review
+STATUS_WEIGHTS_OLD = {
+    QuoteStatus.ACCEPTED: 45, QuoteStatus.REJECTED: 20, QuoteStatus.EXPIRED: 30,
+    QuoteStatus.SENT: 3, QuoteStatus.DRAFT: 2,
+}
+STATUS_WEIGHTS_RECENT = {
+    QuoteStatus.ACCEPTED: 20, QuoteStatus.REJECTED: 5, QuoteStatus.EXPIRED: 0,
+    QuoteStatus.SENT: 45, QuoteStatus.DRAFT: 30,
+}
+
+
+def _copy_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        # SQLAlchemy stores Python enums by member name
+        return value.name
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class BulkLoader:
+    """Streams row dicts into a table: COPY on PostgreSQL, multi-row INSERT elsewhere"""
+
+    def __init__(self, conn: Connection, chunk_size: int = SYNTHETIC_CHUNK_SIZE):
+        self.conn = conn
+        self.chunk_size = chunk_size
+        self.use_copy = conn.dialect.name == "postgresql"
+
+    def load(self, table: Table, rows: Iterable[Dict[str, Any]]) -> int:
+        started = time.perf_counter()
+        count = 0
+        batch: List[Dict[str, Any]] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.chunk_size:
+                count += self._write(table, batch)
+                batch = []
+        if batch:
+            count += self._write(table, batch)
+        elapsed = time.perf_counter() - started
+        rate = count / max(elapsed, 1e-9)
+        logger.info(f"Loaded {count} {table.name} in {elapsed:.1f}s ({rate:,.0f}/s)")
+        return count
+
+    def _write(self, table: Table, rows: List[Dict[str, Any]]) -> int:
+        if not self.use_copy:
+            self.conn.execute(table.insert(), rows)
+            return len(rows)
+
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # csv writes None as an empty unquoted field, which COPY reads as NULL
+            writer.writerow([_copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+        cursor = self.conn.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+        return len(rows)
+
+
+class SyntheticData:
+    """Generates one dataset; the same seed and preset always yield the same rows
+
+    Ids are assigned here (continuing from each table's current max) so child
+    rows can reference parents without a round trip per row.
+    """
+
+    def __init__(self, preset: Preset, seed: int = 42, today: Optional[datetime] = None):
+        self.preset = preset
+        self.rng = random.Random(seed)
+        self.now = today or datetime.now(timezone.utc).replace(microsecond=0)
+        self.start = self.now - timedelta(days=SYNTHETIC_HISTORY_DAYS)
+
+    def _moment(self) -> datetime:
+        """A time inside the history window"""
+        span = int((self.now - self.start).total_seconds())
+        return self.start + timedelta(seconds=self.rng.randrange(span))
+
+    def _vary(self, analysis: float) -> float:
+        """A nutrient analysis within 3% of the base product's"""
+        return round(analysis * self.rng.uniform(0.97, 1.03), 2) if analysis else 0
+
+    def users(self, first_id: int, password_hash: str) -> Iterator[Dict[str, Any]]:
+        for user_id in range(first_id, first_id + self.preset.sales_reps):
+            yield {
+                "id": user_id,
+                "username": f"syn_rep_{user_id}",
+                "email": f"syn_rep_{user_id}@example.com",
+                "full_name": f"Synthetic Rep {user_id}",
+                "hashed_password": password_hash,
+                "role": UserRole.SALES_REP,
+                "is_active": True,
+                "created_at": self.start,
+            }
+
+    def ingredients(self, first_id: int) -> Iterator[Dict[str, Any]]:
+        """Catalog rows; also remembers each one's analysis and price walk"""
+        self.ingredient_rows: Dict[int, Dict[str, Any]] = {}
+        self.price_walks: Dict[int, List[float]] = {}
+        for ingredient_id in range(first_id, first_id + self.preset.ingredients):
+            name, kind, n, p, k, s, density, cost = self.rng.choice(BASE_INGREDIENTS)
+            walk = [cost * self.rng.uniform(0.8, 1.2)]
+            for _ in range(self.preset.price_changes):
+                walk.append(max(50.0, walk[-1] * self.rng.uniform(0.92, 1.09)))
+            self.price_walks[ingredient_id] = walk
+            row = {
+                "id": ingredient_id,
+                "name": f"{name} #{ingredient_id}",
+                "code": f"SYN-I{ingredient_id:07d}",
+                "type": kind,
+                "nitrogen": self._vary(n),
+                "phosphate": self._vary(p),
+                "potash": self._vary(k),
+                "sulfur": self._vary(s),
+                "density": density,
+                "cost_per_ton": round(walk[-1], 2),
+                "margin_percent": self.rng.choice([15, 18, 20, 22, 25]),
+                "is_available": self.rng.random() > 0.05,
+                "display_order": ingredient_id,
+                "source": "Synthetic",
+                "created_at": self.start,
+            }
+            self.ingredient_rows[ingredient_id] = row
+            yield row
+
+    def price_history(self, first_id: int, changed_by: List[int]) -> Iterator[Dict[str, Any]]:
+        history_id = first_id
+        for ingredient_id, walk in self.price_walks.items():
+            moments = sorted(self._moment() for _ in walk[1:])
+            for old, new, changed_at in zip(walk, walk[1:], moments):
+                yield {
+                    "id": history_id,
+                    "ingredient_id": ingredient_id,
+                    "old_price": round(old, 2),
+                    "new_price": round(new, 2),
+                    "changed_by": self.rng.choice(changed_by),
+                    "changed_at": changed_at,
+                    "reason": "Supplier price update",
+                }
+                history_id += 1
+
+    def chemicals(self, first_id: int) -> Iterator[Dict[str, Any]]:
+        for chemical_id in range(first_id, first_id + self.preset.chemicals):
+            yield {
+                "id": chemical_id,
+                "name": f"{self.rng.choice(CHEMICAL_NAMES)} #{chemical_id}",
+                "ai_percentage": round(self.rng.uniform(5, 60), 2),
+                "cost_per_unit": round(self.rng.uniform(8, 120), 2),
+                "display_order": chemical_id,
+                "created_at": self.start,
+            }
+
+    def customers(self, first_id: int) -> Iterator[Dict[str, Any]]:
+        for customer_id in range(first_id, first_id + self.preset.customers):
+            city, state = self.rng.choice(CITIES)
+            surname = self.rng.choice(SURNAMES)
+            yield {
+                "id": customer_id,
+                "name": f"{surname} Farms {customer_id}",
+                "code": f"SYN-C{customer_id:07d}",
+                "email": f"office{customer_id}@example.com",
+                "phone": f"912-555-{customer_id % 10000:04d}",
+                "city": city,
+                "state": state,
+                "zip_code": f"{30400 + customer_id % 600}",
+                "contact_person": (
+                    f"{self.rng.choice(['Jim', 'Ann', 'Lee', 'Ray', 'Sue'])} {surname}"
+                ),
+                "credit_limit": self.rng.choice([10000, 25000, 50000, 100000]),
+                "payment_terms": self.rng.choice(["Net 30", "Net 60", "Due on receipt"]),
+                "default_margin_type": "percent",
+                "default_margin_value": self.rng.choice([15, 18, 20]),
+                "is_active": self.rng.random() > 0.03,
+                "created_at": self._moment(),
+            }
+
+    def farms_and_fields(self, first_farm_id: int, first_field_id: int, customer_ids: range):
+        """Farm rows (1-3 per customer) and their field rows (1-4 per farm)"""
+        farms, fields = [], []
+        farm_id, field_id = first_farm_id, first_field_id
+        for customer_id in customer_ids:
+            for _ in range(self.rng.randint(1, 3)):
+                acres = 0.0
+                for number in range(1, self.rng.randint(1, 4) + 1):
+                    field_acres = round(self.rng.uniform(15, 240), 1)
+                    acres += field_acres
+                    fields.append({
+                        "id": field_id,
+                        "farm_id": farm_id,
+                        "name": f"Field {number}",
+                        "acres": field_acres,
+                        "crop_type": self.rng.choice(CROPS),
+                        "soil_ph": round(self.rng.uniform(5.2, 7.4), 1),
+                        "soil_om": round(self.rng.uniform(0.5, 3.5), 1),
+                        "soil_cec": round(self.rng.uniform(2, 15), 1),
+                        "created_at": self.start,
+                    })
+                    field_id += 1
+                farms.append({
+                    "id": farm_id,
+                    "customer_id": customer_id,
+                    "name": f"{self.rng.choice(FARM_WORDS)} Farm",
+                    "total_acres": round(acres, 1),
+                    "soil_type": self.rng.choice(SOILS),
+                    "irrigation_type": self.rng.choice(IRRIGATION),
+                    "created_at": self.start,
+                })
+                farm_id += 1
+        return farms, fields
+
+    def blends(self, first_id: int, created_by: List[int]):
+        """Blend rows and their blend_ingredients rows
+
+        Each blend mixes 2-5 catalog ingredients whose percentages sum to 100;
+        targets are the resulting analysis, so blends look like real grades.
+        """
+        self.blend_costs: Dict[int, float] = {}
+        ingredient_ids = list(self.ingredient_rows)
+        blends, links = [], []
+        for blend_id in range(first_id, first_id + self.preset.blends):
+            chosen = self.rng.sample(
+                ingredient_ids, min(len(ingredient_ids), self.rng.randint(2, 5))
+            )
+            weights = [self.rng.uniform(1, 10) for _ in chosen]
+            percentages = [round(100 * weight / sum(weights), 2) for weight in weights]
+            percentages[-1] = round(100 - sum(percentages[:-1]), 2)
+
+            targets = {"n": 0.0, "p": 0.0, "k": 0.0, "s": 0.0}
+            cost = 0.0
+            for ingredient_id, percentage in zip(chosen, percentages):
+                row = self.ingredient_rows[ingredient_id]
+                targets["n"] += row["nitrogen"] * percentage / 100
+                targets["p"] += row["phosphate"] * percentage / 100
+                targets["k"] += row["potash"] * percentage / 100
+                targets["s"] += row["sulfur"] * percentage / 100
+                cost += row["cost_per_ton"] * percentage / 100
+                links.append({
+                    "blend_id": blend_id,
+                    "ingredient_id": ingredient_id,
+                    "percentage": percentage,
+                    "amount": round(percentage * 20, 1),  # lbs per 2000 lb ton
+                })
+            self.blend_costs[blend_id] = cost
+
+            grade = "-".join(str(round(targets[key])) for key in ("n", "p", "k"))
+            blends.append({
+                "id": blend_id,
+                "name": f"{grade} Blend #{blend_id}",
+                "code": f"SYN-B{blend_id:07d}",
+                "is_template": self.rng.random() < 0.1,
+                "is_active": self.rng.random() > 0.05,
+                "target_n": round(targets["n"], 2),
+                "target_p": round(targets["p"], 2),
+                "target_k": round(targets["k"], 2),
+                "target_s": round(targets["s"], 2),
+                "application_rate": self.rng.choice([100, 150, 200, 250, 300, 400]),
+                "application_unit": "lbs/acre",
+                "created_by": self.rng.choice(created_by),
+                "created_at": self._moment(),
+            })
+        return blends, links
+
+    def quotes(
+        self, first_id: int, customer_ids: range, created_by: List[int]
+    ) -> Iterator[Dict[str, Any]]:
+        blend_ids = list(self.blend_costs)
+        recent = self.now - timedelta(days=60)
+        statuses = {
+            age: (list(weights), list(weights.values()))
+            for age, weights in (("old", STATUS_WEIGHTS_OLD), ("recent", STATUS_WEIGHTS_RECENT))
+        }
+        for quote_id in range(first_id, first_id + self.preset.quotes):
+            blend_id = self.rng.choice(blend_ids)
+            created_at = self._moment()
+            choices, weights = statuses["recent" if created_at >= recent else "old"]
+            status = self.rng.choices(choices, weights)[0]
+
+            margin = self.rng.choice([12, 15, 18, 20, 25])
+            unit_price = round(self.blend_costs[blend_id] * (1 + margin / 100), 2)
+            quantity = round(self.rng.uniform(2, 60), 1)
+            services = {"spreading": 8.5} if self.rng.random() < 0.4 else {}
+            acres = round(quantity * 2000 / self.rng.choice([150, 200, 250, 300]), 1)
+            services_total = round(sum(services.values()) * acres, 2)
+            total = round(unit_price * quantity + services_total, 2)
+            sent_at = created_at + timedelta(hours=self.rng.randint(1, 72))
+
+            yield {
+                "id": quote_id,
+                "quote_number": f"SYN-Q{quote_id:09d}",
+                "customer_id": self.rng.choice(customer_ids),
+                "blend_id": blend_id,
+                "quantity": quantity,
+                "unit_price": unit_price,
+                "total_price": total,
+                "margin_type": "percent",
+                "margin_value": margin,
+                "services": services,
+                "services_total": services_total,
+                "application_acres": acres,
+                "cost_per_acre": round(total / acres, 2),
+                "status": status,
+                "valid_until": created_at + timedelta(days=30),
+                "created_by": self.rng.choice(created_by),
+                "created_at": created_at,
+                "sent_at": None if status == QuoteStatus.DRAFT else sent_at,
+                "accepted_at": (
+                    sent_at + timedelta(days=self.rng.randint(0, 14))
+                    if status == QuoteStatus.ACCEPTED
+                    else None
+                ),
+            }
+
+
+def _next_id(conn: Connection, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def generate(
+    engine: Engine,
+    preset: Preset,
+    seed: int = 42,
+    chunk_size: int = SYNTHETIC_CHUNK_SIZE,
+    today: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """Load a full synthetic dataset; returns rows written per table"""
+    data = SyntheticData(preset, seed, today)
+    counts: Dict[str, int] = {}
+    started = time.perf_counter()
+
+    # One transaction per table keeps each load's locks and WAL bounded
+    def load(table: Table, rows) -> None:
+        with engine.begin() as conn:
+            loaded = BulkLoader(conn, chunk_size).load(table, rows)
+            counts[table.name] = counts.get(table.name, 0) + loaded
+            bump(conn, [table.name])
+
+    with engine.connect() as conn:
+        first = {
+            model: _next_id(conn, model)
+            for model in (
+                User, Ingredient, PriceHistory, Chemical, Customer, Farm, Field, Blend, Quote
+            )
+        }
+
+    # One bcrypt hash shared by every synthetic rep; the password is "synthetic"
+    load(User.__table__, data.users(first[User], get_password_hash("synthetic")))
+    reps = list(range(first[User], first[User] + preset.sales_reps))
+    load(Ingredient.__table__, data.ingredients(first[Ingredient]))
+    load(PriceHistory.__table__, data.price_history(first[PriceHistory], reps))
+    load(Chemical.__table__, data.chemicals(first[Chemical]))
+
+    customer_ids = range(first[Customer], first[Customer] + preset.customers)
+    load(Customer.__table__, data.customers(first[Customer]))
+    # Farms and fields go in per slice of customers so the Pi never holds them all
+    farm_id, field_id = first[Farm], first[Field]
+    for offset in range(0, len(customer_ids), chunk_size):
+        farms, fields = data.farms_and_fields(
+            farm_id, field_id, customer_ids[offset:offset + chunk_size]
+        )
+        load(Farm.__table__, farms)
+        load(Field.__table__, fields)
+        farm_id, field_id = farm_id + len(farms), field_id + len(fields)
+
+    blends, links = data.blends(first[Blend], reps)
+    load(Blend.__table__, blends)
+    load(blend_ingredients, links)
+    load(Quote.__table__, data.quotes(first[Quote], customer_ids, reps))
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            # Explicit ids bypass the serial sequences; move them past the new rows
+            for model in first:
+                table = model.__tablename__
+                conn.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT max(id) FROM {table}))"
+                    )
+                )
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+
+    logger.info(f"Synthetic dataset loaded in {time.perf_counter() - started:.1f}s: {counts}")
+    return counts
+
+
+def main(argv: Optional[List[str]] = None):
+    """Bulk-load a reproducible synthetic dataset for scale testing"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="pi")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=SYNTHETIC_CHUNK_SIZE)
+    for field in Preset._fields:
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, help="override the preset")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    overrides = {
+        field: getattr(args, field) for field in Preset._fields if getattr(args, field) is not None
+    }
+    preset = PRESETS[args.preset]._replace(**overrides)
+    generate(database.engine, preset, args.seed, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
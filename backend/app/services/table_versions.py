@@ -0,0 +1,77 @@
+"""
+SurBlend Table Version Service
+Monotonic change counters for catalog tables, bumped inside the writing transaction
+"""
+
+import logging
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models import TableVersion
+
+logger = logging.getLogger(__name__)
+
+# Tables whose readers cache or validate against a version
+VERSIONED_TABLES = ("ingredients", "blends", "chemicals")
+# Writes to these tables count as writes to the versioned table they belong to
+PARENT_TABLES = {"blend_ingredients": "blends", "blend_chemicals": "blends"}
+
+
+@event.listens_for(TableVersion.__table__, "after_create")
+def _seed(target, connection, **kw):
+    connection.execute(
+        insert(target), [{"table_name": name, "version": 0} for name in VERSIONED_TABLES]
+    )
+
+
+def _versioned(tables: Iterable[str]) -> List[str]:
+    names = {PARENT_TABLES.get(name, name) for name in tables}
+    return sorted(names.intersection(VERSIONED_TABLES))
+
+
+def bump(connection: Connection, tables: Iterable[str]):
+    """Advance the counters of ``tables`` in the connection's transaction
+
+    The row lock serializes concurrent writers, and the new value becomes
+    visible exactly when the write commits, so readers never pair a new
+    version with old rows. Writes through a Session are counted
+    automatically; Core writes on a bare connection must call this.
+    """
+    names = _versioned(tables)
+    if names:
+        connection.execute(
+            update(TableVersion)
+            .where(TableVersion.table_name.in_(names))
+            .values(version=TableVersion.version + 1)
+        )
+
+
+def table_versions(db, *tables: str) -> Tuple[int, ...]:
+    """Current counters of ``tables``, in the order given"""
+    rows = dict(
+        db.execute(
+            select(TableVersion.table_name, TableVersion.version).where(
+                TableVersion.table_name.in_(tables)
+            )
+        ).all()
+    )
+    return tuple(rows.get(name, 0) for name in tables)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_flushed(session: Session, flush_context, instances):
+    changed = {obj.__table__.name for obj in (*session.new, *session.deleted)}
+    changed.update(obj.__table__.name for obj in session.dirty if session.is_modified(obj))
+    if _versioned(changed):
+        bump(session.connection(), changed)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_bulk(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            bump(orm_execute_state.session.connection(), [table.name])
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for SurBlend list responses
+Compares ORM + Pydantic response models against Core rows + prebuilt serializers
+
+Run from backend/:  python -m benchmarks.bench_serialization --rows 2000
+"""
+
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Blend, Ingredient, IngredientType, Quote, QuoteStatus, blend_ingredients
+from app.schemas.schemas import BlendResponse, IngredientResponse, QuoteResponse
+from app.services.blend_analysis import BlendAnalysis, analysis_cache, compute_analyses
+from app.services.serialization import (
+    blend_serializer,
+    dump_blends,
+    dump_json,
+    ingredient_serializer,
+    quote_serializer,
+)
+
+
+def _money(rng: random.Random, low: float, high: float) -> Decimal:
+    return Decimal(str(round(rng.uniform(low, high), 2)))
+
+
+def seed(session, rows: int, rng: random.Random):
+    """Insert ``rows`` ingredients, blends and quotes"""
+    now = datetime(2025, 1, 1)
+    ingredients = [
+        Ingredient(
+            name=f"Ingredient {i}",
+            code=f"ING{i}",
+            type=rng.choice(list(IngredientType)),
+            nitrogen=_money(rng, 0, 46),
+            phosphate=_money(rng, 0, 52),
+            potash=_money(rng, 0, 60),
+            sulfur=_money(rng, 0, 24),
+            cost_per_ton=_money(rng, 200, 900),
+            density=rng.uniform(40, 70),
+            updated_at=now + timedelta(minutes=i),
+        )
+        for i in range(rows)
+    ]
+    blends = [
+        Blend(name=f"Blend {i}", code=f"B{i}", target_n=_money(rng, 0, 30)) for i in range(rows)
+    ]
+    session.add_all(ingredients + blends)
+    session.flush()
+
+    links = []
+    for blend in blends:
+        chosen = rng.sample(ingredients, 3)
+        for ingredient, percentage in zip(chosen, (50.0, 30.0, 20.0)):
+            links.append(
+                {
+                    "blend_id": blend.id,
+                    "ingredient_id": ingredient.id,
+                    "percentage": percentage,
+                    "amount": percentage * 20,
+                }
+            )
+    session.execute(blend_ingredients.insert(), links)
+
+    session.add_all(
+        Quote(
+            quote_number=f"Q-{i:06d}",
+            customer_id=1,
+            blend_id=rng.choice(blends).id,
+            quantity=rng.uniform(1, 40),
+            unit_price=_money(rng, 300, 900),
+            total_price=_money(rng, 1000, 30000),
+            margin_type="percent",
+            margin_value=_money(rng, 5, 30),
+            services_total=Decimal("0.00"),
+            status=rng.choice(list(QuoteStatus)),
+            created_by=1,
+        )
+        for i in range(rows)
+    )
+    session.commit()
+
+
+def analysis_fields(analysis: BlendAnalysis) -> Dict[str, object]:
+    """Values for the calculated fields of ``BlendResponse``"""
+    return {
+        "total_n": analysis.total_n,
+        "total_p": analysis.total_p,
+        "total_k": analysis.total_k,
+        "cost_per_ton": analysis.cost_per_ton,
+        "guaranteed_analysis": analysis.nutrients,
+    }
+
+
+def orm_blend_responses(session) -> List[BlendResponse]:
+    """The reference path: ORM blends, their composition and analysis, validated"""
+    blends = session.query(Blend).order_by(Blend.id).all()
+    composition: Dict[int, List[Dict[str, object]]] = {blend.id: [] for blend in blends}
+    links = session.execute(
+        select(
+            blend_ingredients.c.blend_id,
+            blend_ingredients.c.ingredient_id,
+            blend_ingredients.c.percentage,
+            blend_ingredients.c.amount,
+        ).order_by(blend_ingredients.c.blend_id, blend_ingredients.c.ingredient_id)
+    ).all()
+    for blend_id, ingredient_id, percentage, amount in links:
+        composition[blend_id].append(
+            {"ingredient_id": ingredient_id, "percentage": percentage, "amount": amount}
+        )
+    analyses = compute_analyses(session, composition, [link[:3] for link in links])
+    return [
+        BlendResponse.model_validate(
+            {
+                **{column.name: getattr(blend, column.name) for column in Blend.__table__.columns},
+                "ingredients": composition[blend.id],
+                **analysis_fields(analyses[blend.id]),
+            }
+        )
+        for blend in blends
+    ]
+
+
+def measure(label: str, func: Callable[[], bytes], repeat: int) -> float:
+    """Best wall time of ``repeat`` runs, in milliseconds"""
+    func()  # warm caches and prepared statements
+    best = min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+    print(f"  {label:<10} {best:9.2f} ms")
+    return best
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000, help="rows per table")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        seed(session, args.rows, random.Random(args.seed))
+
+    ingredient_adapter = TypeAdapter(List[IngredientResponse])
+    quote_adapter = TypeAdapter(List[QuoteResponse])
+    blend_adapter = TypeAdapter(List[BlendResponse])
+
+    def pydantic_ingredients() -> bytes:
+        with Session() as session:
+            items = ingredient_adapter.validate_python(session.query(Ingredient).all())
+            return ingredient_adapter.dump_json(items)
+
+    def fast_ingredients() -> bytes:
+        with Session() as session:
+            rows = session.execute(ingredient_serializer.select())
+            return dump_json(ingredient_serializer.dump_all(rows))
+
+    def pydantic_quotes() -> bytes:
+        with Session() as session:
+            items = quote_adapter.validate_python(session.query(Quote).all())
+            return quote_adapter.dump_json(items)
+
+    def fast_quotes() -> bytes:
+        with Session() as session:
+            rows = session.execute(quote_serializer.select())
+            return dump_json(quote_serializer.dump_all(rows))
+
+    def pydantic_blends() -> bytes:
+        with Session() as session:
+            return blend_adapter.dump_json(orm_blend_responses(session))
+
+    def fast_blends() -> bytes:
+        with Session() as session:
+            rows = session.execute(blend_serializer.select()).all()
+            return dump_json(dump_blends(session, rows))
+
+    cases = [
+        ("ingredients", pydantic_ingredients, fast_ingredients),
+        ("blends", pydantic_blends, fast_blends),
+        ("quotes", pydantic_quotes, fast_quotes),
+    ]
+    print(f"{args.rows} rows per response, best of {args.repeat}")
+    for name, slow, fast in cases:
+        # Both paths must produce the same document before timing means anything
+        analysis_cache.clear()
+        if orjson.loads(slow()) != orjson.loads(fast()):
+            raise SystemExit(f"{name}: fast path output differs from the response model")
+
+        print(f"{name}:")
+        slow_ms = measure("pydantic", slow, args.repeat)
+        fast_ms = measure("fast", fast, args.repeat)
+        print(f"  speedup    {slow_ms / fast_ms:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
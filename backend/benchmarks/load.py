@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+HTTP load benchmark for the core SurBlend API flows
+Drives scripted workloads against the ASGI app in-process (or a running server)
+and reports latency percentiles, throughput and DB statements per request
+
+Run from backend/:  python -m benchmarks.load --scenario mixed --duration 20
+Live server:        python -m benchmarks.load --url http://127.0.0.1:8000 --password ...
+Compare a run:      python -m benchmarks.load --baseline benchmarks/results/baseline.json
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.auth.security import get_password_hash, login_rate_limiter
+from app.database import Base, get_db
+from app.main import app
+from app.models import User, UserRole
+from app.services.activity import activity_recorder
+from app.services.cache import response_cache
+from app.services.job_events import job_events
+from app.services.synthetic import PRESETS, generate
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+BENCH_USER = "loadtest"
+BENCH_PASSWORD = "loadtest-password"
+
+# Statement counter for the request the current task is making; in-process the
+# app runs inside the caller's task (and its threadpool copies the context)
+_statements: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "statements", default=None
+)
+
+
+class Sample(NamedTuple):
+    workload: str
+    status: int
+    seconds: float
+    statements: Optional[int]
+
+
+class Context(NamedTuple):
+    headers: Dict[str, str]
+    ingredient_pages: int
+    customer_ids: range
+    rng: random.Random
+
+
+Workload = Callable[[httpx.AsyncClient, Context], Awaitable[httpx.Response]]
+
+
+async def login(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.post(
+        "/api/users/token", data={"username": BENCH_USER, "password": BENCH_PASSWORD}
+    )
+
+
+async def ingredient_page(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    page = ctx.rng.randint(1, ctx.ingredient_pages)
+    return await client.get(f"/api/ingredients/?page={page}&size=50", headers=ctx.headers)
+
+
+async def blend_page(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get("/api/blends/?size=50", headers=ctx.headers)
+
+
+async def blend_plan(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    customer_id = ctx.rng.choice(ctx.customer_ids)
+    return await client.get(f"/api/customers/{customer_id}/recommendations", headers=ctx.headers)
+
+
+async def quote_list(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    page = ctx.rng.randint(1, 20)
+    return await client.get(f"/api/quotes/?page={page}&size=50", headers=ctx.headers)
+
+
+async def dashboard(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get("/api/analytics/dashboard", headers=ctx.headers)
+
+
+WORKLOADS: Dict[str, Workload] = {
+    "login": login,
+    "ingredient_page": ingredient_page,
+    "blend_page": blend_page,
+    "blend_plan": blend_plan,
+    "quote_list": quote_list,
+    "dashboard": dashboard,
+}
+
+# Scenario -> workload weights
+SCENARIOS: Dict[str, Dict[str, int]] = {
+    "login-storm": {"login": 1},
+    "catalog": {"ingredient_page": 3, "blend_page": 1},
+    "plans": {"blend_plan": 1},
+    "quotes": {"quote_list": 1},
+    "dashboard": {"dashboard": 1},
+    "mixed": {
+        "login": 1, "ingredient_page": 6, "blend_page": 3, "blend_plan": 2, "quote_list": 4,
+        "dashboard": 4,
+    },
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def count_statements(engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter = _statements.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+def setup_in_process(preset_name: str, seed: int) -> None:
+    """Point the app at a fresh SQLite file loaded with a synthetic dataset"""
+    path = os.path.join(tempfile.mkdtemp(prefix="surblend-load-"), "load.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    generate(engine, PRESETS[preset_name], seed=seed)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        db.add(
+            User(
+                username=BENCH_USER,
+                email="loadtest@example.com",
+                hashed_password=get_password_hash(BENCH_PASSWORD),
+                role=UserRole.ADMIN,
+                is_active=True,
+            )
+        )
+        db.commit()
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Every virtual user shares one client address; measure logins, not the limiter
+    login_rate_limiter.calls = 2**31
+    activity_recorder.session_factory = Session
+    job_events.session_factory = Session
+    response_cache.invalidate()
+    count_statements(engine)
+
+
+async def virtual_user(
+    client: httpx.AsyncClient,
+    ctx: Context,
+    weights: Dict[str, int],
+    deadline: float,
+    remaining: List[int],
+    samples: List[Sample],
+) -> None:
+    names, counts = list(weights), list(weights.values())
+    while time.monotonic() < deadline and remaining[0] > 0:
+        remaining[0] -= 1
+        name = ctx.rng.choices(names, counts)[0]
+        counter = [0]
+        token = _statements.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await WORKLOADS[name](client, ctx)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        finally:
+            _statements.reset(token)
+        samples.append(Sample(name, status, time.perf_counter() - started, counter[0]))
+
+
+def summarize(samples: List[Sample], elapsed: float, in_process: bool) -> Dict[str, Any]:
+    by_workload: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_workload[sample.workload].append(sample)
+    by_workload["total"] = samples
+
+    summary = {}
+    for name, group in by_workload.items():
+        latencies = [sample.seconds * 1000 for sample in group]
+        ok = [sample for sample in group if 200 <= sample.status < 400]
+        summary[name] = {
+            "requests": len(group),
+            "errors": len(group) - len(ok),
+            "statuses": dict(Counter(str(sample.status) for sample in group)),
+            "rps": round(len(group) / elapsed, 2),
+            "mean_ms": round(statistics.fmean(latencies), 2),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "statements_per_request": (
+                round(statistics.fmean(sample.statements for sample in group), 2)
+                if in_process
+                else None
+            ),
+        }
+    return summary
+
+
+def print_summary(summary: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    print(
+        f"{'workload':<16}{'reqs':>7}{'err':>6}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'stmts':>7}"
+    )
+    for name, row in summary.items():
+        statements = row["statements_per_request"]
+        line = (
+            f"{name:<16}{row['requests']:>7}{row['errors']:>6}{row['rps']:>9.1f}"
+            f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+            f"{'-' if statements is None else f'{statements:.1f}':>7}"
+        )
+        old = (baseline or {}).get(name)
+        if old:
+            line += (
+                f"   p95 {(row['p95_ms'] / old['p95_ms'] - 1) * 100:+.0f}%"
+                f"  rps {(row['rps'] / old['rps'] - 1) * 100:+.0f}%"
+            )
+        print(line)
+
+
+async def run(args) -> Dict[str, Any]:
+    preset = PRESETS[args.preset]
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        setup_in_process(args.preset, args.seed)
+        activity_recorder.start()
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://load.test"
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, timeout=args.timeout
+    ) as client:
+        response = await client.post(
+            "/api/users/token",
+            data={"username": args.username, "password": args.password},
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        weights = SCENARIOS[args.scenario]
+        samples: List[Sample] = []
+        remaining = [args.requests or 2**62]
+        deadline = time.monotonic() + args.duration
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                virtual_user(
+                    client,
+                    # Ids assume the synthetic preset was loaded into an empty database
+                    Context(
+                        headers,
+                        max(1, preset.ingredients // 50),
+                        range(1, preset.customers + 1),
+                        random.Random(args.seed * 1000 + user),
+                    ),
+                    weights,
+                    deadline,
+                    remaining,
+                    samples,
+                )
+                for user in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    if not args.url:
+        await activity_recorder.stop()
+
+    return {
+        "meta": {
+            "scenario": args.scenario,
+            "preset": args.preset,
+            "target": args.url or "in-process",
+            "concurrency": args.concurrency,
+            "seconds": round(elapsed, 2),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "workloads": summarize(samples, elapsed, in_process=not args.url),
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="tiny",
+                        help="synthetic dataset to load (in-process) or assume (--url)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="virtual users")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="benchmark a running server instead of in-process")
+    parser.add_argument("--username", default=BENCH_USER)
+    parser.add_argument("--password", default=BENCH_PASSWORD)
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/)")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)["workloads"]
+
+    meta = results["meta"]
+    print(
+        f"{meta['scenario']} on {meta['target']} ({meta['preset']} data), "
+        f"{meta['concurrency']} users, {meta['seconds']}s"
+    )
+    print_summary(results["workloads"], baseline)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load-{args.scenario}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
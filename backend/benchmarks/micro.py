@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for SurBlend's computational kernels
+Times nutrient matrix assembly, blend analysis, blend pricing, field rate
+optimization and CSV parsing across catalog sizes, and compares the run
+against a checked-in baseline
+
+Run from backend/:  python -m benchmarks.micro
+Refresh baseline:   python -m benchmarks.micro --save benchmarks/baselines/micro.json
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.services.blend_analysis import (
+    NUTRIENTS,
+    analyses_from_matrices,
+    composition_matrix,
+    fraction_matrix,
+)
+from app.services.imports import parse_ingredient_row
+from app.services.price_history import PriceTimeline, _to_micros
+from app.services.recommendations import (
+    CROP_REQUIREMENTS,
+    FieldInputs,
+    blend_rates,
+    nutrient_targets,
+)
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "micro.json")
+SIZES = (10, 100, 1_000, 10_000)
+# Blends analysed or priced per call, about one screen of quotes
+BLENDS = 200
+# A case fails when its median is this much slower than the baseline's
+DEFAULT_THRESHOLD = 0.25
+
+# name -> setup(size, rng) returning the zero-argument callable to time
+BENCHMARKS: Dict[str, Callable[[int, random.Random], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def _catalog_rows(size: int, rng: random.Random) -> List[tuple]:
+    """(id, *NUTRIENTS, cost_per_ton) rows with Decimal values, as the driver returns them"""
+    return [
+        (
+            i,
+            *(Decimal(f"{rng.uniform(0, 46):.2f}") for _ in NUTRIENTS),
+            Decimal(f"{rng.uniform(100, 900):.2f}"),
+        )
+        for i in range(1, size + 1)
+    ]
+
+
+def _blend_links(size: int, rng: random.Random) -> List[tuple]:
+    links = []
+    for blend_id in range(1, BLENDS + 1):
+        chosen = rng.sample(range(1, size + 1), min(size, rng.randint(2, 5)))
+        for ingredient_id in chosen:
+            links.append((blend_id, ingredient_id, 100.0 / len(chosen)))
+    return links
+
+
+@benchmark("nutrient_matrix")
+def bench_nutrient_matrix(size: int, rng: random.Random):
+    rows = _catalog_rows(size, rng)
+    index = {row[0]: j for j, row in enumerate(rows)}
+    return lambda: composition_matrix(rows, index)
+
+
+@benchmark("blend_analysis")
+def bench_blend_analysis(size: int, rng: random.Random):
+    rows = _catalog_rows(size, rng)
+    links = _blend_links(size, rng)
+
+    def run():
+        used = sorted({ingredient_id for _, ingredient_id, _ in links})
+        blend_index = {blend_id: i for i, blend_id in enumerate(range(1, BLENDS + 1))}
+        ingredient_index = {ingredient_id: j for j, ingredient_id in enumerate(used)}
+        catalog = [row for row in rows if row[0] in ingredient_index]
+        return analyses_from_matrices(
+            blend_index,
+            fraction_matrix(links, blend_index, ingredient_index),
+            composition_matrix(catalog, ingredient_index),
+        )
+
+    return run
+
+
+@benchmark("blend_pricing")
+def bench_blend_pricing(size: int, rng: random.Random):
+    """Monthly cost of BLENDS blends over a year of ingredient price changes"""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    current = {i: rng.uniform(100, 900) for i in range(1, size + 1)}
+    history = []
+    for ingredient_id in current:
+        price = current[ingredient_id]
+        for day in sorted(rng.sample(range(365), 12)):
+            new = price * rng.uniform(0.92, 1.09)
+            history.append((ingredient_id, start + timedelta(days=day), price, new))
+            price = new
+    links = _blend_links(size, rng)
+    ingredient_ids = list(current)
+    index = {ingredient_id: j for j, ingredient_id in enumerate(ingredient_ids)}
+    weights = fraction_matrix(links, {b: b - 1 for b in range(1, BLENDS + 1)}, index)
+    instants = np.array(
+        [_to_micros(start + timedelta(days=30 * month)) for month in range(12)], dtype=np.int64
+    )
+
+    def run():
+        timeline = PriceTimeline.build(current, history)
+        return weights @ timeline.price_matrix(ingredient_ids, instants)
+
+    return run
+
+
+@benchmark("field_rates")
+def bench_field_rates(size: int, rng: random.Random):
+    """Targets and blend rates for ``size`` fields (the recommendation optimizer)"""
+    crops = list(CROP_REQUIREMENTS) + [None]
+    inputs = FieldInputs.from_rows(
+        (
+            i,
+            rng.uniform(10, 200),
+            rng.choice(crops),
+            None if rng.random() < 0.1 else rng.uniform(5.0, 7.5),
+            rng.uniform(0.5, 4.0),
+            rng.uniform(2, 20),
+        )
+        for i in range(size)
+    )
+
+    def run():
+        targets = nutrient_targets(inputs)
+        return blend_rates(targets, inputs.acres, (17, 17, 17), cost_per_ton=520.0)
+
+    return run
+
+
+@benchmark("csv_parse")
+def bench_csv_parse(size: int, rng: random.Random):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["name", "code", "type", "nitrogen", "phosphate", "potash", "cost_per_ton"])
+    for i in range(size):
+        writer.writerow(
+            [f"Ingredient {i}", f"I{i}", "dry", f"{rng.uniform(0, 46):.2f}",
+             f"{rng.uniform(0, 52):.2f}", f"{rng.uniform(0, 60):.2f}", f"{rng.uniform(100, 900):.2f}"]
+        )
+    text = buffer.getvalue()
+
+    def run():
+        return [parse_ingredient_row(row) for row in csv.DictReader(io.StringIO(text))]
+
+    return run
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Per-call timings in microseconds over ``repeat`` calibrated rounds"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()  # enough calls for a round to take >= 0.2s
+    rounds = [seconds / number * 1e6 for seconds in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "median_us": round(statistics.median(rounds), 3),
+        "min_us": round(min(rounds), 3),
+        "stdev_us": round(statistics.stdev(rounds), 3) if len(rounds) > 1 else 0.0,
+        "calls": number * repeat,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float
+) -> List[str]:
+    """Cases whose median regressed past ``threshold``; prints every comparison"""
+    regressions = []
+    for case, result in results.items():
+        old = baseline.get(case)
+        if old is None:
+            continue
+        change = result["median_us"] / old["median_us"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(case)
+        print(f"  {case:<28}{old['median_us']:>14.1f}{result['median_us']:>14.1f}{change:>+9.0%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", dest="only", help="only cases whose name contains this")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="write results JSON here")
+    parser.add_argument("--baseline", default=BASELINE, help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed median slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, setup in BENCHMARKS.items():
+        if args.only and args.only not in name:
+            continue
+        for size in args.sizes:
+            case = f"{name}[{size}]"
+            results[case] = measure(setup(size, random.Random(args.seed)), args.repeat)
+            print(f"{case:<28}{results[case]['median_us']:>14.1f} us")
+
+    document = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(document, fh, indent=2)
+        print(f"Saved {args.save}")
+        return
+
+    if not os.path.exists(args.baseline):
+        return
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    if baseline["meta"]["machine"] != document["meta"]["machine"]:
+        print(f"Note: baseline was recorded on {baseline['meta']['machine']}, "
+              f"this run is on {document['meta']['machine']}")
+    print(f"\nAgainst {args.baseline} (threshold {args.threshold:.0%}):")
+    print(f"  {'case':<28}{'baseline us':>14}{'now us':>14}{'change':>9}")
+    regressions = compare(results, baseline["results"], args.threshold)
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Soak test for memory growth in the SurBlend API
+Drives mixed traffic for hours while sampling every worker's RSS, fits each
+worker's growth rate after warm-up and fails when one exceeds the budget
+
+Run from backend/:  python -m benchmarks.soak --hours 2
+Live server:        python -m benchmarks.soak --url http://127.0.0.1:8000 --password ... --hours 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import psutil
+
+from app.main import app
+from app.services.activity import activity_recorder
+from app.services.synthetic import PRESETS
+from benchmarks.load import (
+    BENCH_PASSWORD,
+    BENCH_USER,
+    RESULTS_DIR,
+    SCENARIOS,
+    Context,
+    Sample,
+    percentile,
+    setup_in_process,
+    virtual_user,
+)
+
+# Allowed RSS growth per worker after warm-up, in MB per hour
+DEFAULT_MAX_GROWTH = 5.0
+
+
+def find_workers(match: str) -> List[psutil.Process]:
+    """Processes whose command line contains ``match``, plus all their children"""
+    found: Dict[int, psutil.Process] = {}
+    for proc in psutil.process_iter(["cmdline"]):
+        if proc.pid != os.getpid() and match in " ".join(proc.info["cmdline"] or ()):
+            for member in [proc, *proc.children(recursive=True)]:
+                found[member.pid] = member
+    return list(found.values())
+
+
+def growth_mb_per_hour(points: List[Tuple[float, float]]) -> Optional[float]:
+    """Least-squares slope of (seconds, MB) points, in MB per hour"""
+    if len(points) < 3:
+        return None
+    slope, _ = statistics.linear_regression(*zip(*points))
+    return round(slope * 3600, 3)
+
+
+async def take_snapshot(client: httpx.AsyncClient, headers: Dict[str, str]) -> Optional[Dict]:
+    response = await client.post(
+        "/api/system/memory/snapshot", params={"limit": 15}, headers=headers
+    )
+    return response.json() if response.status_code == 200 else None
+
+
+async def monitor(
+    procs: List[psutil.Process],
+    samples: List[Sample],
+    timeline: List[Dict[str, Any]],
+    started: float,
+    deadline: float,
+    interval: float,
+) -> None:
+    """Every ``interval`` seconds, record RSS per process and the window's latency"""
+    while time.monotonic() < deadline:
+        await asyncio.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+        window = samples[:]
+        samples.clear()
+        rss = {}
+        for proc in procs:
+            try:
+                rss[str(proc.pid)] = round(proc.memory_info().rss / 1024 / 1024, 2)
+            except psutil.NoSuchProcess:
+                rss[str(proc.pid)] = None
+        latencies = [sample.seconds * 1000 for sample in window]
+        row = {
+            "elapsed_s": round(time.monotonic() - started, 1),
+            "requests": len(window),
+            "errors": sum(1 for sample in window if not 200 <= sample.status < 400),
+            "p95_ms": round(percentile(latencies, 95), 2) if latencies else None,
+            "rss_mb": rss,
+        }
+        timeline.append(row)
+        print(
+            f"{row['elapsed_s']:>9.0f}s {row['requests']:>7} reqs {row['errors']:>5} err "
+            f"p95 {row['p95_ms'] or 0:>7.1f}ms  "
+            + "  ".join(f"{pid}:{mb}MB" for pid, mb in rss.items()),
+            flush=True,
+        )
+
+
+async def run(args) -> Dict[str, Any]:
+    preset = PRESETS[args.preset]
+    if args.url:
+        transport = None
+        base_url = args.url
+        procs = (
+            [psutil.Process(pid) for pid in args.pids] if args.pids else find_workers(args.match)
+        )
+        if not procs:
+            sys.exit(f"No process matching {args.match!r}; pass --pids")
+    else:
+        setup_in_process(args.preset, args.seed)
+        activity_recorder.start()
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://soak.test"
+        # The app shares this process, so its RSS includes the harness itself
+        procs = [psutil.Process()]
+
+    duration = args.hours * 3600
+    warmup = min(args.warmup * 60, duration / 2)
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, timeout=args.timeout
+    ) as client:
+        response = await client.post(
+            "/api/users/token", data={"username": args.username, "password": args.password}
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        samples: List[Sample] = []
+        timeline: List[Dict[str, Any]] = []
+        started = time.monotonic()
+        deadline = started + duration
+        snapshots = {}
+
+        async def after_warmup():
+            await asyncio.sleep(warmup)
+            if args.tracemalloc:
+                snapshots["start"] = await take_snapshot(client, headers)
+
+        await asyncio.gather(
+            monitor(procs, samples, timeline, started, deadline, args.interval),
+            after_warmup(),
+            *(
+                virtual_user(
+                    client,
+                    Context(
+                        headers,
+                        max(1, preset.ingredients // 50),
+                        range(1, preset.customers + 1),
+                        random.Random(args.seed * 1000 + user),
+                    ),
+                    SCENARIOS[args.scenario],
+                    deadline,
+                    [2**62],
+                    samples,
+                )
+                for user in range(args.concurrency)
+            ),
+        )
+        if args.tracemalloc:
+            snapshots["end"] = await take_snapshot(client, headers)
+
+    if not args.url:
+        await activity_recorder.stop()
+
+    growth = {}
+    for proc in procs:
+        points = [
+            (row["elapsed_s"], row["rss_mb"][str(proc.pid)])
+            for row in timeline
+            if row["elapsed_s"] >= warmup and row["rss_mb"].get(str(proc.pid)) is not None
+        ]
+        growth[str(proc.pid)] = growth_mb_per_hour(points)
+
+    return {
+        "meta": {
+            "scenario": args.scenario,
+            "preset": args.preset,
+            "target": args.url or "in-process",
+            "concurrency": args.concurrency,
+            "hours": args.hours,
+            "warmup_minutes": warmup / 60,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "growth_mb_per_hour": growth,
+        "max_growth_mb_per_hour": args.max_growth,
+        "tracemalloc": snapshots.get("end"),
+        "timeline": timeline,
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--warmup", type=float, default=10.0,
+                        help="minutes excluded from the growth fit (caches filling up)")
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds between RSS samples")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="tiny")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="soak a running server instead of in-process")
+    parser.add_argument("--match", default="app.main:app",
+                        help="with --url: command-line substring identifying the server")
+    parser.add_argument("--pids", type=int, nargs="+", help="with --url: processes to watch")
+    parser.add_argument("--username", default=BENCH_USER)
+    parser.add_argument("--password", default=BENCH_PASSWORD)
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="diff tracemalloc snapshots (admin user) from warm-up to the end")
+    parser.add_argument("--max-growth", type=float, default=DEFAULT_MAX_GROWTH,
+                        help="MB/hour per worker before the run fails")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/)")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"soak-{args.scenario}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2)
+    print(f"Saved {output}")
+
+    if results["tracemalloc"]:
+        print(f"\nTop allocation growth in pid {results['tracemalloc']['pid']}:")
+        for stat in results["tracemalloc"]["top"]:
+            print(f"  {stat.get('size_diff_kb', 0):>+10.1f} KB  {stat['where'][0]}")
+
+    leaking = []
+    print("\nRSS growth after warm-up:")
+    for pid, growth in results["growth_mb_per_hour"].items():
+        flag = ""
+        if growth is not None and growth > args.max_growth:
+            flag = "  OVER BUDGET"
+            leaking.append(pid)
+        print(f"  pid {pid}: {'n/a' if growth is None else f'{growth:+.2f} MB/h'}{flag}")
+    if leaking:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,9 @@ setup(
         "console_scripts": [
             "surblend=app.main:main",
             "surblend-init=app.services.startup:main",
+            "surblend-partitions=app.services.partitions:main",
+            "surblend-worker=app.services.jobs:main",
+            "surblend-synthetic=app.services.synthetic:main",
         ],
     },
     include_package_data=True,
@@ -1,17 +1,44 @@
 """
 Pytest configuration and fixtures
+
+The schema is created once per worker process; every test then runs inside a
+transaction on one connection that is rolled back afterwards, and application
+commits only release SAVEPOINTs inside it. Under pytest-xdist (``pytest -n
+auto``) each worker gets its own in-memory database and its own app database
+file, so workers never share state.
 """
 
+import os
+import tempfile
+
+# The app's own engine (used by startup) must be per worker and never the real
+# database; set before anything imports app.database
+_WORKER = os.getenv("PYTEST_XDIST_WORKER", "main")
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), f'surblend-test-{_WORKER}.db')}",
+)
+os.environ.setdefault("CORS_ORIGINS", "http://frontend.test")
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.auth.security import get_password_hash
+from app.auth.security import (
+    create_access_token,
+    get_password_hash,
+    login_lockout,
+    login_rate_limiter,
+)
 from app.database import Base, get_db
 from app.main import app
 from app.models import User
+from app.services.activity import activity_recorder
+from app.services.cache import response_cache
+from app.services.job_events import job_events
+from app.services.settings import settings_store
 
 # Create in-memory SQLite database for tests
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -22,13 +49,43 @@ engine = create_engine(
     poolclass=StaticPool,
 )
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# pysqlite's implicit transactions break SAVEPOINT; let SQLAlchemy issue BEGIN
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
 
-@pytest.fixture(scope="function")
-def db():
-    """Create a fresh database for each test"""
+
+@event.listens_for(engine, "begin")
+def _begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+# Bound to the current test's connection by the ``db`` fixture; sessions from
+# it (tests, job workers, the activity recorder) all join that transaction
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, join_transaction_mode="create_savepoint"
+)
+
+# bcrypt is deliberately slow; hash the fixture password once per worker
+TEST_PASSWORD = "testpass123"
+TEST_PASSWORD_HASH = get_password_hash(TEST_PASSWORD)
+
+
+@pytest.fixture(scope="session")
+def schema():
+    """Create all tables once per worker"""
     Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db(schema):
+    """A session whose changes are rolled back when the test ends"""
+    connection = engine.connect()
+    transaction = connection.begin()
+    TestingSessionLocal.configure(bind=connection)
     db = TestingSessionLocal()
 
     # Create test user
@@ -36,7 +93,7 @@ def db():
         username="testuser",
         email="test@example.com",
         full_name="Test User",
-        hashed_password=get_password_hash("testpass123"),
+        hashed_password=TEST_PASSWORD_HASH,
         role="admin",
         is_active=True,
     )
@@ -47,7 +104,8 @@ def db():
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture(scope="function")
@@ -61,8 +119,21 @@ def client(db):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    response_cache.invalidate()
+    settings_store.invalidate()
+    login_lockout.clear()
+    login_rate_limiter.calls_made.clear()
+    activity_recorder.session_factory = TestingSessionLocal
+    job_events.session_factory = TestingSessionLocal
 
     with TestClient(app) as test_client:
         yield test_client
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def auth_headers():
+    """Create authentication headers for tests"""
+    token = create_access_token(data={"sub": "testuser", "role": "admin"})
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,61 @@
+"""
+Test cases for structured access logging
+"""
+
+import json
+import logging
+import queue
+
+from fastapi.testclient import TestClient
+
+from app.services.access_log import JsonFormatter, NonBlockingQueueHandler, request_id_var
+
+
+def _access_records(caplog):
+    return [record.fields for record in caplog.records if record.name == "surblend.access"]
+
+
+def test_access_log_carries_request_id_and_db_time(client: TestClient, auth_headers, caplog):
+    """Test nginx's request id is logged, echoed back and counted DB work is recorded"""
+    caplog.set_level(logging.INFO, logger="surblend.access")
+    response = client.get(
+        "/api/ingredients/", headers={**auth_headers, "X-Request-ID": "3f2a9c0b"}
+    )
+    assert response.headers["x-request-id"] == "3f2a9c0b"
+
+    (entry,) = _access_records(caplog)
+    assert entry["request_id"] == "3f2a9c0b"
+    assert entry["route"] == "/api/ingredients/"
+    assert entry["status"] == 200
+    assert entry["db_statements"] > 0
+    assert 0 <= entry["db_ms"] <= entry["latency_ms"]
+
+    caplog.clear()
+    generated = client.get("/", headers={"X-Request-ID": "not valid!"}).headers["x-request-id"]
+    assert len(generated) == 32
+    assert _access_records(caplog)[0]["db_statements"] == 0
+
+
+def test_queue_handler_formats_in_listener_and_never_blocks():
+    """Test records keep their request id and traceback, and overflow is dropped"""
+    log_queue: queue.Queue = queue.Queue(1)
+    handler = NonBlockingQueueHandler(log_queue)
+    log = logging.getLogger("tests.access_log")
+    log.addHandler(handler)
+    log.propagate = False
+    token = request_id_var.set("abc")
+    try:
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            log.exception("failed %s", "here")
+        log.error("no room")
+    finally:
+        request_id_var.reset(token)
+        log.removeHandler(handler)
+
+    assert handler.dropped == 1
+    entry = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+    assert entry["message"] == "failed here"
+    assert entry["request_id"] == "abc"
+    assert "ZeroDivisionError" in entry["exc_info"]
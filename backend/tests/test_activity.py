@@ -0,0 +1,77 @@
+"""
+Test cases for the write-behind activity log
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models import ActivityLog, User
+from app.services.activity import ActivityRecorder, activity_recorder
+
+
+class FakeSession:
+    def __init__(self, batches):
+        self.batches = batches
+
+    def execute(self, statement, rows):
+        self.batches.append(list(rows))
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_recorder_batches_and_applies_backpressure():
+    """Test events are inserted in batches and a full queue forces a flush"""
+    batches = []
+    recorder = ActivityRecorder(
+        batch_size=2, max_queue=3, session_factory=lambda: FakeSession(batches)
+    )
+
+    async def scenario():
+        for i in range(3):
+            await recorder.record("create_ingredient", entity_id=i)
+        assert batches == []
+
+        # The fourth event finds the queue full and waits for a flush
+        await recorder.record("create_ingredient", entity_id=3)
+        assert [len(batch) for batch in batches] == [2, 1]
+
+        await recorder.stop()
+
+    asyncio.run(scenario())
+    assert [[row["entity_id"] for row in batch] for batch in batches] == [[0, 1], [2], [3]]
+    assert recorder.stats()["written"] == 4
+    assert recorder.stats()["throttled"] == 1
+
+
+def test_mutations_are_recorded(client: TestClient, db: Session, auth_headers):
+    """Test the middleware records the route, entity and user of a mutation"""
+    response = client.post(
+        "/api/ingredients/",
+        json={"name": "Potash", "code": "MOP", "type": "dry", "potash": 60, "cost_per_ton": 500},
+        headers=auth_headers,
+    )
+    ingredient_id = response.json()["id"]
+    client.put(
+        f"/api/ingredients/{ingredient_id}", json={"cost_per_ton": 520}, headers=auth_headers
+    )
+    client.get("/api/ingredients/", headers=auth_headers)
+    client.portal.call(activity_recorder.flush)
+
+    user = db.query(User).filter(User.username == "testuser").one()
+    logs = db.query(ActivityLog).order_by(ActivityLog.id).all()
+    assert [(log.action, log.entity_type, log.entity_id) for log in logs] == [
+        ("create_ingredient", "ingredient", None),
+        ("update_ingredient", "ingredient", ingredient_id),
+    ]
+    assert all(log.user_id == user.id for log in logs)
+    assert logs[1].details == {
+        "method": "PUT",
+        "path": "/api/ingredients/{ingredient_id}",
+        "status": 200,
+    }
@@ -0,0 +1,74 @@
+"""
+Test cases for admission control and load shedding
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.services.admission import (
+    AdmissionController,
+    RouteClass,
+    admission_controller,
+    classify,
+    default_classes,
+)
+from tests.conftest import TEST_PASSWORD
+
+
+def test_routes_are_classified_by_importance():
+    """Test logins and quote writes are critical, analytics and exports bulk"""
+    assert classify("POST", "/api/users/token") == "critical"
+    assert classify("PUT", "/api/quotes/7") == "critical"
+    assert classify("GET", "/api/quotes/") == "interactive"
+    assert classify("GET", "/api/analytics/dashboard") == "bulk"
+    assert classify("GET", "/api/ingredients/export/csv") == "bulk"
+    assert classify("GET", "/health") is None
+    assert classify("GET", "/api/jobs/3/events") is None
+    assert classify("OPTIONS", "/api/quotes/") is None
+
+
+def test_freed_slots_go_to_critical_requests_first():
+    """Test a critical waiter overtakes queued reads and excess bulk work is shed"""
+
+    async def scenario():
+        controller = AdmissionController(2, default_classes(2, reserved=0, bulk=1))
+        assert await controller.acquire("interactive")
+        assert await controller.acquire("interactive")
+
+        read = asyncio.create_task(controller.acquire("interactive"))
+        login = asyncio.create_task(controller.acquire("critical"))
+        exports = [asyncio.create_task(controller.acquire("bulk")) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert exports[2].done() and not exports[2].result()  # queue of 2 is full
+
+        controller.release("interactive")
+        assert controller.running["critical"] == 1
+        assert len(controller.waiting["interactive"]) == 1
+        assert await login
+        controller.release("interactive")
+        assert await read
+        assert await asyncio.gather(*exports[:2]) == [False, False]  # waited 0.5 s
+        return controller.stats()["classes"]
+
+    stats = asyncio.run(scenario())
+    assert stats["critical"]["running"] == 1
+    assert stats["interactive"]["admitted"] == 3
+    assert stats["bulk"]["shed"] == 3
+
+
+def test_overload_is_shed_with_retry_after(client: TestClient, monkeypatch):
+    """Test a saturated class answers 503 at once while logins still get through"""
+    monkeypatch.setitem(admission_controller.classes, "bulk", RouteClass("bulk", 0, 0, 0.5, 10))
+    response = client.get("/api/analytics/dashboard", headers={"Origin": "http://frontend.test"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "10"
+    # Readable by the cross-origin frontend, not an opaque CORS failure
+    assert response.headers["access-control-allow-origin"] == "http://frontend.test"
+    assert "retry-after" in response.headers["access-control-expose-headers"].lower()
+
+    login = client.post(
+        "/api/users/token", data={"username": "testuser", "password": TEST_PASSWORD}
+    )
+    assert login.status_code == 200
+    assert admission_controller.running == {"critical": 0, "interactive": 0, "bulk": 0}
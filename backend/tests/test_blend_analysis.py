@@ -0,0 +1,175 @@
+"""
+Test cases for blend analysis
+"""
+
+from decimal import Decimal
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models import Blend, Ingredient, IngredientType, blend_ingredients
+from app.services.blend_analysis import (
+    analysis_cache,
+    cached_analyses,
+    catalog_version,
+    compute_analyses,
+)
+
+
+def _make_blend(db: Session, name: str, parts):
+    blend = Blend(name=name, code=name.upper())
+    db.add(blend)
+    db.flush()
+    db.execute(
+        blend_ingredients.insert(),
+        [
+            {"blend_id": blend.id, "ingredient_id": ing.id, "percentage": pct, "amount": pct * 20}
+            for ing, pct in parts
+        ],
+    )
+    return blend
+
+
+def test_compute_analyses_for_many_blends(db: Session):
+    """Test guaranteed analysis and cost are percentage-weighted sums"""
+    urea = Ingredient(
+        name="Urea", code="UREA", type=IngredientType.DRY, nitrogen=46, cost_per_ton=580
+    )
+    dap = Ingredient(
+        name="DAP",
+        code="DAP",
+        type=IngredientType.DRY,
+        nitrogen=18,
+        phosphate=46,
+        cost_per_ton=685,
+    )
+    potash = Ingredient(
+        name="Potash",
+        code="MOP",
+        type=IngredientType.DRY,
+        potash=60,
+        chlorine=47,
+        cost_per_ton=520,
+    )
+    db.add_all([urea, dap, potash])
+    db.flush()
+    first = _make_blend(db, "Starter", [(urea, 50), (dap, 50)])
+    second = _make_blend(db, "Balanced", [(dap, 50), (potash, 50)])
+    empty = Blend(name="Empty", code="EMPTY")
+    db.add(empty)
+    db.commit()
+
+    analyses = compute_analyses(db, [first.id, second.id, empty.id])
+
+    assert analyses[first.id].total_n == Decimal("32.00")
+    assert analyses[first.id].total_p == Decimal("23.00")
+    assert analyses[first.id].cost_per_ton == Decimal("632.50")
+    assert analyses[second.id].total_k == Decimal("30.00")
+    assert analyses[second.id].nutrients["chlorine"] == Decimal("23.50")
+    assert len(analyses[second.id].nutrients) == 13
+    assert analyses[empty.id].cost_per_ton is None
+
+
+def test_analyses_are_cached_per_catalog_version(db: Session):
+    """Test cached analyses are reused until the catalog changes"""
+    analysis_cache.clear()
+    urea = Ingredient(
+        name="Urea", code="UREA", type=IngredientType.DRY, nitrogen=46, cost_per_ton=580
+    )
+    db.add(urea)
+    db.flush()
+    blend = _make_blend(db, "Straight", [(urea, 100)])
+    db.commit()
+
+    assert cached_analyses(db, [blend.id])[blend.id].cost_per_ton == Decimal("580.00")
+    assert cached_analyses(db, [blend.id])[blend.id].cost_per_ton == Decimal("580.00")
+    assert analysis_cache.hits == 1
+
+    db.add(Ingredient(name="Potash", code="MOP", type=IngredientType.DRY, cost_per_ton=520))
+    db.commit()
+    cached_analyses(db, [blend.id])
+    assert analysis_cache.hits == 1
+
+
+def test_analysis_cached_mid_create_is_not_reused(db: Session):
+    """Test an analysis cached before a blend's links were committed is recomputed"""
+    analysis_cache.clear()
+    urea = Ingredient(
+        name="Urea", code="UREA", type=IngredientType.DRY, nitrogen=46, cost_per_ton=580
+    )
+    blend = Blend(name="Straight", code="STRAIGHT")
+    db.add_all([urea, blend])
+    db.commit()
+    # A list request between the route's two commits sees no ingredients yet
+    assert cached_analyses(db, [blend.id])[blend.id].cost_per_ton is None
+
+    db.execute(
+        blend_ingredients.insert().values(
+            blend_id=blend.id, ingredient_id=urea.id, percentage=100, amount=2000
+        )
+    )
+    db.commit()
+    assert cached_analyses(db, [blend.id])[blend.id].cost_per_ton == Decimal("580.00")
+
+
+def test_catalog_version_counts_every_write(db: Session):
+    """Test edits within the same second, bulk updates and deletes all move the version"""
+    urea = Ingredient(name="Urea", code="UREA", type=IngredientType.DRY, cost_per_ton=580)
+    db.add(urea)
+    db.commit()
+    versions = [catalog_version(db)]
+
+    urea.cost_per_ton = 600
+    db.commit()
+    versions.append(catalog_version(db))
+    db.execute(update(Ingredient).values(cost_per_ton=Ingredient.cost_per_ton + 1))
+    db.commit()
+    versions.append(catalog_version(db))
+    db.delete(urea)
+    db.commit()
+    versions.append(catalog_version(db))
+    db.add(Blend(name="Unrelated", code="UNREL"))
+    db.commit()
+
+    assert versions == sorted(set(versions))
+    assert catalog_version(db) == versions[-1]
+
+
+def test_blend_list_is_keyset_paginated(client, db: Session):
+    """Test the blend list pages by cursor with a bounded number of queries"""
+    from sqlalchemy import event
+
+    urea = Ingredient(
+        name="Urea", code="UREA", type=IngredientType.DRY, nitrogen=46, cost_per_ton=580
+    )
+    db.add(urea)
+    db.flush()
+    for i in range(5):
+        _make_blend(db, f"Blend {i}", [(urea, 100)])
+    template = Blend(name="Template", code="TPL", is_template=True)
+    db.add(template)
+    db.commit()
+
+    statements = []
+    engine = db.get_bind()
+    # SAVEPOINTs come from the transactional test fixture, not the endpoint
+    listener = lambda *args: args[2].startswith("SAVEPOINT") or statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        first = client.get("/api/blends/", params={"size": 3, "is_template": False}).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert [b["name"] for b in first["items"]] == ["Blend 0", "Blend 1", "Blend 2"]
+    assert first["items"][0]["ingredients"] == [
+        {"ingredient_id": urea.id, "percentage": 100.0, "amount": 2000.0}
+    ]
+    assert first["items"][0]["total_n"] == "46.00"
+    # ETag versions, blends page, composition batch, analysis versions, catalog rows
+    assert len(statements) <= 5
+
+    second = client.get(
+        "/api/blends/", params={"size": 3, "is_template": False, "after": first["next_cursor"]}
+    ).json()
+    assert [b["name"] for b in second["items"]] == ["Blend 3", "Blend 4"]
+    assert second["next_cursor"] is None
@@ -0,0 +1,73 @@
+"""
+Test cases for conditional GETs on catalog lists
+"""
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models import Ingredient, IngredientType
+
+
+def test_chemicals_revalidate_with_etag(client: TestClient):
+    """Test a repeat request with the ETag gets 304 until the table changes"""
+    client.post(
+        "/api/chemicals/",
+        json={"name": "Atrazine", "aiPercentage": 42.0, "costPerUnit": 8.5, "displayOrder": 1},
+    )
+
+    first = client.get("/api/chemicals/")
+    assert first.status_code == 200
+    assert first.json()[0]["ai_percentage"] == "42.00"
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert "last-modified" not in first.headers  # timestamps cannot validate reliably
+
+    again = client.get("/api/chemicals/", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    since = client.get(
+        "/api/chemicals/", headers={"If-Modified-Since": "Sun, 01 Jan 2090 00:00:00 GMT"}
+    )
+    assert since.status_code == 200
+
+    client.post(
+        "/api/chemicals/",
+        json={"name": "Glyphosate", "ai_percentage": 41.0, "cost_per_unit": 6.0},
+    )
+    changed = client.get("/api/chemicals/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == 2
+
+
+def test_ingredient_etag_varies_by_query(client: TestClient, auth_headers):
+    """Test each page validates independently and 304s still require auth"""
+    page_one = client.get("/api/ingredients/?page=1", headers=auth_headers)
+    page_two = client.get("/api/ingredients/?page=2", headers=auth_headers)
+    assert page_one.headers["etag"] != page_two.headers["etag"]
+
+    conditional = {**auth_headers, "If-None-Match": page_one.headers["etag"]}
+    assert client.get("/api/ingredients/?page=1", headers=conditional).status_code == 304
+
+    anonymous = client.get(
+        "/api/ingredients/?page=1", headers={"If-None-Match": page_one.headers["etag"]}
+    )
+    assert anonymous.status_code == 401
+
+
+def test_cached_page_follows_writes_from_other_processes(
+    client: TestClient, db: Session, auth_headers
+):
+    """Test a write the local cache never heard of changes both ETag and body"""
+    first = client.get("/api/ingredients/", headers=auth_headers)
+    # As if the job worker imported it: this process's cache is not invalidated
+    db.add(Ingredient(name="Urea", code="UREA", type=IngredientType.DRY, cost_per_ton=580))
+    db.commit()
+
+    second = client.get(
+        "/api/ingredients/", headers={**auth_headers, "If-None-Match": first.headers["etag"]}
+    )
+    assert second.status_code == 200
+    assert second.json()["total"] == first.json()["total"] + 1
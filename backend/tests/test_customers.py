@@ -0,0 +1,74 @@
+"""
+Test cases for customer endpoints
+"""
+
+import json
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import Customer, Farm, Field
+
+
+def _make_grower(db: Session, name: str, farms: int, fields_per_farm: int) -> Customer:
+    customer = Customer(name=name)
+    customer.farms = [
+        Farm(
+            name=f"{name} Farm {f}",
+            fields=[
+                Field(name=f"Field {f}-{i}", acres=40.0, crop_type="corn", soil_ph=6.2)
+                for i in range(fields_per_farm)
+            ],
+        )
+        for f in range(farms)
+    ]
+    db.add(customer)
+    db.commit()
+    return customer
+
+
+def test_get_customer_hierarchy(client, db: Session, auth_headers):
+    """Test a large grower loads in a fixed number of queries"""
+    customer_id = _make_grower(db, "Big Grower", farms=40, fields_per_farm=15).id
+    db.expunge_all()
+
+    statements = []
+    engine = db.get_bind()
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.get(f"/api/customers/{customer_id}", headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["farms"]) == 40
+    assert sum(len(farm["fields"]) for farm in data["farms"]) == 600
+    assert "notes" not in data["farms"][0]["fields"][0]
+    # user lookup + customers + farms + fields
+    assert len(statements) <= 4
+
+
+def test_get_customer_not_found(client, auth_headers):
+    """Test unknown customers return 404"""
+    response = client.get("/api/customers/9999", headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_bulk_hierarchy_streams_ndjson(client, db: Session, auth_headers):
+    """Test the bulk variant streams one customer per line"""
+    first = _make_grower(db, "North", farms=2, fields_per_farm=3)
+    second = _make_grower(db, "South", farms=1, fields_per_farm=2)
+
+    response = client.get(
+        "/api/customers/hierarchy",
+        params={"ids": [first.id, second.id]},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [c["name"] for c in lines] == ["North", "South"]
+    assert [len(f["fields"]) for f in lines[0]["farms"]] == [3, 3]
@@ -0,0 +1,52 @@
+"""
+Test cases for throttling background work by temperature, load and memory
+"""
+
+import json
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.services import monitor
+from app.services.governor import Governor, slots
+from app.services.jobs import JobWorker, enqueue
+from tests.conftest import TestingSessionLocal
+
+
+def test_governor_rises_at_once_and_cools_down_slowly():
+    """Test the level jumps with the hottest reading and steps down after the cooldown"""
+    governor = Governor(cpus=4, cooldown=30)
+    assert governor.update(55.0, 1.0, 40.0, now=0) == 0
+    assert governor.update(76.0, 6.5, 40.0, now=1) == 2
+    assert governor.reasons == ["temperature 76.0°C", "load 1.62 per CPU"]
+    assert governor.update(60.0, 9.0, 95.0, now=2) == 3
+
+    assert governor.update(60.0, 1.0, 40.0, now=3) == 3
+    assert governor.update(60.0, 1.0, 40.0, now=32) == 3
+    assert governor.update(60.0, 1.0, 40.0, now=33) == 0
+
+    assert [slots(level, 4) for level in range(4)] == [4, 2, 1, 0]
+    assert [slots(level, 1) for level in range(4)] == [1, 1, 1, 0]
+
+
+def test_worker_obeys_published_throttle(
+    tmp_path, monkeypatch, db: Session, client: TestClient, auth_headers
+):
+    """Test the worker adopts the monitor's level and the level is reported"""
+    state_file = tmp_path / "state.json"
+    monkeypatch.setattr(monitor, "MONITOR_STATE_FILE", str(state_file))
+    hot = Governor()
+    hot.update(80.0, 0.0, 0.0)
+    state_file.write_text(json.dumps({"updated_at": time.time(), "governor": hot.state()}))
+
+    worker = JobWorker(worker_id="test", session_factory=TestingSessionLocal, concurrency=2)
+    assert worker.refresh_throttle() == 3
+    assert slots(worker.throttle, worker.concurrency) == 0
+    assert worker.pause() == 1.0
+
+    enqueue(db, "tests.noop")
+    body = client.get("/api/system/governor", headers=auth_headers).json()
+    assert body["governor"]["name"] == "critical"
+    assert body["governor"]["reasons"] == ["temperature 80.0°C"]
+    assert body["jobs"] == {"queued": 1}
@@ -6,16 +6,11 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from app.auth.security import create_access_token
 from app.main import app
-from app.models import Ingredient, IngredientType
-
-
-@pytest.fixture
-def auth_headers():
-    """Create authentication headers for tests"""
-    token = create_access_token(data={"sub": "testuser", "role": "admin"})
-    return {"Authorization": f"Bearer {token}"}
+from app.models import Ingredient, IngredientType, JobStatus
+from app.services import imports  # noqa: F401  registers ingredients.import
+from app.services.jobs import JobWorker
+from tests.conftest import TestingSessionLocal
 
 
 def test_create_ingredient(client: TestClient, db: Session, auth_headers):
@@ -35,7 +30,8 @@ def test_create_ingredient(client: TestClient, db: Session, auth_headers):
     assert response.status_code == 200
     data = response.json()
     assert data["name"] == ingredient_data["name"]
-    assert data["nitrogen"] == ingredient_data["nitrogen"]
+    # Decimal fields are serialized as strings to keep their precision
+    assert float(data["nitrogen"]) == ingredient_data["nitrogen"]
     assert "id" in data
 
 
@@ -60,6 +56,28 @@ def test_get_ingredients(client: TestClient, db: Session, auth_headers):
     assert "total" in data
     assert len(data["items"]) >= 5
 
+    for params in ({"size": 0}, {"page": 0}, {"size": 201}):
+        response = client.get("/api/ingredients/", params=params, headers=auth_headers)
+        assert response.status_code == 422
+
+
+def test_search_ingredients(client: TestClient, db: Session, auth_headers):
+    """Test search is a case-insensitive name or code prefix, with literal wildcards"""
+    for name, code in [("Urea", "UREA"), ("Urea 50%", "UREA_50"), ("Potash", "MOP")]:
+        db.add(Ingredient(name=name, code=code, type=IngredientType.DRY, cost_per_ton=500))
+    db.commit()
+
+    def names(**params):
+        data = client.get("/api/ingredients/", params=params, headers=auth_headers).json()
+        assert data["total"] == len(data["items"])
+        return [item["name"] for item in data["items"]]
+
+    assert names(search="urea") == ["Urea", "Urea 50%"]
+    assert names(search="mo") == ["Potash"]
+    assert names(search="urea 50%") == ["Urea 50%"]
+    assert names(search="urea_") == ["Urea 50%"]
+    assert names(search="%") == []
+
 
 def test_update_ingredient(client: TestClient, db: Session, auth_headers):
     """Test updating an ingredient"""
@@ -113,7 +131,11 @@ Imported DAP,IMP-DAP,dry,18,46,0,685"""
 
     response = client.post("/api/ingredients/import", files=files, headers=auth_headers)
 
-    assert response.status_code == 200
-    data = response.json()
+    # The import is queued; a worker run applies it
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert JobWorker(session_factory=TestingSessionLocal).run_once() == JobStatus.SUCCEEDED
+
+    data = client.get(f"/api/jobs/{job_id}", headers=auth_headers).json()["result"]
     assert data["imported"] == 2
     assert len(data["errors"]) == 0
@@ -0,0 +1,201 @@
+"""
+Test cases for the durable job queue
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models import Ingredient, Job, JobStatus
+from app.services import imports  # noqa: F401  registers ingredients.import
+from app.services.job_events import JobEventStream
+from app.services.jobs import JOB_HANDLERS, JobWorker, enqueue, job_handler
+from tests.conftest import TestingSessionLocal
+
+CALLS = []
+
+
+@job_handler("tests.flaky")
+def flaky(context):
+    CALLS.append(context.payload["n"])
+    if len(CALLS) < context.payload["succeed_on"]:
+        raise RuntimeError("try again")
+    context.report(1, 2, "halfway", force=True)
+    return {"n": context.payload["n"]}
+
+
+def _worker():
+    return JobWorker(worker_id="test", session_factory=TestingSessionLocal)
+
+
+def _make_due(db: Session, job: Job):
+    job.run_after = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+
+def test_jobs_run_in_priority_order_and_succeed(db: Session):
+    """Test the worker claims the highest priority due job and stores its result"""
+    CALLS.clear()
+    low = enqueue(db, "tests.flaky", {"n": 1, "succeed_on": 1})
+    high = enqueue(db, "tests.flaky", {"n": 2, "succeed_on": 1}, priority=5)
+
+    worker = _worker()
+    assert worker.run_once() == JobStatus.SUCCEEDED
+    assert worker.run_once() == JobStatus.SUCCEEDED
+    assert worker.run_once() is None
+    assert CALLS == [2, 1]
+
+    db.expire_all()
+    assert high.status == JobStatus.SUCCEEDED
+    assert high.result == {"n": 2}
+    assert high.progress == 1.0
+    assert high.progress_message == "halfway"
+    assert low.attempts == 1
+
+
+def test_failed_job_backs_off_then_gives_up(db: Session):
+    """Test failures are retried after a delay until max_attempts"""
+    CALLS.clear()
+    job = enqueue(db, "tests.flaky", {"n": 1, "succeed_on": 99}, max_attempts=2)
+    worker = _worker()
+
+    assert worker.run_once() == JobStatus.QUEUED
+    db.expire_all()
+    assert job.run_after > datetime.utcnow() + timedelta(seconds=5)
+    assert "try again" in job.error
+    # Not due yet
+    assert worker.run_once() is None
+
+    _make_due(db, job)
+    assert worker.run_once() == JobStatus.FAILED
+    db.expire_all()
+    assert job.attempts == 2
+    assert job.finished_at is not None
+
+
+def test_unknown_kind_and_stale_jobs(db: Session):
+    """Test a job without a handler fails and a dead worker's job is requeued"""
+    assert "tests.missing" not in JOB_HANDLERS
+    missing = enqueue(db, "tests.missing", max_attempts=1)
+    worker = _worker()
+    assert worker.run_once() == JobStatus.FAILED
+    db.expire_all()
+    assert "No handler registered" in missing.error
+
+    stale = enqueue(db, "tests.flaky", {"n": 1, "succeed_on": 1})
+    stale.status = JobStatus.RUNNING
+    stale.attempts = 1
+    stale.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+    db.commit()
+    assert worker.requeue_stale() == 1
+    db.expire_all()
+    assert stale.status == JobStatus.QUEUED
+
+
+def test_requeued_job_belongs_to_its_new_worker(db: Session):
+    """Test a worker keeps its job alive and cannot finish one it lost"""
+    job = enqueue(db, "tests.flaky", {"n": 1, "succeed_on": 1})
+    first = _worker()
+    assert first.claim() == job.id
+    job.heartbeat_at = datetime.utcnow() - timedelta(seconds=30)
+    db.commit()
+    assert first.heartbeat(job.id)
+    db.expire_all()
+    assert job.heartbeat_at > datetime.utcnow() - timedelta(seconds=5)
+
+    # As if it had gone quiet and been requeued, then claimed by another worker
+    job.status, job.locked_by = JobStatus.QUEUED, None
+    db.commit()
+    second = JobWorker(worker_id="other", session_factory=TestingSessionLocal)
+    assert second.claim() == job.id
+    assert not first.heartbeat(job.id)
+
+    assert first._finish(db, job.id, JobStatus.SUCCEEDED, result={"n": 1}) == JobStatus.RUNNING
+    assert first._fail(db, job.id, "boom") == JobStatus.RUNNING
+    db.expire_all()
+    assert (job.status, job.locked_by, job.result, job.attempts) == (
+        JobStatus.RUNNING, "other", None, 2
+    )
+    assert second.execute(job.id) == JobStatus.SUCCEEDED
+
+
+def test_csv_import_runs_as_job(client: TestClient, db: Session, auth_headers):
+    """Test the import endpoint queues a job whose progress and result are visible"""
+    csv_text = (
+        "name,code,type,nitrogen,phosphate,potash,cost_per_ton\n"
+        "Urea,UREA,dry,46,0,0,600\n"
+        "Bad,BAD,dry,0,0,0,not-a-number\n"
+    )
+    response = client.post(
+        "/api/ingredients/import",
+        files={"file": ("ingredients.csv", csv_text, "text/csv")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert client.get(f"/api/jobs/{job_id}", headers=auth_headers).json()["status"] == "queued"
+
+    assert _worker().run_once() == JobStatus.SUCCEEDED
+
+    body = client.get(f"/api/jobs/{job_id}", headers=auth_headers).json()
+    assert body["status"] == "succeeded"
+    assert body["progress"] == 1.0
+    assert body["result"]["imported"] == 1
+    assert body["result"]["errors"][0].startswith("Row 3:")
+    assert db.query(Ingredient).filter(Ingredient.code == "UREA").count() == 1
+
+    assert [job["id"] for job in client.get("/api/jobs/", headers=auth_headers).json()] == [job_id]
+    cancel = client.post(f"/api/jobs/{job_id}/cancel", headers=auth_headers)
+    assert cancel.status_code == 409
+
+
+def _parse(frame: bytes):
+    lines = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_event_stream_follows_a_job(db: Session):
+    """Test progress and partial events are sent on change, then one complete event"""
+    job = enqueue(db, "tests.flaky", {"n": 1, "succeed_on": 1})
+    stream = JobEventStream(session_factory=TestingSessionLocal, interval=0, keepalive=3600)
+
+    async def connected():
+        return False
+
+    async def scenario():
+        events = stream.events(job.id, connected)
+        assert (await events.__anext__()).startswith(b"retry:")
+        assert _parse(await events.__anext__()) == (
+            "progress",
+            {"id": job.id, "status": "queued", "attempts": 0, "progress": 0.0, "message": None},
+        )
+
+        job.status, job.progress, job.result = JobStatus.RUNNING, 0.5, {"imported": 3}
+        db.commit()
+        assert _parse(await events.__anext__())[1]["progress"] == 0.5
+        assert _parse(await events.__anext__()) == (
+            "partial", {"id": job.id, "result": {"imported": 3}}
+        )
+
+        job.status, job.result = JobStatus.SUCCEEDED, {"imported": 5}
+        db.commit()
+        event, data = _parse(await events.__anext__())
+        assert (event, data["status"], data["result"]) == ("complete", "succeeded", {"imported": 5})
+        assert [frame async for frame in events] == []
+
+    asyncio.run(scenario())
+
+
+def test_events_endpoint_streams_until_complete(client: TestClient, db: Session, auth_headers):
+    """Test the SSE endpoint serves text/event-stream and ends with the job"""
+    job = enqueue(db, "tests.flaky", {"n": 1, "succeed_on": 1})
+    _worker().run_once()
+
+    with client.stream("GET", f"/api/jobs/{job.id}/events", headers=auth_headers) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = b"".join(response.iter_bytes())
+    assert _parse(body.split(b"\n\n")[1])[0] == "complete"
+    assert client.get("/api/jobs/999/events", headers=auth_headers).status_code == 404
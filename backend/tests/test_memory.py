@@ -0,0 +1,47 @@
+"""
+Test cases for leak hunting: tracemalloc snapshots and bounded rate limiter state
+"""
+
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.auth.security import RateLimiter
+
+
+def test_rate_limiter_forgets_idle_clients():
+    """Test the limiter enforces its window and drops clients idle for a period"""
+    limiter = RateLimiter(calls=2, period=60)
+    with patch("app.auth.security.time.monotonic", return_value=1000.0):
+        assert limiter.hit("10.0.0.1") and limiter.hit("10.0.0.1")
+        assert not limiter.hit("10.0.0.1")
+        for i in range(100):
+            limiter.hit(f"10.0.1.{i}")
+    assert len(limiter.calls_made) == 101
+
+    with patch("app.auth.security.time.monotonic", return_value=1061.0):
+        assert limiter.hit("10.0.0.1")
+    assert list(limiter.calls_made) == ["10.0.0.1"]
+
+
+def test_memory_snapshots_diff_against_the_previous(client: TestClient, auth_headers):
+    """Test the first snapshot starts tracing and the next reports growth"""
+    try:
+        first = client.post("/api/system/memory/snapshot", headers=auth_headers).json()
+        assert first["compared_to"] is None
+        assert first["top"] and "size_kb" in first["top"][0]
+
+        retained = [bytearray(1024) for _ in range(1000)]  # noqa: F841
+        second = client.post(
+            "/api/system/memory/snapshot", params={"limit": 5}, headers=auth_headers
+        ).json()
+        assert second["compared_to"] == first["taken_at"]
+        assert len(second["top"]) == 5
+        assert max(stat["size_diff_kb"] for stat in second["top"]) >= 1000
+        assert "test_memory.py" in " ".join(
+            " ".join(stat["where"]) for stat in second["top"]
+        )
+        assert client.get("/api/system/memory", headers=auth_headers).json()["tracing"]
+    finally:
+        stopped = client.delete("/api/system/memory/snapshot", headers=auth_headers).json()
+    assert stopped == {"stopped": True}
@@ -0,0 +1,125 @@
+"""
+Test cases for the resident system monitor
+"""
+
+import os
+
+from fastapi.testclient import TestClient
+
+from app.services import monitor
+from app.services.monitor import AlertManager, Sample, SystemMonitor, SystemReader
+
+
+def _fake_system(root, busy=0, idle=0, temperature=45000):
+    proc = root / "proc"
+    proc.mkdir(exist_ok=True)
+    (proc / "stat").write_text(f"cpu  {busy} 0 0 {idle} 0 0 0 0 0 0\ncpu0 1 2 3 4\n")
+    (proc / "loadavg").write_text("1.25 0.80 0.50 2/180 4242\n")
+    (proc / "meminfo").write_text(
+        "MemTotal:        8000000 kB\nMemFree:          500000 kB\nMemAvailable:    2000000 kB\n"
+    )
+    for pid, cmdline in ((101, "/usr/sbin/nginx\0-g\0daemon off;"), (202, "uvicorn\0app.main:app")):
+        (proc / str(pid)).mkdir(exist_ok=True)
+        (proc / str(pid) / "cmdline").write_text(cmdline)
+    (root / "temp").write_text(f"{temperature}\n")
+    return SystemReader(proc=str(proc), thermal_zone=str(root / "temp"), disk=str(root))
+
+
+class RecordingNotifier:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, subject, body):
+        self.sent.append(body)
+
+
+def test_reader_parses_proc_and_sysfs(tmp_path):
+    """Test CPU usage is a delta between reads and services come from /proc cmdlines"""
+    reader = _fake_system(tmp_path, busy=100, idle=900)
+    assert reader.cpu_percent() is None
+    _fake_system(tmp_path, busy=175, idle=925)
+    assert reader.cpu_percent() == 75.0
+
+    sample = reader.sample()
+    assert sample.load_1m == 1.25
+    assert sample.memory_percent == 75.0
+    assert sample.memory_available_mb == 1953.1
+    assert sample.temperature == 45.0
+    assert reader.services() == {
+        "postgresql": False, "nginx": True, "surblend": True, "surblend-worker": False
+    }
+    assert 0 <= reader.disk()["percent"] <= 100
+
+
+def test_alerts_need_sustained_breach_and_are_deduplicated(tmp_path):
+    """Test a hot spell alerts once, repeats only after the interval, and resolves"""
+    notifier = RecordingNotifier()
+    alerts = AlertManager(notifier, repeat_after=600, max_per_hour=2)
+    system = SystemMonitor(alerts=alerts, state_file=str(tmp_path / "state.json"))
+
+    def run(seconds, temperature, start):
+        for ts in range(start, start + seconds):
+            system.samples.append(Sample(ts, 10.0, 0.5, 40.0, 4000.0, temperature))
+            alerts.update(system.problems(ts), ts)
+
+    run(29, 75.0, 0)
+    assert notifier.sent == []  # not yet sustained for 30 s
+    run(600, 75.0, 29)
+    assert len(notifier.sent) == 1 and "High CPU temperature: 75.0" in notifier.sent[0]
+    run(1, 75.0, 629)
+    assert len(notifier.sent) == 2 and "ongoing since" in notifier.sent[1]
+    run(1, 60.0, 630)
+    assert len(notifier.sent) == 2 and alerts.suppressed == 1  # hourly budget spent
+    assert alerts.active == {}
+    run(2998, 60.0, 631)
+    assert len(notifier.sent) == 2  # the resolution waits for the budget
+    run(1, 60.0, 3629)
+    assert len(notifier.sent) == 3 and "Resolved: High CPU temperature" in notifier.sent[2]
+    run(10, 60.0, 3630)
+    assert len(notifier.sent) == 3 and alerts.resolved == {}
+
+
+def test_failed_alerts_are_retried():
+    """Test an alert and its resolution still go out once the notifier recovers"""
+
+    class FlakyNotifier(RecordingNotifier):
+        down = True
+
+        def send(self, subject, body):
+            if self.down:
+                raise OSError("SMTP unreachable")
+            super().send(subject, body)
+
+    notifier = FlakyNotifier()
+    alerts = AlertManager(notifier, retry_after=60)
+    disk = {"disk": "Low disk space: 95% used"}
+    assert alerts.update(disk, now=0) is None
+    assert alerts.update({}, now=30) is None
+    notifier.down = False
+    assert alerts.update({}, now=45) is None  # still backing off
+    sent = alerts.update({}, now=60)
+    assert "Resolved: Low disk space: 95% used" in sent
+    assert alerts.update({}, now=61) is None
+
+
+def test_health_reports_monitor_state(tmp_path, client: TestClient, monkeypatch):
+    """Test /health serves what the monitor published and falls back without it"""
+    state_file = tmp_path / "state.json"
+    monkeypatch.setattr(monitor, "MONITOR_STATE_FILE", str(state_file))
+    assert client.get("/health").json()["monitor"] is None
+
+    system = SystemMonitor(
+        reader=_fake_system(tmp_path, temperature=71500),
+        alerts=AlertManager(RecordingNotifier()),
+        state_file=str(state_file),
+    )
+    system.tick()
+    assert not os.path.exists(f"{state_file}.tmp")
+
+    body = client.get("/health").json()
+    # postgres is missing, but one failed check is not an outage yet
+    assert body["status"] == "healthy"
+    assert body["monitor"]["services"]["postgresql"] is False
+    assert body["system"]["temperature"] == 71.5
+    assert body["monitor"]["summary"]["1m"]["temperature"]["max"] == 71.5
+    assert body["monitor"]["services"]["nginx"] is True
@@ -0,0 +1,112 @@
+"""
+Test cases for partition helpers
+"""
+
+import os
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import ActivityLog, Ingredient, IngredientType, PriceHistory
+from app.services.activity import activity_between
+from app.services import partitions
+from app.services.partitions import (
+    PartitionedTable,
+    add_months,
+    apply_retention,
+    ensure_partitions,
+    list_partitions,
+    partition_name,
+)
+from app.services.price_history import price_changes_between
+
+
+def test_month_arithmetic():
+    """Test partition months roll over year boundaries"""
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -13) == date(2023, 12, 1)
+    assert partition_name("price_history", date(2026, 2, 1)) == "price_history_2026_02"
+
+
+def test_ensure_partitions_is_noop_without_partitioned_tables():
+    """Test startup maintenance leaves plain (SQLite) tables alone"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    assert ensure_partitions(engine) == {}
+
+
+def test_window_queries_are_half_open(db: Session):
+    """Test activity and price change reads honour [start, end)"""
+    urea = Ingredient(name="Urea", code="UREA", type=IngredientType.DRY, cost_per_ton=600)
+    db.add(urea)
+    db.flush()
+    for month in (1, 2, 3):
+        db.add(ActivityLog(action="update_ingredient", created_at=datetime(2025, month, 1)))
+        db.add(
+            PriceHistory(
+                ingredient_id=urea.id,
+                old_price=500 + month,
+                new_price=501 + month,
+                changed_at=datetime(2025, month, 1),
+            )
+        )
+    db.commit()
+
+    logs = activity_between(db, datetime(2025, 2, 1), datetime(2025, 3, 1))
+    assert [log.created_at.month for log in logs] == [2]
+
+    changes = price_changes_between(db, datetime(2025, 1, 1), datetime(2025, 3, 1), [urea.id])
+    assert [change.changed_at.month for change in changes] == [1, 2]
+
+
+@pytest.mark.skipif(
+    not os.getenv("DATABASE_URL", "").startswith("postgresql"), reason="needs Postgres"
+)
+def test_default_rows_are_split_out_and_archived(monkeypatch, tmp_path):
+    """Test DEFAULT rows move into new partitions or the archive instead of blocking"""
+    engine = create_engine(os.environ["DATABASE_URL"])
+    monkeypatch.setattr(
+        partitions, "PARTITIONED_TABLES", {"partition_probe": PartitionedTable("logged_at", 12)}
+    )
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS partition_probe"))
+        conn.execute(
+            text(
+                "CREATE TABLE partition_probe (id int, logged_at timestamptz NOT NULL) "
+                "PARTITION BY RANGE (logged_at)"
+            )
+        )
+        conn.execute(
+            text("CREATE TABLE partition_probe_default PARTITION OF partition_probe DEFAULT")
+        )
+        conn.execute(
+            text(
+                "INSERT INTO partition_probe VALUES "
+                "(1, '2024-03-10+00'), (2, '2026-05-10+00'), (3, '2026-10-02+00')"
+            )
+        )
+    try:
+        created = ensure_partitions(engine, months_ahead=1, today=date(2026, 10, 19))
+        assert created["partition_probe"] == [
+            "partition_probe_2026_05",
+            "partition_probe_2026_10",
+            "partition_probe_2026_11",
+        ]
+        archived = apply_retention(engine, str(tmp_path), today=date(2026, 10, 19))
+        assert [os.path.basename(path) for path in archived] == [
+            "partition_probe_default_before_2025_10.csv.gz"
+        ]
+        with engine.connect() as conn:
+            assert list_partitions(conn, "partition_probe") == [
+                date(2026, 5, 1),
+                date(2026, 10, 1),
+                date(2026, 11, 1),
+            ]
+            assert conn.execute(text("SELECT count(*) FROM partition_probe_default")).scalar() == 0
+            assert conn.execute(text("SELECT count(*) FROM partition_probe")).scalar() == 2
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE partition_probe"))
@@ -0,0 +1,84 @@
+"""
+Test cases for as-of price lookups
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Blend, Ingredient, IngredientType, PriceHistory, blend_ingredients
+from app.services.price_history import (
+    blend_cost_history,
+    blend_costs_as_of,
+    ingredient_prices_as_of,
+)
+
+
+@pytest.fixture
+def priced_blend(db: Session):
+    """A 50/50 blend of two ingredients with a price history"""
+    urea = Ingredient(name="Urea", code="UREA", type=IngredientType.DRY, cost_per_ton=600)
+    potash = Ingredient(name="Potash", code="MOP", type=IngredientType.DRY, cost_per_ton=500)
+    blend = Blend(name="Half and Half", code="HH")
+    db.add_all([urea, potash, blend])
+    db.flush()
+
+    db.execute(
+        blend_ingredients.insert(),
+        [
+            {"blend_id": blend.id, "ingredient_id": urea.id, "percentage": 50, "amount": 1000},
+            {"blend_id": blend.id, "ingredient_id": potash.id, "percentage": 50, "amount": 1000},
+        ],
+    )
+    db.add_all(
+        [
+            PriceHistory(
+                ingredient_id=urea.id,
+                old_price=400,
+                new_price=500,
+                changed_at=datetime(2025, 2, 1),
+            ),
+            PriceHistory(
+                ingredient_id=urea.id,
+                old_price=500,
+                new_price=600,
+                changed_at=datetime(2025, 4, 1),
+            ),
+        ]
+    )
+    db.commit()
+    return blend, urea, potash
+
+
+def test_ingredient_prices_as_of(db: Session, priced_blend):
+    """Test point-in-time prices fall in the right interval"""
+    _, urea, potash = priced_blend
+
+    assert ingredient_prices_as_of(db, [urea.id, potash.id], datetime(2025, 1, 15)) == {
+        urea.id: 400.0,
+        potash.id: 500.0,
+    }
+    assert ingredient_prices_as_of(db, [urea.id], datetime(2025, 2, 1))[urea.id] == 500.0
+    assert ingredient_prices_as_of(db, [urea.id], datetime(2025, 3, 1))[urea.id] == 500.0
+    assert ingredient_prices_as_of(db, [urea.id], datetime(2025, 6, 1))[urea.id] == 600.0
+
+
+def test_blend_costs_as_of(db: Session, priced_blend):
+    """Test blend cost is the percentage-weighted ingredient price"""
+    blend, _, _ = priced_blend
+
+    assert blend_costs_as_of(db, [blend.id], datetime(2025, 3, 1)) == {blend.id: 500.0}
+    assert blend_costs_as_of(db, [blend.id], datetime(2025, 5, 1)) == {blend.id: 550.0}
+
+
+def test_blend_cost_history(db: Session, priced_blend):
+    """Test the range query emits one point per effective change"""
+    blend, _, _ = priced_blend
+
+    history = blend_cost_history(db, [blend.id], datetime(2025, 1, 1), datetime(2025, 12, 31))
+    assert [cost for _, cost in history[blend.id]] == [450.0, 500.0, 550.0]
+    assert history[blend.id][1][0].month == 2
+
+    with pytest.raises(ValueError):
+        blend_cost_history(db, [blend.id], datetime(2025, 2, 1), datetime(2025, 1, 1))
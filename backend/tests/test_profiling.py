@@ -0,0 +1,90 @@
+"""
+Test cases for the per-request sampling profiler
+"""
+
+import asyncio
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.services.profiling import (
+    ProfilerMiddleware,
+    ProfileStore,
+    SamplingProfiler,
+    profile_store,
+)
+
+
+def test_sampler_attributes_wall_time():
+    """Test busy Python time is sampled and the breakdown adds up to wall time"""
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.001)
+    profiler.start()
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        sum(i * i for i in range(1000))
+    profiler.stop()
+
+    assert profiler.ticks["python"] > 0
+    assert abs(sum(profiler.breakdown_ms().values()) - profiler.elapsed * 1000) < 1
+    assert "test_sampler_attributes_wall_time" in profiler.folded()
+    assert profiler.top_frames(1)[0]["self"] > 0
+
+
+def test_admin_request_is_profiled(client: TestClient, auth_headers, tmp_path, monkeypatch):
+    """Test ?profile=1 from an admin stores a report that the system API serves"""
+    monkeypatch.setattr(profile_store, "directory", str(tmp_path))
+
+    assert "x-profile-report" not in client.get("/?profile=1").headers
+    assert "x-profile-report" not in client.get("/", headers=auth_headers).headers
+
+    response = client.get("/api/ingredients/", headers={**auth_headers, "X-Profile": "1"})
+    assert response.status_code == 200
+    name = response.headers["x-profile-report"]
+
+    assert client.get("/api/system/profiles", headers=auth_headers).json() == [name]
+    report = client.get(f"/api/system/profiles/{name}", headers=auth_headers).json()
+    assert report["path"] == "/api/ingredients/"
+    assert report["status"] == 200
+    assert set(report["breakdown_ms"]) == {"db", "serialization", "python", "waiting"}
+
+    folded = client.get(
+        f"/api/system/profiles/{name}", params={"format": "folded"}, headers=auth_headers
+    )
+    assert folded.status_code == 200
+    assert client.get("/api/system/profiles/..%2Fsecret", headers=auth_headers).status_code == 404
+
+
+def test_concurrent_profile_requests_do_not_overlap(tmp_path, monkeypatch):
+    """Test a second request arriving during the admin check runs unprofiled"""
+
+    def slow_admin_check(scope):
+        time.sleep(0.05)
+        return True
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = ProfilerMiddleware(app, store=ProfileStore(str(tmp_path)))
+    monkeypatch.setattr(middleware, "_is_admin", slow_admin_check)
+    scope = {
+        "type": "http", "method": "GET", "path": "/", "query_string": b"profile=1", "headers": []
+    }
+
+    async def request():
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await middleware(scope, None, send)
+        return dict(sent[0]["headers"])
+
+    async def scenario():
+        return await asyncio.gather(request(), request())
+
+    first, second = asyncio.run(scenario())
+    assert b"x-profile-report" in first
+    assert b"x-profile-report" not in second
+    assert len(ProfileStore(str(tmp_path)).names()) == 1
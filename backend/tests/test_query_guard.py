@@ -0,0 +1,83 @@
+"""
+Test cases for statement budgets and cancelling abandoned queries
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from app import database
+from app.database import (
+    apply_statement_budget,
+    request_connections,
+    statement_budget,
+    untrack_connection,
+)
+from app.services.query_guard import QueryGuardMiddleware
+
+
+class FakeConnection:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self.cancelled = 0
+
+    def cursor(self):
+        return SimpleNamespace(execute=self.statements.append, close=lambda: None)
+
+    def commit(self):
+        self.commits += 1
+
+    def cancel(self):
+        self.cancelled += 1
+
+
+def test_checkout_sets_budget_once_and_tracks_connection(monkeypatch):
+    """Test the budget is SET only when it changes and checkin stops tracking"""
+    monkeypatch.setattr(database.engine.dialect, "name", "postgresql")
+    connection, record = FakeConnection(), SimpleNamespace(info={})
+    tracked = []
+    budget_token, tracked_token = statement_budget.set(5000), request_connections.set(tracked)
+    try:
+        apply_statement_budget(connection, record, None)
+        untrack_connection(connection, record)
+        apply_statement_budget(connection, record, None)
+        assert tracked == [connection]
+        untrack_connection(connection, record)
+    finally:
+        statement_budget.reset(budget_token)
+        request_connections.reset(tracked_token)
+    assert tracked == []
+    assert connection.statements == ["SET statement_timeout = 5000"]
+    assert connection.commits == 1
+
+    apply_statement_budget(connection, record, None)  # outside a request: no budget
+    assert connection.statements[-1] == "SET statement_timeout = 0"
+
+
+def test_disconnect_cancels_the_running_query():
+    """Test a client leaving mid-read cancels the connection its request holds"""
+    connection = FakeConnection()
+    seen = {}
+
+    async def slow_report(scope, receive, send):
+        seen["budget"] = statement_budget.get()
+        request_connections.get().append(connection)  # as checkout would
+        while connection.cancelled == 0:
+            await asyncio.sleep(0.01)
+        seen["message"] = await receive()
+
+    async def scenario():
+        messages = [{"type": "http.request", "body": b""}, {"type": "http.disconnect"}]
+
+        async def receive():
+            await asyncio.sleep(0.05)
+            return messages.pop(0)
+
+        scope = {"type": "http", "method": "GET", "path": "/api/analytics/dashboard"}
+        middleware = QueryGuardMiddleware(slow_report, budgets={"bulk": 60000})
+        await asyncio.wait_for(middleware(scope, receive, None), 2)
+
+    asyncio.run(scenario())
+    assert connection.cancelled == 1
+    assert seen == {"budget": 60000, "message": {"type": "http.request", "body": b""}}
+    assert statement_budget.get() is None
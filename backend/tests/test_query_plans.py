@@ -0,0 +1,182 @@
+"""
+Query-plan regression tests for the hot queries
+
+Runs ``EXPLAIN (FORMAT JSON)`` against a synthetic dataset and asserts each
+query is served by its intended index, with no sequential scan. Sequential
+scans are priced out (``enable_seqscan = off``), so one still showing up means
+no index can serve the query, whatever the table size.
+
+Needs Postgres: set DATABASE_URL to a postgresql:// URL, as CI does. The data
+goes into a throwaway schema that is dropped afterwards. Each query's planner
+cost is recorded as a ``planner_cost`` property in the JUnit XML.
+"""
+
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List
+
+import pytest
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from app.database import Base
+from app.models import Blend, Ingredient, Quote, QuoteStatus, User, blend_ingredients
+from app.routes.ingredients import ingredient_filters
+from app.routes.quotes import quote_filters
+from app.services.serialization import (
+    _link_serializer,
+    blend_serializer,
+    ingredient_serializer,
+    quote_serializer,
+)
+from app.services.synthetic import PRESETS, generate
+
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL.startswith("postgresql"), reason="query plans need Postgres"
+)
+
+# Big enough for realistic statistics and costs, small enough to load in seconds
+PLAN_PRESET = PRESETS["tiny"]._replace(
+    ingredients=5_000, customers=5_000, blends=5_000, quotes=50_000, price_changes=2
+)
+
+
+class explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON) <statement>``, bound parameters and all"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+@pytest.fixture(scope="module")
+def plan_engine():
+    schema = f"plan_tests_{os.getpid()}"
+    admin = create_engine(DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+
+    engine = create_engine(DATABASE_URL)
+
+    @event.listens_for(engine, "connect")
+    def _search_path(dbapi_connection, connection_record):
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute(f"SET search_path TO {schema}")
+
+    try:
+        Base.metadata.create_all(engine)
+        generate(engine, PLAN_PRESET, seed=7, today=datetime(2026, 10, 1, tzinfo=timezone.utc))
+        yield engine
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+
+
+def _ingredient_list(conn):
+    return ingredient_serializer.select().order_by(Ingredient.id).offset(100).limit(50)
+
+
+def _ingredient_search(conn):
+    name = conn.execute(select(Ingredient.name).where(Ingredient.id == 1234)).scalar_one()
+    return (
+        ingredient_serializer.select()
+        .where(*ingredient_filters(name, None))
+        .order_by(Ingredient.id)
+        .limit(50)
+    )
+
+
+def _blend_list(conn):
+    return (
+        blend_serializer.select()
+        .where(Blend.is_template.is_(False), Blend.is_active.is_(True), Blend.id > 2_000)
+        .order_by(Blend.id)
+        .limit(51)
+    )
+
+
+def _blend_compositions(conn):
+    # dump_blends' composition batch for one page
+    return (
+        select(blend_ingredients.c.blend_id, *_link_serializer.columns)
+        .where(blend_ingredients.c.blend_id.in_(list(range(2_001, 2_051))))
+        .order_by(blend_ingredients.c.blend_id, blend_ingredients.c.ingredient_id)
+    )
+
+
+def _quotes_by_customer_and_status(conn):
+    return (
+        quote_serializer.select()
+        .where(*quote_filters(QuoteStatus.SENT, 42))
+        .order_by(Quote.id.desc())
+        .limit(20)
+    )
+
+
+def _quotes_by_customer(conn):
+    return (
+        quote_serializer.select()
+        .where(*quote_filters(None, 42))
+        .order_by(Quote.id.desc())
+        .limit(20)
+    )
+
+
+def _user_by_username(conn):
+    return select(User).where(User.username == "syn_rep_3")
+
+
+# name -> (statement builder, table, indexes any of which may serve it)
+CASES = {
+    "ingredient_list": (_ingredient_list, "ingredients", {"ingredients_pkey", "ix_ingredients_id"}),
+    "ingredient_search": (
+        _ingredient_search,
+        "ingredients",
+        {"ix_ingredients_name_lower", "ix_ingredients_code_lower"},
+    ),
+    "blend_list": (_blend_list, "blends", {"blends_pkey", "ix_blends_id"}),
+    "blend_compositions": (
+        _blend_compositions,
+        "blend_ingredients",
+        {"ix_blend_ingredients_blend_id_ingredient_id"},
+    ),
+    "quotes_by_customer_and_status": (
+        _quotes_by_customer_and_status, "quotes", {"ix_quotes_customer_id_status"}
+    ),
+    "quotes_by_customer": (_quotes_by_customer, "quotes", {"ix_quotes_customer_id_status"}),
+    "user_by_username": (_user_by_username, "users", {"ix_users_username"}),
+}
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_query_uses_intended_index(plan_engine, case, record_property):
+    """Test each hot query is served by its index and never seq-scans"""
+    build, table, indexes = CASES[case]
+    with plan_engine.begin() as conn:
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = conn.execute(explain(build(conn))).scalar_one()[0]["Plan"]
+    record_property("planner_cost", plan["Total Cost"])
+
+    nodes: List[Dict[str, Any]] = list(plan_nodes(plan))
+    seq_scans = [node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"]
+    assert seq_scans == [], f"{case} seq-scans {seq_scans}"
+    used = {node["Index Name"] for node in nodes if "Index Name" in node}
+    assert used & indexes, f"{case} should use one of {sorted(indexes)} on {table}, not {used}"
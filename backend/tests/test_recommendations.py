@@ -0,0 +1,102 @@
+"""
+Test cases for the field recommendation engine
+"""
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models import Blend, Customer, Farm, Field, Ingredient, IngredientType, blend_ingredients
+from app.services.recommendations import FieldInputs, blend_rates, nutrient_targets
+
+
+def test_nutrient_targets_follow_soil_tests():
+    """Test OM credits N, pH drives P and lime, and CEC drives K"""
+    inputs = FieldInputs.from_rows(
+        [
+            (1, 100.0, "Corn", 6.5, 1.0, 8.0),
+            (2, 100.0, "corn", 5.2, 3.0, 4.0),
+            (3, 50.0, "Peanuts", None, None, None),
+        ]
+    )
+
+    targets = nutrient_targets(inputs)
+
+    assert targets["n"].tolist() == [180.0, 150.0, 0.0]
+    assert targets["p"][1] > targets["p"][0]
+    assert targets["k"][1] > targets["k"][0]
+    assert targets["lime"][0] == 0.0
+    assert targets["lime"][1] > 0.0
+
+
+def test_blend_rates_meet_every_supplied_target():
+    """Test the rate covers the limiting nutrient and tonnage scales with acres"""
+    targets = {"n": np.array([100.0]), "p": np.array([40.0]), "k": np.array([60.0])}
+
+    rates = blend_rates(targets, np.array([80.0]), grade=[20.0, 10.0, 0.0], cost_per_ton=500.0)
+
+    assert rates["rate"][0] == 500.0
+    assert rates["tons"][0] == 20.0
+    assert rates["cost"][0] == 10000.0
+    assert rates["shortfall"][0].tolist() == [0.0, 0.0, 60.0]
+
+
+def test_customer_plan_endpoint(client, db: Session, auth_headers):
+    """Test a customer's plan covers every field and totals tonnage"""
+    ingredient = Ingredient(
+        name="17-17-17",
+        code="TRIPLE",
+        type=IngredientType.DRY,
+        nitrogen=17,
+        phosphate=17,
+        potash=17,
+        cost_per_ton=500,
+    )
+    blend = Blend(name="Triple 17", code="T17")
+    customer = Customer(name="Grower", state="GA")
+    customer.farms = [
+        Farm(
+            name="Home Place",
+            fields=[
+                Field(name="North", acres=100.0, crop_type="cotton", soil_ph=6.0),
+                Field(name="South", acres=50.0, crop_type="soybeans", soil_ph=5.8),
+            ],
+        )
+    ]
+    db.add_all([ingredient, blend, customer])
+    db.flush()
+    db.execute(
+        blend_ingredients.insert().values(
+            blend_id=blend.id, ingredient_id=ingredient.id, percentage=100, amount=2000
+        )
+    )
+    db.commit()
+
+    response = client.get(
+        f"/api/customers/{customer.id}/recommendations",
+        params={"blend_id": blend.id},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    plan = response.json()
+    assert plan["totals"]["fields"] == 2
+    assert plan["totals"]["acres"] == 150.0
+    assert plan["totals"]["tons"] == sum(f["tons"] for f in plan["fields"])
+
+    territory = client.get(
+        "/api/customers/recommendations", params={"state": "GA"}, headers=auth_headers
+    )
+    assert territory.status_code == 200
+    assert territory.json()["totals"]["fields"] == 2
+
+    missing = client.get(
+        f"/api/customers/{customer.id}/recommendations",
+        params={"blend_id": blend.id + 1000},
+        headers=auth_headers,
+    )
+    assert missing.status_code == 404
+
+    unknown = client.get(
+        f"/api/customers/{customer.id + 1000}/recommendations", headers=auth_headers
+    )
+    assert unknown.status_code == 404
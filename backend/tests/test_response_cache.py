@@ -0,0 +1,199 @@
+"""
+Test cases for the response cache
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fresh_entries_are_served_from_cache():
+    """Test identical calls within the TTL hit the cache"""
+    cache = ResponseCache(clock=FakeClock())
+    calls = []
+
+    @cache.cached("items", ttl=30)
+    def get_items(page: int = 1):
+        calls.append(page)
+        return {"page": page}
+
+    assert get_items(page=1) == {"page": 1}
+    assert get_items(page=1) == {"page": 1}
+    assert get_items(page=2) == {"page": 2}
+    assert calls == [1, 2]
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_stale_entry_is_revalidated_by_one_caller():
+    """Test a stale entry is recomputed once and expired entries are dropped"""
+    clock = FakeClock()
+    cache = ResponseCache(clock=clock)
+    version = {"value": 1}
+
+    @cache.cached("items", ttl=10, stale_ttl=20)
+    def get_items():
+        return version["value"]
+
+    assert get_items() == 1
+    version["value"] = 2
+    clock.now = 15
+    assert get_items() == 2
+    assert cache.stats()["revalidations"] == 1
+
+    version["value"] = 3
+    clock.now = 100
+    assert get_items() == 3
+    assert cache.stats()["misses"] == 2
+
+
+def test_concurrent_requests_share_one_computation():
+    """Test concurrent identical calls are coalesced"""
+    cache = ResponseCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    @cache.cached("slow", ttl=30)
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "done"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(slow()))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(slow())) for _ in range(4)]
+    for t in followers:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in [leader, *followers]:
+        t.join(5)
+
+    assert results == ["done"] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] + cache.stats()["hits"] == 4
+
+
+def test_async_routes_are_coalesced():
+    """Test coroutine routes share an in-flight computation"""
+    cache = ResponseCache()
+    calls = []
+
+    @cache.cached("dashboard", ttl=30)
+    async def dashboard(range_days: int = 7):
+        calls.append(range_days)
+        await asyncio.sleep(0.01)
+        return {"range": range_days}
+
+    async def run():
+        return await asyncio.gather(*(dashboard(range_days=7) for _ in range(5)))
+
+    assert asyncio.run(run()) == [{"range": 7}] * 5
+    assert calls == [7]
+
+
+def test_errors_are_not_cached():
+    """Test a failing computation is retried by the next caller"""
+    cache = ResponseCache()
+    attempts = []
+
+    @cache.cached("flaky", ttl=30)
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("boom")
+        return "ok"
+
+    with pytest.raises(ValueError):
+        flaky()
+    assert flaky() == "ok"
+    assert cache.stats()["in_flight"] == 0
+
+
+def test_lru_bound_and_invalidation():
+    """Test the least recently used entry is evicted and namespaces can be cleared"""
+    cache = ResponseCache(max_entries=2)
+
+    @cache.cached("items", ttl=30)
+    def get_item(item_id: int):
+        return item_id
+
+    get_item(item_id=1)
+    get_item(item_id=2)
+    get_item(item_id=1)
+    get_item(item_id=3)
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert cache.invalidate("items") == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidation_fences_running_computations():
+    """Test a result computed before a write is returned but not cached"""
+    cache = ResponseCache()
+    started = threading.Event()
+    release = threading.Event()
+    version = {"value": 1}
+
+    @cache.cached("items", ttl=30)
+    def get_items():
+        seen = version["value"]
+        started.set()
+        release.wait(5)
+        return seen
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(get_items()))
+    leader.start()
+    started.wait(5)
+    version["value"] = 2
+    cache.invalidate("items")
+    release.set()
+    leader.join(5)
+
+    assert results == [1]
+    assert get_items() == 2
+
+
+def test_cancelled_leader_lets_waiters_retry():
+    """Test cancelling the computing request does not cancel the others"""
+    cache = ResponseCache()
+    calls = []
+
+    @cache.cached("dashboard", ttl=30)
+    async def dashboard():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ready"
+
+    async def run():
+        leader = asyncio.create_task(dashboard())
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(dashboard()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(run()) == ["ready"] * 3
+    assert len(calls) == 2
+    assert cache.stats()["in_flight"] == 0
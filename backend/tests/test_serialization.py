@@ -0,0 +1,131 @@
+"""
+Test cases for the fast serialization path
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import orjson
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models import Blend, Ingredient, IngredientType, Quote, QuoteStatus, blend_ingredients
+from app.schemas.schemas import BlendResponse, IngredientResponse, QuoteResponse
+from app.services.blend_analysis import compute_analyses
+from app.services.serialization import (
+    blend_serializer,
+    dump_blends,
+    dump_json,
+    ingredient_serializer,
+    quote_serializer,
+)
+
+
+def test_ingredient_rows_match_pydantic(db: Session):
+    """Test serialized Core rows equal the validated response model output"""
+    db.add(
+        Ingredient(
+            name="Urea",
+            code="UREA",
+            type=IngredientType.DRY,
+            nitrogen=Decimal("46.00"),
+            cost_per_ton=Decimal("585.50"),
+            density=47.5,
+            updated_at=datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc),
+        )
+    )
+    db.commit()
+
+    rows = db.execute(ingredient_serializer.select())
+    fast = orjson.loads(dump_json(ingredient_serializer.dump_all(rows)))
+    slow = [
+        IngredientResponse.model_validate(ingredient).model_dump(mode="json")
+        for ingredient in db.query(Ingredient)
+    ]
+    assert fast == slow
+    assert fast[0]["nitrogen"] == "46.00"
+
+
+def test_blend_and_quote_rows_match_pydantic(db: Session):
+    """Test the blend and quote shapes, including calculated blend fields"""
+    urea = Ingredient(
+        name="Urea", code="UREA", type=IngredientType.DRY, nitrogen=46, cost_per_ton=600
+    )
+    blend = Blend(name="Urea Straight", code="U", target_n=Decimal("46.00"))
+    db.add_all([urea, blend])
+    db.flush()
+    db.execute(
+        blend_ingredients.insert(),
+        [{"blend_id": blend.id, "ingredient_id": urea.id, "percentage": 100, "amount": 2000}],
+    )
+    db.add(
+        Quote(
+            quote_number="Q-0001",
+            customer_id=1,
+            blend_id=blend.id,
+            quantity=12.5,
+            unit_price=Decimal("640.00"),
+            total_price=Decimal("8000.00"),
+            margin_type="percent",
+            margin_value=Decimal("20.00"),
+            services_total=Decimal("0"),
+            status=QuoteStatus.SENT,
+            created_by=1,
+        )
+    )
+    db.commit()
+
+    rows = db.execute(blend_serializer.select()).all()
+    fast_blends = orjson.loads(dump_json(dump_blends(db, rows)))
+    analysis = compute_analyses(db, [blend.id])[blend.id]
+    slow_blends = [
+        BlendResponse.model_validate(
+            {
+                **{column.name: getattr(blend, column.name) for column in Blend.__table__.columns},
+                "ingredients": [{"ingredient_id": urea.id, "percentage": 100, "amount": 2000}],
+                "total_n": analysis.total_n,
+                "total_p": analysis.total_p,
+                "total_k": analysis.total_k,
+                "cost_per_ton": analysis.cost_per_ton,
+                "guaranteed_analysis": analysis.nutrients,
+            }
+        ).model_dump(mode="json")
+    ]
+    assert fast_blends == slow_blends
+    assert fast_blends[0]["ingredients"] == [
+        {"ingredient_id": urea.id, "percentage": 100.0, "amount": 2000.0}
+    ]
+
+    rows = db.execute(quote_serializer.select())
+    fast_quotes = orjson.loads(dump_json(quote_serializer.dump_all(rows)))
+    slow_quotes = [
+        QuoteResponse.model_validate(quote).model_dump(mode="json") for quote in db.query(Quote)
+    ]
+    assert fast_quotes == slow_quotes
+
+
+def test_quote_list_endpoint(client: TestClient, db: Session, auth_headers):
+    """Test the quote list is served through the orjson response"""
+    db.add(
+        Quote(
+            quote_number="Q-0002",
+            customer_id=1,
+            blend_id=1,
+            quantity=5,
+            unit_price=Decimal("500.00"),
+            total_price=Decimal("2500.00"),
+            margin_type="fixed",
+            margin_value=Decimal("25.00"),
+            services_total=Decimal("0"),
+            created_by=1,
+        )
+    )
+    db.commit()
+
+    response = client.get("/api/quotes/", headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1
+    assert body["items"][0]["quote_number"] == "Q-0002"
+    assert body["items"][0]["total_price"] == "2500.00"
+    assert body["items"][0]["status"] == "draft"
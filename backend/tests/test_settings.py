@@ -0,0 +1,135 @@
+"""
+Test cases for system settings
+"""
+
+import time
+
+from jose import jwt
+from sqlalchemy.orm import Session
+
+from app.auth.security import ALGORITHM, SECRET_KEY, LoginLockout
+from app.models import SystemSetting
+from app.schemas.schemas import SecuritySettings
+from app.services.settings import SettingsStore, parse_setting_value
+from tests.conftest import TEST_PASSWORD
+
+
+def test_legacy_string_values_are_parsed(db: Session):
+    """Test str()-serialized rows still load as typed models"""
+    db.add(
+        SystemSetting(
+            key="security",
+            value=str({"max_login_attempts": 3, "password_require_uppercase": False}),
+        )
+    )
+    db.commit()
+
+    security = SettingsStore().typed(db, SecuritySettings)
+
+    assert security.max_login_attempts == 3
+    assert security.password_require_uppercase is False
+    assert security.session_timeout_minutes == 60
+    assert parse_setting_value("{'a': True}") == {"a": True}
+
+
+def test_cache_is_refreshed_on_write(db: Session):
+    """Test reads are cached and writes replace the cached model"""
+    store = SettingsStore(ttl=3600)
+    assert store.get(db, "quote_settings").quote_validity_days == 30
+
+    db.add(SystemSetting(key="quote_settings", value={"quote_validity_days": 10}))
+    db.commit()
+    assert store.get(db, "quote_settings").quote_validity_days == 30
+
+    store.set(db, "quote_settings", {"quote_validity_days": 14})
+    assert store.get(db, "quote_settings").quote_validity_days == 14
+    row = db.query(SystemSetting).filter(SystemSetting.key == "quote_settings").one()
+    assert row.value["quote_validity_days"] == 14
+
+
+def test_settings_endpoints(client, auth_headers):
+    """Test settings are readable and validated on update"""
+    response = client.get("/api/system/settings", headers=auth_headers)
+    assert response.status_code == 200
+    assert set(response.json()) >= {"quote_settings", "security", "services"}
+
+    response = client.put(
+        "/api/system/settings/blend_settings",
+        json={"value": {"default_application_rate": 300}},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["default_application_rate"] == 300
+
+    response = client.put(
+        "/api/system/settings/blend_settings",
+        json={"value": {"default_application_rate": -1}},
+        headers=auth_headers,
+    )
+    assert response.status_code == 422
+
+    response = client.get("/api/system/settings/unknown", headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_login_follows_security_settings(client, auth_headers):
+    """Test token lifetime and failed-login lockout come from the security setting"""
+    client.put(
+        "/api/system/settings/security",
+        json={"value": {"session_timeout_minutes": 5, "max_login_attempts": 2}},
+        headers=auth_headers,
+    )
+
+    good = {"username": "testuser", "password": TEST_PASSWORD}
+    token = client.post("/api/users/token", data=good).json()["access_token"]
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert abs(claims["exp"] - (time.time() + 300)) < 30
+
+    bad = {"username": "testuser", "password": "wrong"}
+    assert client.post("/api/users/token", data=bad).status_code == 401
+    assert client.post("/api/users/token", data=bad).status_code == 401
+    assert client.post("/api/users/token", data=good).status_code == 429
+
+
+def _configure_lockout(client, auth_headers, **security):
+    response = client.put(
+        "/api/system/settings/security", json={"value": security}, headers=auth_headers
+    )
+    assert response.status_code == 200
+
+
+def test_successful_login_clears_failed_attempts(client, auth_headers):
+    """Test a typo after signing in does not finish an earlier lockout count"""
+    _configure_lockout(client, auth_headers, max_login_attempts=2, lockout_duration_minutes=15)
+    good = {"username": "testuser", "password": TEST_PASSWORD}
+    bad = {"username": "testuser", "password": "wrong"}
+
+    assert client.post("/api/users/token", data=bad).status_code == 401
+    assert client.post("/api/users/token", data=good).status_code == 200
+    assert client.post("/api/users/token", data=bad).status_code == 401
+    assert client.post("/api/users/token", data=good).status_code == 200
+
+
+def test_zero_lockout_duration_disables_lockout(client, auth_headers):
+    """Test lockout_duration_minutes = 0 never locks anyone out"""
+    _configure_lockout(client, auth_headers, max_login_attempts=1, lockout_duration_minutes=0)
+    bad = {"username": "testuser", "password": "wrong"}
+
+    for _ in range(3):
+        assert client.post("/api/users/token", data=bad).status_code == 401
+    good = {"username": "testuser", "password": TEST_PASSWORD}
+    assert client.post("/api/users/token", data=good).status_code == 200
+
+
+def test_lockout_limiter_is_rebuilt_only_when_settings_change():
+    """Test requests share one limiter until the lockout settings change"""
+    lockout = LoginLockout()
+    limiter = lockout.limiter(5, 15)
+    limiter.hit("10.0.0.1:bob")
+
+    assert lockout.limiter(5, 15) is limiter
+    assert (limiter.calls, limiter.period) == (5, 900)
+    changed = lockout.limiter(3, 10)
+    assert changed is not limiter
+    assert (changed.calls, changed.period, changed.calls_made) == (3, 600, {})
+    assert lockout.limiter(3, 0) is None
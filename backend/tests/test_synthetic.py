@@ -0,0 +1,61 @@
+"""
+Test cases for the synthetic data generator
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Blend, Customer, Quote, QuoteStatus, blend_ingredients
+from app.services.synthetic import PRESETS, generate
+
+TODAY = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def _load(seed: int = 42):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return engine, generate(engine, PRESETS["tiny"], seed=seed, chunk_size=64, today=TODAY)
+
+
+def _quote_fingerprint(seed: int):
+    engine, counts = _load(seed)
+    with engine.connect() as conn:
+        quotes = conn.execute(
+            select(Quote.quote_number, Quote.customer_id, Quote.total_price).order_by(Quote.id)
+        ).all()
+    return counts, quotes
+
+
+def test_same_seed_gives_same_data():
+    """Test a seed fully determines the generated rows"""
+    counts, quotes = _quote_fingerprint(7)
+    assert counts["quotes"] == PRESETS["tiny"].quotes
+    assert counts["customers"] == PRESETS["tiny"].customers
+    assert counts["farms"] >= counts["customers"]
+    assert _quote_fingerprint(7)[1] == quotes
+    assert _quote_fingerprint(8)[1] != quotes
+
+
+def test_generated_data_is_consistent():
+    """Test blends sum to 100% and quotes reference existing rows"""
+    engine, _ = _load()
+    db = Session(engine)
+
+    totals = db.execute(
+        select(blend_ingredients.c.blend_id, func.sum(blend_ingredients.c.percentage))
+        .group_by(blend_ingredients.c.blend_id)
+    ).all()
+    assert len(totals) == PRESETS["tiny"].blends
+    assert all(abs(total - 100) < 0.01 for _, total in totals)
+
+    orphans = db.execute(
+        select(func.count(Quote.id))
+        .outerjoin(Customer, Customer.id == Quote.customer_id)
+        .outerjoin(Blend, Blend.id == Quote.blend_id)
+        .where((Customer.id.is_(None)) | (Blend.id.is_(None)))
+    ).scalar()
+    assert orphans == 0
+    assert {status for (status,) in db.execute(select(Quote.status).distinct())} <= set(QuoteStatus)
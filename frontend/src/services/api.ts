@@ -15,6 +15,12 @@ export interface PaginatedResponse<T> {
   pages: number;
 }
 
+export interface KeysetPage<T> {
+  items: T[];
+  size: number;
+  next_cursor: number | null;
+}
+
 // Create axios instance
 const api: AxiosInstance = axios.create({
   baseURL: 'http://192.168.1.175:8000/api',
@@ -170,14 +176,14 @@ export const chemicalsApi = {
 
 // Blends API
 export const blendsApi = {
-  getAll: async (page = 1, size = 20, isTemplate?: boolean) => {
+  getAll: async (after?: number | null, size = 50, isTemplate?: boolean) => {
     const params = new URLSearchParams({
-      page: page.toString(),
       size: size.toString(),
     });
+    if (after != null) params.append('after', after.toString());
     if (isTemplate !== undefined) params.append('is_template', isTemplate.toString());
 
-    const response = await api.get<PaginatedResponse<any>>(`/blends?${params}`);
+    const response = await api.get<KeysetPage<any>>(`/blends?${params}`);
     return response.data;
   },
 
@@ -408,3 +414,61 @@ export const systemApi = {
     return response.data;
   },
 };
+
+// Background Jobs API
+export const jobsApi = {
+  getAll: async (status?: string) => {
+    const params = new URLSearchParams();
+    if (status) params.append('status', status);
+
+    const response = await api.get(`/jobs?${params}`);
+    return response.data;
+  },
+
+  getById: async (id: number) => {
+    const response = await api.get(`/jobs/${id}`);
+    return response.data;
+  },
+
+  cancel: async (id: number) => {
+    const response = await api.post(`/jobs/${id}/cancel`);
+    return response.data;
+  },
+
+  // Server-sent progress/partial/complete events. EventSource cannot send the
+  // bearer token, so the stream is read with fetch; abort via the signal.
+  streamEvents: async (
+    id: number,
+    onEvent: (event: string, data: any) => void,
+    signal?: AbortSignal
+  ) => {
+    const token = localStorage.getItem('access_token');
+    const response = await fetch(`${api.defaults.baseURL}/jobs/${id}/events`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+      signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Job event stream failed: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const frames = buffer.split('\n\n');
+      buffer = frames.pop() ?? '';
+      for (const frame of frames) {
+        let event = 'message';
+        let data = '';
+        for (const line of frame.split('\n')) {
+          if (line.startsWith('event: ')) event = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        }
+        if (data) onEvent(event, JSON.parse(data));
+      }
+    }
+  },
+};